@@ -29,13 +29,36 @@ if sys.version_info[:2] not in SUPPORTED_VERSIONS:
     )
     raise RuntimeError(err_msg)
 
-from .app import Propheto
+from .utilities import lazy_attributes
 
-import pkg_resources
+# Propheto, and the deployment backends behind it, are only imported on first use
+__all__ = ["Propheto", "__version__"]
+_lazy_getattr = lazy_attributes(globals(), {"Propheto": ".app"})
 
-try:
-    __version__ = pkg_resources.get_distribution("propheto").version
-except:
-    # this happens on remote environments since the job package
-    # does not have a version
-    __version__ = None
+
+def _get_version() -> str:
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+    except ImportError:
+        # Python < 3.8
+        from pkg_resources import get_distribution as _get_distribution
+        from pkg_resources import DistributionNotFound as PackageNotFoundError
+
+        version = lambda name: _get_distribution(name).version
+    try:
+        return version("propheto")
+    except PackageNotFoundError:
+        # this happens on remote environments since the job package
+        # does not have a version
+        return None
+
+
+def __getattr__(name: str):
+    if name == "__version__":
+        globals()["__version__"] = _get_version()
+        return globals()["__version__"]
+    return _lazy_getattr(name)
+
+
+if sys.version_info[:2] < (3, 7):
+    __version__ = _get_version()
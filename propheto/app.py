@@ -4,23 +4,22 @@ import pickle
 import base64
 import logging
 import inspect
+import threading
 from time import time
 from warnings import warn
 from datetime import date, datetime
 from typing import Optional, Tuple, Any, List, Dict
 from propheto.utilities import unique_id
-from requests import session
 from .package import (
     ZipService,
     APIService,
     VirtualEnvironment,
     ContainerEnvironment,
     ModelSerializer,
-    CodeIntrospect,
 )
-from .deployments import AWS, GCP, Azure
 from pathlib import Path
 from .project import API, Configuration
+from .pipeline import Pipeline
 
 logger = logging.getLogger(__name__)
 
@@ -86,11 +85,25 @@ class Propheto:
         self.container_environment = ContainerEnvironment(**kwargs)
         self.serializer = ModelSerializer(**kwargs)
         self.deployment = object
-        self.code_introspecter = CodeIntrospect(file_dir=file_dir, **kwargs)
+        self._code_introspecter = None
+        self._introspect_kwargs = kwargs
         self.working_directory = file_dir
         self.package_dir = file_dir
         self.parent_dir, self.project_dir = self._generate_base_artifacts()
 
+    @property
+    def code_introspecter(self) -> object:
+        """
+        Code introspection service, created on first use as it imports IPython
+        """
+        if self._code_introspecter is None:
+            from .package import CodeIntrospect
+
+            self._code_introspecter = CodeIntrospect(
+                file_dir=self.working_directory, **self._introspect_kwargs
+            )
+        return self._code_introspecter
+
     def __repr__(self) -> str:
         return f"Propheto(id={self.id}, project_name={self.project_name}, version={self.version})"
 
@@ -419,15 +432,30 @@ class Propheto:
             _ = self.code_introspecter.get_notebook_code_cells()
         self._validate_target(target)
         os.chdir(self.package_dir)
+        if "model_compression" in kwargs:
+            self.serializer.model_compression = kwargs["model_compression"]
+        if "model_compression_level" in kwargs:
+            self.serializer.model_compression_level = kwargs["model_compression_level"]
         if target == "aws":
+            from .deployments import AWS
+
             self.deployment = AWS(**kwargs)
-            self._deploy_aws(model, action="deploy")
+            self._deploy_aws(
+                model,
+                action="deploy",
+                build_cache=kwargs.get("build_cache", ""),
+                provisioned_concurrency=kwargs.get("provisioned_concurrency", 0),
+                keepwarm_concurrency=kwargs.get("keepwarm_concurrency", 1),
+                bake_model=kwargs.get("bake_model", False),
+            )
         elif target == "gcp":
             return "GCP deployments are currently still under development. Please contact support team at hello@propheto.io for more details."
         elif target == "azure":
             return "Azure deployments are currently still under development. Please contact support team at hello@propheto.io for more details."
         elif target == "local":
-            self._deploy_local(model)
+            self._deploy_local(
+                model, micro_batching=kwargs.get("micro_batching", False)
+            )
         else:
             raise Exception(
                 "Please specify a target cloud deployment: AWS, GCP, or Azure"
@@ -465,7 +493,7 @@ class Propheto:
         print("Created project directory...")
         return parent_dir, project_dir
 
-    def _deploy_local(self, model: object) -> None:
+    def _deploy_local(self, model: object, micro_batching: bool = False) -> None:
         """
         Take a model as an input then deploy to AWS directly environment.
 
@@ -473,6 +501,8 @@ class Propheto:
         ----------
         model : object, required
                 The trained model object that will be deployed
+        micro_batching : bool, optional
+                Coalesce concurrent single-row requests into batched model calls
         """
         # Check iterations, if one exists for current id, add new one to config
         if self.config.iterations[self.config.current_iteration_id].resources != {}:
@@ -495,6 +525,7 @@ class Propheto:
         app_directory = self.api_service.generate_service(
             model_filepath=str(model_filepath),
             project_name=self.project_name.replace(" ", ""),
+            micro_batching=micro_batching,
             **output_code
         )
         print("Generated App Service...")
@@ -504,7 +535,9 @@ class Propheto:
             parent_dir=self.parent_dir, 
             environment_directory=str(Path(self.working_directory, "propheto-package"))
         )
-        self.deployment.generate_environment(name="env")
+        self.deployment.generate_environment(
+            name="env", extra_requirements=self.serializer.extra_requirements
+        )
         print("Created virtual environment...")
 
         # # DEPLOY API
@@ -530,7 +563,15 @@ class Propheto:
         # Navigate back to parent dir
         os.chdir(self.parent_dir)
 
-    def _deploy_aws(self, model: object, action: str = "deploy") -> None:
+    def _deploy_aws(
+        self,
+        model: object,
+        action: str = "deploy",
+        build_cache: Optional[str] = "",
+        provisioned_concurrency: Optional[int] = 0,
+        keepwarm_concurrency: Optional[int] = 1,
+        bake_model: Optional[bool] = False,
+    ) -> None:
         """
         Take a model as an input then deploy to AWS directly environment.
 
@@ -540,6 +581,15 @@ class Propheto:
                 The trained model object that will be deployed
         action : str, optional
                 Optional parameter specifying what type of action is to be performed
+        build_cache : str, optional
+                CodeBuild cache mode for the image build, '' or 'local'
+        provisioned_concurrency : int, optional
+                Execution environments kept initialized on the 'live' alias
+        keepwarm_concurrency : int, optional
+                Execution environments warmed by each scheduled keepwarm ping
+        bake_model : bool, optional
+                Copy the model into the container image so cold starts read
+                it from local disk instead of S3
         """
         # Check iterations, if one exists for current id, add new one to config
         if self.config.iterations[self.config.current_iteration_id].resources != {}:
@@ -549,168 +599,182 @@ class Propheto:
         model_filepath, model_type = self.serializer.save_model(model)
         output_code = self.serializer.get_model_processing_code(model_type, "aws")
         project_name_formatted = self.project_name.replace(" ", "").lower()
-        # CREATE VIRTUAL ENVIRONMENT
-        # virtualenv = self.virtual_environment.generate_environment()
-        # print("Created virtual environment...")
-
-        # CREATE IAM / ROLE
+        project_name_clean = self.project_name.replace(" ", "")
+        deploy = action == "deploy"
         aws_account_id = self.deployment.aws_account_id
-        role_arn = f"arn:aws:iam::{aws_account_id}:role/ProphetoAutoBuild"
-        role_arn = self.deployment.iam.manage_iam(role_name="ProphetoAutoBuild")
-        # CREATE ECR REPOSITORY
+        api_deployment_stage = 'dev'
+
+        # Resource names are decided up front so independent steps can run in parallel
         ecr_repository_name = (
             "propheto-" + unique_id(length=4, has_numbers=False).lower()
         )
-        if action == "deploy":
-            ecr_response = self.deployment.ecr.create_ecr_repository(
-                repository_name=ecr_repository_name
-            )
-            print("Created ECR Repository...")
-        self.config.add_resource(
-            remote_object=self.deployment.ecr, id=ecr_repository_name, name="ECR"
-        )
-
-        # CREATE BUCKET & FORMAT NAME
         s3_bucket_name = self.project_name.replace(" ", "").replace(".", "").replace('_', '')
         for number in range(10):
             s3_bucket_name = s3_bucket_name.replace(str(number), "")
         s3_bucket_name = s3_bucket_name.replace('xn--.', '').replace('-s3alias', '')
-        if action == "deploy":
-            s3_bucket_name = self.deployment.s3.create_bucket(s3_bucket_name)
-            print("Created S3 bucket...")
+        _model_filename = model_filepath.parts[-1]
+        s3_model_path = str(Path(project_name_clean, _model_filename)) if deploy else ""
+        project_name = "propheto-" + unique_id(length=4, has_numbers=False).lower()
+        project_description = "Propheto API Autogenerated for ML service."
+        function_name = (
+            project_name_formatted + "-" + unique_id(length=4, has_numbers=False)
+        ).lower()
+        rule_name = "Propheto-Keepwarm-{0}".format(unique_id())
+        # With provisioned concurrency, API Gateway and the keepwarm rule invoke the alias
+        alias_name = "live" if provisioned_concurrency > 0 else ""
+        target_step = "publish_alias" if alias_name else "create_lambda_function"
+        target_name = f"{function_name}:{alias_name}" if alias_name else function_name
 
-        self.config.add_resource(
-            remote_object=self.deployment.s3, id=s3_bucket_name, name="S3"
-        )
+        # Resources are recorded by the step creating them, so the ones created
+        # before a failed step are still in the config for destroy()
+        resources_lock = threading.Lock()
+
+        def add_resource(remote_object: object, id: str, name: str) -> None:
+            with resources_lock:
+                self.config.add_resource(remote_object=remote_object, id=id, name=name)
+
+        # CREATE IAM / ROLE
+        def manage_iam(results: dict) -> str:
+            return self.deployment.iam.manage_iam(role_name="ProphetoAutoBuild")
+
+        # CREATE ECR REPOSITORY
+        def create_ecr_repository(results: dict) -> None:
+            self.deployment.ecr.create_ecr_repository(repository_name=ecr_repository_name)
+            add_resource(self.deployment.ecr, ecr_repository_name, "ECR")
+            print("Created ECR Repository...")
+
+        # CREATE BUCKET
+        def create_bucket(results: dict) -> str:
+            bucket_name = s3_bucket_name
+            if deploy:
+                bucket_name = self.deployment.s3.create_bucket(s3_bucket_name)
+                print("Created S3 bucket...")
+            add_resource(self.deployment.s3, bucket_name, "S3")
+            return bucket_name
 
         # UPLOAD MODEL PACKAGE
-        s3_model_path = ""
-        if action == "deploy":
-            _model_filename = model_filepath.parts[-1]
+        def upload_model(results: dict) -> str:
             print(_model_filename)
-            # Upload a datetime stamped version of the model as well
-            _timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-            _split_model_filename, _split_model_filetype = _model_filename.split('.')
-            _timestamped_model_filename = f"models/{_split_model_filename}_{_timestamp}.{_split_model_filetype}"
-            _ = self.deployment.s3.upload_file(
-                project_name=self.project_name.replace(" ", ""),
-                source_path=model_filepath.as_posix(),
-                filename=_timestamped_model_filename,
-            )
-            # Upload main model
-            s3_model_path = self.deployment.s3.upload_file(
-                project_name=self.project_name.replace(" ", ""),
+            # Upload the model once by content hash along with a timestamped manifest
+            model_path = self.deployment.s3.upload_model_artifact(
+                project_name=project_name_clean,
                 source_path=model_filepath.as_posix(),
                 filename=_model_filename,
             )
             print("Uploaded ML model...")
+            return model_path
 
         # UPLOAD LOGS
-        if action == "deploy":
+        def upload_logs(results: dict) -> None:
             log_path = Path(self.working_directory, "propheto-package", "logs")
             if log_path.exists():
-                s3_response = self.deployment.s3.upload_folder(
-                    project_name=self.project_name.replace(" ", ""),
+                self.deployment.s3.upload_folder(
+                    project_name=project_name_clean,
                     local_folder_path=log_path,
                     output_folder_path="logs",
                 )
                 print("Uploaded local logs")
-            else:
-                pass
-                # print("No logs file found")
 
         # GENERATE API CODE
-        api_deployment_stage = 'dev'
-        app_directory = self.api_service.generate_service(
-            bucket_name=s3_bucket_name,
-            object_key=s3_model_path,
-            project_name=self.project_name.replace(" ", ""),
-            api_root_path=f'"/{api_deployment_stage}"',
-            **output_code
-        )
-        print("Generated App Service...")
+        def generate_service(results: dict) -> str:
+            app_directory = self.api_service.generate_service(
+                bucket_name=results["create_bucket"],
+                object_key=s3_model_path,
+                project_name=project_name_clean,
+                api_root_path=f'"/{api_deployment_stage}"',
+                **output_code
+            )
+            print("Generated App Service...")
+            return app_directory
 
         # CREATE CONTAINER ENVIRONMENT
-        region = self.deployment.region
-        self.container_environment.generate_environment(
-            file_directory=app_directory,
-            ecr_repo=ecr_repository_name,
-            aws_account_id=aws_account_id,
-            model_type=model_type,
-            region=region,
-        )
+        def generate_container_environment(results: dict) -> None:
+            self.container_environment.generate_environment(
+                file_directory=results["generate_service"],
+                ecr_repo=ecr_repository_name,
+                aws_account_id=aws_account_id,
+                model_type=model_type,
+                region=self.deployment.region,
+                extra_requirements=self.serializer.extra_requirements,
+                model_path=str(model_filepath) if bake_model else "",
+            )
 
         # ZIP SERVICE
-        self.zip_service.package_project(app_dir=self.project_dir)
-        print("Zipped service...")
+        def zip_service(results: dict) -> None:
+            self.zip_service.package_project(app_dir=self.project_dir)
+            print("Zipped service...")
 
         # UPLOAD ZIP PACKAGE
-        if action == "deploy":
+        def upload_zip(results: dict) -> str:
             s3_zip_path = self.deployment.s3.upload_file(
-                filename="lambda.zip", project_name=self.project_name.replace(" ", "")
+                filename="lambda.zip", project_name=project_name_clean
             )
             print("Uploaded zipped service...")
+            return s3_zip_path
 
         # CREATE CODEBUILD PROJECT
-        project_name = "propheto-" + unique_id(length=4, has_numbers=False).lower()
-        project_description = "Propheto API Autogenerated for ML service."
-        service_role_arn = role_arn
-        if action == "deploy":
-            code_location = f"{s3_bucket_name}/{s3_zip_path}"
-            project_response = self.deployment.code_build.create_project(
+        def create_codebuild_project(results: dict) -> None:
+            # The zip key is fixed so the project can be created while the zip uploads
+            s3_zip_path = str(Path(project_name_clean, "lambda.zip"))
+            code_location = f"{results['create_bucket']}/{s3_zip_path}"
+            self.deployment.code_build.create_project(
                 str(project_name),
                 str(project_description),
-                str(service_role_arn),
+                str(results["manage_iam"]),
                 str(code_location),
+                cache_mode=build_cache,
             )
-        self.config.add_resource(
-            remote_object=self.deployment.code_build, id=project_name, name="CodeBuild",
-        )
+            add_resource(self.deployment.code_build, project_name, "CodeBuild")
 
         # RUN CODEBUILD FROM S3
-        if action == "deploy":
-            build_response = self.deployment.code_build.build_image(project_name)
-
+        def build_image(results: dict) -> str:
+            self.deployment.code_build.build_image(project_name)
             # GET ARN FOR ECR IMAGE
-            image_uri = self.deployment.ecr.get_ecr_image_uri(ecr_repository_name)
+            return self.deployment.ecr.get_ecr_image_uri(ecr_repository_name)
 
         # CREATE LAMBDA FUNCTION
-        function_name = (
-            project_name_formatted + "-" + unique_id(length=4, has_numbers=False)
-        ).lower()
-        if action == "deploy":
+        def create_lambda_function(results: dict) -> str:
             self.deployment.aws_lambda.create_lambda_function(
-                function_name, role_arn, image_uri=image_uri,
+                function_name, results["manage_iam"], image_uri=results["build_image"],
             )
+            self.deployment.aws_lambda.model_baked = bake_model
+            add_resource(self.deployment.aws_lambda, function_name, "AWSLambda")
             print("Created lambda function...")
+            return self.deployment.aws_lambda.get_lambda_arn(function_name)
+
+        # PUBLISH ALIAS
+        def publish_alias(results: dict) -> str:
+            alias_arn = self.deployment.aws_lambda.publish_alias(function_name, alias_name)
+            print(f"Published lambda alias {alias_name}...")
+            return alias_arn
+
+        # PROVISION CONCURRENCY
+        def provision_concurrency(results: dict) -> None:
+            self.deployment.aws_lambda.set_provisioned_concurrency(
+                function_name, provisioned_concurrency, alias_name
+            )
+            print(f"Provisioned concurrency of {provisioned_concurrency}...")
 
-        self.config.add_resource(
-            remote_object=self.deployment.aws_lambda, id=function_name, name="AWSLambda",
-        )
-        lambda_arn = self.deployment.aws_lambda.get_lambda_arn(function_name)
-        region = self.deployment.api_gateway.region
-        uri = f"arn:aws:apigateway:{region}:lambda:path/2015-03-31/functions/{lambda_arn}/invocations"
         # CREATE API
         #  https://{rest_api_id}.execute-api.{region}.amazonaws.com/{stage}
-        if action == "deploy":
+        def create_api(results: dict) -> None:
+            region = self.deployment.api_gateway.region
+            lambda_arn = results[target_step]
+            uri = f"arn:aws:apigateway:{region}:lambda:path/2015-03-31/functions/{lambda_arn}/invocations"
             self.deployment.api_gateway.create_api(
                 project_name_formatted, self.description, self.version, uri
             )
+            add_resource(self.deployment.api_gateway, project_name_formatted, "APIGateway")
             print("Created API...")
 
-        self.config.add_resource(
-            remote_object=self.deployment.api_gateway,
-            id=project_name_formatted,
-            name="APIGateway",
-        )
-
         # PROVISION ACCESS
-        if action == "deploy":
+        def grant_lambda_permission(results: dict) -> None:
             self.deployment.aws_lambda.grant_lambda_permission(
-                self.deployment.api_gateway.rest_api_id, function_name
+                self.deployment.api_gateway.rest_api_id, target_name
             )
 
-            # DEPLOY API
+        # DEPLOY API
+        def deploy_api(results: dict) -> str:
             api_url = self.deployment.api_gateway.create_deployment(
                 stage_name=api_deployment_stage,
                 stage_description="Developent deployment",
@@ -718,17 +782,21 @@ class Propheto:
             )
             self.config.service_api_url = api_url
             print("Deployed API! - ", api_url)
+            return api_url
 
         # SCHEDULE KEEP WARM
-        rule_name = "Propheto-Keepwarm-{0}".format(unique_id())
-        if action == "deploy":
+        def create_keepwarm(results: dict) -> None:
             response = self.deployment.cloudwatch.create_keepwarm_event(
-                rule_name=rule_name, role_arn=role_arn, lambda_arn=lambda_arn
+                rule_name=rule_name,
+                role_arn=results["manage_iam"],
+                lambda_arn=results[target_step],
+                concurrency=keepwarm_concurrency,
             )
             rule_arn = response["RuleArn"]
+            add_resource(self.deployment.cloudwatch, rule_name, "Cloudwatch")
 
             self.deployment.aws_lambda.lambda_client.add_permission(
-                FunctionName=function_name,
+                FunctionName=target_name,
                 Action="lambda:InvokeFunction",
                 SourceArn=rule_arn,
                 Principal="events.amazonaws.com",
@@ -736,9 +804,40 @@ class Propheto:
             )
             print("Created Cloudwatch Keepwarm...")
 
-        self.config.add_resource(
-            remote_object=self.deployment.cloudwatch, id=rule_name, name="Cloudwatch",
-        )
+        pipeline = Pipeline(name="Deploy")
+        pipeline.add_step("create_bucket", create_bucket)
+        pipeline.add_step("generate_service", generate_service, ["create_bucket"])
+        pipeline.add_step("generate_container_environment", generate_container_environment, ["generate_service"])
+        pipeline.add_step("zip_service", zip_service, ["generate_container_environment"])
+        if deploy:
+            pipeline.add_step("manage_iam", manage_iam)
+            pipeline.add_step("create_ecr_repository", create_ecr_repository)
+            pipeline.add_step("upload_model", upload_model, ["create_bucket"])
+            pipeline.add_step("upload_logs", upload_logs, ["create_bucket"])
+            pipeline.add_step("upload_zip", upload_zip, ["zip_service"])
+            pipeline.add_step("create_codebuild_project", create_codebuild_project, ["manage_iam", "create_bucket"])
+            pipeline.add_step(
+                "build_image",
+                build_image,
+                ["create_codebuild_project", "create_ecr_repository", "upload_zip"],
+            )
+            pipeline.add_step(
+                "create_lambda_function", create_lambda_function, ["build_image", "upload_model"]
+            )
+            if alias_name:
+                pipeline.add_step("publish_alias", publish_alias, ["create_lambda_function"])
+                pipeline.add_step("provision_concurrency", provision_concurrency, ["publish_alias"])
+            pipeline.add_step("create_api", create_api, [target_step])
+            pipeline.add_step("grant_lambda_permission", grant_lambda_permission, ["create_api"])
+            pipeline.add_step("deploy_api", deploy_api, ["grant_lambda_permission"])
+            pipeline.add_step("create_keepwarm", create_keepwarm, [target_step])
+        try:
+            pipeline.run()
+        except Exception:
+            # Keep the resources created so far so destroy() can remove them
+            self.config.write_config()
+            raise
+        print(pipeline.report())
 
         project_url = f"https://app.getpropheto.com/projects/{self.id}"
         print(f"Check out your project in Propheto at: {project_url}")
@@ -779,28 +878,31 @@ class Propheto:
         ## ADD OPTION TO UPDATE NEW LOGS
         if "model" in actions:
             model = actions["model"]
-            model_filepath, _, _, _, _, _ = self._store_model(model)
+            model_filepath, _ = self._store_model(model)
             project_name = self.project_name.replace(" ", "")
             # UPLOAD MODEL PACKAGE
-            _model_filename = model_filepath.parts[-1]
+            _model_filename = Path(model_filepath).parts[-1]
             print(_model_filename)
-            # 
-            # Upload a datetime stamped version of the model as well
-            _timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-            _split_model_filename, _split_model_filetype = _model_filename.split('.')
-            _timestamped_model_filename = f"models/{_split_model_filename}_{_timestamp}.{_split_model_filetype}"
-            _ = self.deployment.s3.upload_file(
-                project_name=self.project_name.replace(" ", ""),
-                source_path=model_filepath.as_posix(),
-                filename=_timestamped_model_filename,
-            )
-            # Save the model
-            s3_model_path = self.deployment.s3.upload_file(
+            # Upload the model once by content hash along with a timestamped manifest
+            s3_model_path = self.deployment.s3.upload_model_artifact(
                 project_name=project_name,
-                source_path=model_filepath.as_posix(),
+                source_path=Path(model_filepath).as_posix(),
                 filename=_model_filename,
             )
             print("Uploaded ML model...")
+            if getattr(self.deployment.aws_lambda, "model_baked", False):
+                # An empty variable overrides the image one so the service reads S3
+                self.deployment.aws_lambda.update_function_configuration(
+                    self.deployment.aws_lambda.function_name,
+                    environment={"PROPHETO_MODEL_PATH": ""},
+                )
+                alias_name = getattr(self.deployment.aws_lambda, "alias_name", "")
+                if alias_name:
+                    self.deployment.aws_lambda.publish_alias(
+                        self.deployment.aws_lambda.function_name, alias_name
+                    )
+                self.deployment.aws_lambda.model_baked = False
+                print("Switched the service from the baked model to S3...")
         elif "logs" in actions:
             log_path = Path(self.working_directory, "propheto-package", "logs")
             project_name = self.project_name.replace(" ", "")
@@ -816,18 +918,12 @@ class Propheto:
                 # GENERATE API CODE
                 s3_bucket_name = self.deployment.s3.s3_bucket_name
                 s3_model_path = self.deployment.s3.object_key  # TODO: GET NAME
-                model_serializer = ""  # TODO: GET NAME
-                model_preprocessor = ""  # TODO: GET NAME
-                model_predictor = ""  # TODO: GET NAME
-                model_postprocessor = ""  # TODO: GET NAME
+                output_code = self.serializer.get_model_processing_code(deployment_target="aws")
                 app_directory = self.api_service.generate_service(
                     bucket_name=s3_bucket_name,
                     object_key=s3_model_path,
-                    model_serializer=model_serializer,
-                    model_preprocessor=model_preprocessor,
-                    model_predictor=model_predictor,
-                    model_postprocessor=model_postprocessor,
                     project_name=self.project_name.replace(" ", ""),
+                    **output_code
                 )
                 print("Generated App Service...")
 
@@ -835,7 +931,7 @@ class Propheto:
                 region = self.deployment.region
                 aws_account_id = self.deployment.aws_account_id
                 ecr_repository_name = self.deployment.ecr.ecr_repository_name
-                model_type = ""  # TODO: GET NAME
+                model_type = self.serializer.model_type
                 self.container_environment.generate_environment(
                     file_directory=app_directory,
                     ecr_repo=ecr_repository_name,
@@ -874,6 +970,10 @@ class Propheto:
                 self.deployment.aws_lambda.update_lambda_function(
                     function_name, image_uri=image_uri
                 )
+                alias_name = getattr(self.deployment.aws_lambda, "alias_name", "")
+                if alias_name:
+                    # Move the alias, and its provisioned concurrency, to the new code
+                    self.deployment.aws_lambda.publish_alias(function_name, alias_name)
                 print("Updated lambda function...")
                 # DEPLOY API
                 api_url = self.deployment.api_gateway.service_api_url
@@ -882,3 +982,63 @@ class Propheto:
                 print(f"Check out your project in Propheto at: {project_url}")
             else:
                 raise Exception("Please specify exactly the action")
+
+    def tune(
+        self,
+        payloads: Optional[List] = None,
+        memory_sizes: Optional[List[int]] = None,
+        objective: Optional[str] = "cost",
+        max_latency_ms: Optional[float] = None,
+        invocations: Optional[int] = 20,
+        endpoint_url: Optional[str] = "",
+        apply: Optional[bool] = True,
+        *args,
+        **kwargs,
+    ) -> dict:
+        """
+        Find and apply the best memory size for the deployed lambda function
+        by replaying prediction payloads at a sweep of memory sizes.
+
+        Parameters
+        ----------
+        payloads : list, optional
+                Prediction payloads to replay. Defaults to the most recent
+                payloads recorded in the service prediction logs
+        memory_sizes : list, optional
+                Memory sizes in MB to try
+        objective : str, optional
+                Selection criteria, 'cost', 'latency' or 'balanced'
+        max_latency_ms : float, optional
+                Only consider memory sizes with a warm p95 below this latency
+        invocations : int, optional
+                Number of invocations for each memory size
+        endpoint_url : str, optional
+                Endpoint of a local lambda runtime emulator to test against
+        apply : bool, optional
+                Update the function with the best memory size
+
+        Returns
+        -------
+        best : dict
+                Measurements for the selected memory size
+        """
+        from .deployments.aws.tuning import LambdaTuner, load_recorded_payloads
+
+        project_name = self.project_name.replace(" ", "")
+        if payloads is None:
+            payloads = load_recorded_payloads(self.deployment.s3, project_name)
+            print(f"Loaded {len(payloads)} recorded payloads...")
+        tuner = LambdaTuner(
+            aws_lambda=self.deployment.aws_lambda,
+            function_name=self.deployment.aws_lambda.function_name,
+            payloads=payloads,
+            memory_sizes=memory_sizes,
+            invocations=invocations,
+            endpoint_url=endpoint_url,
+        )
+        best = tuner.tune(objective=objective, max_latency_ms=max_latency_ms, apply=apply)
+        alias_name = getattr(self.deployment.aws_lambda, "alias_name", "")
+        if apply and endpoint_url == "" and alias_name:
+            # The sweep changes $LATEST, publish it so the alias serves the tuned setting
+            self.deployment.aws_lambda.publish_alias(tuner.function_name, alias_name)
+        return best
@@ -1,3 +1,7 @@
-from .aws import AWS
-from .gcp import GCP
-from .azure import Azure
\ No newline at end of file
+from propheto.utilities import lazy_attributes
+
+# Backends are imported on first use so `import propheto` does not load boto3 and troposphere
+__all__ = ["AWS", "GCP", "Azure"]
+__getattr__ = lazy_attributes(
+    globals(), {"AWS": ".aws", "GCP": ".gcp", "Azure": ".azure"}
+)
@@ -25,6 +25,7 @@ class AWS(IAM, S3, Lambda, APIGateway, CloudFormation, ECR, CodeBuild, CloudWatc
     ):
         self.profile_name = profile_name
         self.iam = IAM(profile_name)
+        self.boto_client = self.iam.boto_client
         # If no region specified try to use the default region for the profile
         region = region if region else self.iam.boto_client.region_name
         # If the AWS profiles are not set up with a region then parse a default
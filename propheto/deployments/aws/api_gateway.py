@@ -1,6 +1,6 @@
 from os import remove
 from typing import Optional
-from .boto_session import BotoInterface
+from .boto_session import BotoInterface, LazyClient
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,6 +11,8 @@ class APIGateway(BotoInterface):
     Manage API gateway resources
     """
 
+    apigateway_client = LazyClient("apigateway")
+
     def __init__(
         self,
         profile_name: Optional[str] = "default",
@@ -23,7 +25,6 @@ class APIGateway(BotoInterface):
         **kwargs,
     ) -> None:
         super().__init__(profile_name=profile_name, region=region)
-        self.apigateway_client = self.boto_client.client("apigateway")
         self.rest_api_id = rest_api_id
         self.deployment_id = deployment_id
         self.profile_name = profile_name
@@ -72,7 +73,6 @@ class APIGateway(BotoInterface):
                 Region for the service to be deployed to
         """
         super().__init__(profile_name=profile_name, region=region)
-        self.apigateway_client = self.boto_client.client("apigateway")
 
     def set_attributes(self, response) -> None:
         """
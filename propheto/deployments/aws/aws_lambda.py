@@ -1,6 +1,6 @@
 from typing import Tuple, Optional
-from time import sleep
-from .boto_session import BotoInterface
+from .boto_session import BotoInterface, LazyClient
+from .waiters import poll, wait_for
 from ...utilities import human_size, unique_id
 import logging
 
@@ -13,6 +13,8 @@ class Lambda(BotoInterface):
     either a zipped S3 python environment file or a ECR Image URI
     """
 
+    lambda_client = LazyClient("lambda")
+
     def __init__(
         self,
         profile_name: Optional[str] = "default",
@@ -22,9 +24,10 @@ class Lambda(BotoInterface):
         **kwargs,
     ) -> None:
         super().__init__(profile_name=profile_name, region=region)
-        self.lambda_client = self.boto_client.client("lambda")
         self.function_name = function_name
         self.profile_name = profile_name
+        self.alias_name = ""
+        self.model_baked = False
 
     def to_dict(self) -> dict:
         """
@@ -69,13 +72,55 @@ class Lambda(BotoInterface):
                 Region for the service to be deployed to
         """
         super().__init__(profile_name=profile_name, region=region)
-        self.lambda_client = self.boto_client.client("lambda")
 
     def get_function_state(self, function_name: str) -> str:
         function_response = self.lambda_client.get_function(FunctionName=function_name)
         state = function_response["Configuration"]["State"]
         return state
 
+    def wait_for_function(
+        self,
+        function_name: str,
+        waiter_name: Optional[str] = "function_active",
+        timeout: Optional[float] = 300,
+    ) -> None:
+        """
+        Wait until the function is active or its last update has finished.
+
+        Parameters
+        ----------
+        function_name : str
+                Name of the lambda function
+        waiter_name : str, optional
+                Either 'function_active' or 'function_updated'
+        timeout : float, optional
+                Overall deadline in seconds for the wait
+        """
+        description = f"lambda function {function_name}"
+        if waiter_name in self.lambda_client.waiter_names:
+            wait_for(
+                self.lambda_client,
+                waiter_name,
+                timeout=timeout,
+                delay=2,
+                description=description,
+                FunctionName=function_name,
+            )
+            return
+        # Older botocore releases have no lambda waiters so poll the state
+        status_key = "State" if waiter_name == "function_active" else "LastUpdateStatus"
+        pending_status = "Pending" if waiter_name == "function_active" else "InProgress"
+        configuration = poll(
+            check=lambda: self.lambda_client.get_function_configuration(
+                FunctionName=function_name
+            ),
+            is_done=lambda config: config.get(status_key) != pending_status,
+            timeout=timeout,
+            description=description,
+        )
+        if configuration.get(status_key) == "Failed":
+            raise Exception(f"Lambda function {function_name} failed - {configuration}")
+
     def create_lambda_function(
         self,
         function_name: str,
@@ -83,6 +128,9 @@ class Lambda(BotoInterface):
         s3_bucket_name: str = None,
         s3_bucket_zipfile: str = None,
         image_uri: str = None,
+        wait_timeout: Optional[float] = 300,
+        memory_size: Optional[int] = 512,
+        timeout: Optional[int] = 360,
     ) -> Tuple[str]:
         self.function_name = function_name
         if image_uri:
@@ -93,8 +141,8 @@ class Lambda(BotoInterface):
                 Role=role_arn,
                 PackageType="Image",
                 Code={"ImageUri": image_uri},
-                Timeout=360,
-                MemorySize=512,
+                Timeout=timeout,
+                MemorySize=memory_size,
                 Publish=True,
             )
         else:
@@ -107,18 +155,12 @@ class Lambda(BotoInterface):
                 Role=role_arn,
                 Handler=handler_name,
                 Code={"S3Bucket": s3_bucket_name, "S3Key": s3_bucket_zipfile},
-                Timeout=360,
-                MemorySize=512,
+                Timeout=timeout,
+                MemorySize=memory_size,
                 Publish=True,
             )
-        sleep(5)
-        function_cntr = 0
-        function_state = self.get_function_state(function_name)
-        while function_state == "Pending" and function_cntr < 15:
-            function_cntr += 1
-            function_state = self.get_function_state(function_name)
-            print(f"Function status {function_state}")
-            sleep(5)
+        self.wait_for_function(function_name, "function_active", timeout=wait_timeout)
+        print("Function status Active")
         function_arn = create_response["FunctionArn"]
         return function_name, function_arn
 
@@ -152,15 +194,130 @@ class Lambda(BotoInterface):
         )
         return response_parent, response_child
 
-    def update_lambda_function(self, function_name: str, image_uri: str) -> str:
+    def update_lambda_function(
+        self, function_name: str, image_uri: str, wait_timeout: Optional[float] = 300
+    ) -> str:
         """
-        Update the lambda function code with a new image
+        Update the lambda function code with a new image and wait for the
+        update to finish
         """
         response = self.lambda_client.update_function_code(
             FunctionName=function_name, ImageUri=image_uri
         )
+        self.wait_for_function(function_name, "function_updated", timeout=wait_timeout)
+        return response
+
+    def update_function_configuration(
+        self,
+        function_name: str,
+        memory_size: Optional[int] = None,
+        timeout: Optional[int] = None,
+        environment: Optional[dict] = None,
+        wait_timeout: Optional[float] = 300,
+    ) -> dict:
+        """
+        Update the memory size, timeout and/or environment variables of the
+        function and wait for the new configuration to be live
+
+        Parameters
+        ----------
+        function_name : str
+                Name of the lambda function
+        memory_size : int, optional
+                Memory in MB, CPU is allocated proportionally
+        timeout : int, optional
+                Function timeout in seconds
+        environment : dict, optional
+                Environment variables, replacing the current ones
+        """
+        configuration = {}
+        if memory_size is not None:
+            configuration["MemorySize"] = memory_size
+        if timeout is not None:
+            configuration["Timeout"] = timeout
+        if environment is not None:
+            configuration["Environment"] = {"Variables": environment}
+        if not configuration:
+            raise Exception("Please provide a memory size, timeout or environment to update")
+        response = self.lambda_client.update_function_configuration(
+            FunctionName=function_name, **configuration
+        )
+        self.wait_for_function(function_name, "function_updated", timeout=wait_timeout)
         return response
 
+    def publish_alias(
+        self, function_name: str, alias_name: Optional[str] = "live"
+    ) -> str:
+        """
+        Publish the current code and configuration as a version and point
+        the alias to it, creating the alias if it does not exist yet
+
+        Parameters
+        ----------
+        function_name : str
+                Name of the lambda function
+        alias_name : str, optional
+                Name of the alias API Gateway and the keepwarm rule invoke
+
+        Returns
+        -------
+        alias_arn : str
+                ARN of the alias
+        """
+        version = self.lambda_client.publish_version(FunctionName=function_name)["Version"]
+        try:
+            response = self.lambda_client.create_alias(
+                FunctionName=function_name, Name=alias_name, FunctionVersion=version,
+            )
+        except self.lambda_client.exceptions.ResourceConflictException:
+            response = self.lambda_client.update_alias(
+                FunctionName=function_name, Name=alias_name, FunctionVersion=version,
+            )
+        self.alias_name = alias_name
+        return response["AliasArn"]
+
+    def set_provisioned_concurrency(
+        self,
+        function_name: str,
+        concurrent_executions: int,
+        alias_name: Optional[str] = "live",
+        timeout: Optional[float] = 900,
+    ) -> dict:
+        """
+        Keep a number of execution environments of the alias initialized
+        so requests up to that concurrency never hit a cold start
+
+        Parameters
+        ----------
+        function_name : str
+                Name of the lambda function
+        concurrent_executions : int
+                Number of execution environments kept initialized
+        alias_name : str, optional
+                Alias the provisioned concurrency is allocated to
+        timeout : float, optional
+                Overall deadline in seconds for the environments to be ready
+        """
+        self.lambda_client.put_provisioned_concurrency_config(
+            FunctionName=function_name,
+            Qualifier=alias_name,
+            ProvisionedConcurrentExecutions=concurrent_executions,
+        )
+        configuration = poll(
+            check=lambda: self.lambda_client.get_provisioned_concurrency_config(
+                FunctionName=function_name, Qualifier=alias_name
+            ),
+            is_done=lambda config: config["Status"] != "IN_PROGRESS",
+            timeout=timeout,
+            max_delay=30.0,
+            description=f"provisioned concurrency of {function_name}:{alias_name}",
+        )
+        if configuration["Status"] == "FAILED":
+            raise Exception(
+                f"Provisioned concurrency failed - {configuration.get('StatusReason')}"
+            )
+        return configuration
+
     def get_lambda_arn(self, function_name: Optional[str] = "") -> str:
         function_name = function_name if function_name != "" else self.function_name
         response = self.lambda_client.get_function(FunctionName=function_name)
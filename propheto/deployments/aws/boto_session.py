@@ -1,9 +1,94 @@
+import threading
 from typing import Optional
 from boto3.session import Session as AWS_Session
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Sessions, caller identities and clients shared by every AWS service wrapper
+_SESSIONS = {}
+_IDENTITIES = {}
+_CLIENTS = {}
+_CACHE_LOCK = threading.RLock()
+
+
+def get_session(
+    profile_name: Optional[str] = "default", region: Optional[str] = None
+) -> AWS_Session:
+    """
+    Get the boto3 session for the profile and region, creating it only once.
+
+    Parameters
+    ----------
+    profile_name : str, optional
+            Profile name for the boto3 session object.
+    region : str, optional
+            Region for the session. Defaults to the region of the profile.
+
+    Returns
+    -------
+    session : AWS_Session
+    """
+    with _CACHE_LOCK:
+        session = _SESSIONS.get((profile_name, region))
+        if session is None:
+            session = AWS_Session(profile_name=profile_name, region_name=region)
+            _SESSIONS[(profile_name, region)] = session
+            # A session on the profile default region is the same as one on the
+            # region it resolves to, so share it for both keys
+            _SESSIONS.setdefault((profile_name, session.region_name), session)
+        return session
+
+
+def get_client(session: AWS_Session, service_name: str) -> object:
+    """
+    Get the boto3 client for the service, creating it only once per session.
+    Clients are thread safe but creating them from a session is not, so
+    creation is guarded by a lock.
+
+    Parameters
+    ----------
+    session : AWS_Session
+            Session the client belongs to.
+    service_name : str
+            AWS service name such as 's3' or 'lambda'.
+    """
+    with _CACHE_LOCK:
+        client = _CLIENTS.get((id(session), service_name))
+        if client is None:
+            client = session.client(service_name)
+            _CLIENTS[(id(session), service_name)] = client
+        return client
+
+
+def get_caller_identity(
+    session: AWS_Session, profile_name: Optional[str] = "default"
+) -> dict:
+    """
+    Get the STS caller identity for the profile, calling STS only once.
+    """
+    with _CACHE_LOCK:
+        identity = _IDENTITIES.get(profile_name)
+        if identity is None:
+            identity = get_client(session, "sts").get_caller_identity()
+            _IDENTITIES[profile_name] = identity
+        return identity
+
+
+class LazyClient:
+    """
+    Descriptor returning the shared boto3 client for a service on first use.
+    Assigning the attribute on an instance overrides the descriptor.
+    """
+
+    def __init__(self, service_name: str) -> None:
+        self.service_name = service_name
+
+    def __get__(self, instance: object, owner: type) -> object:
+        if instance is None:
+            return self
+        return get_client(instance.boto_client, self.service_name)
+
 
 class BotoInterface:
     """
@@ -13,8 +98,8 @@ class BotoInterface:
     def __init__(
         self, profile_name: Optional[str] = "default", region: Optional[str] = None
     ) -> None:
-        self.boto_client = AWS_Session(profile_name=profile_name, region_name=region)
-        _caller_identiy = self.boto_client.client("sts").get_caller_identity()
+        self.boto_client = get_session(profile_name=profile_name, region=region)
+        _caller_identiy = get_caller_identity(self.boto_client, profile_name)
         self.aws_account_id = _caller_identiy["Account"]
         self.aws_user_id = _caller_identiy["UserId"]
         self.profile_name = profile_name
@@ -40,7 +125,7 @@ class BotoInterface:
         region: Optional[str] = "us-east-1",
     ):
         """
-        Set the boto3 client object attributes. 
+        Set the boto3 client object attributes.
 
         Parameters
         ----------
@@ -49,10 +134,4 @@ class BotoInterface:
         region : str, optional
                 Region for the AWS services
         """
-        super().__init__(profile_name=profile_name, region=region)
-        self.boto_client = AWS_Session(profile_name=profile_name, region_name=region)
-        self.profile_name = profile_name
-        _caller_identiy = self.boto_client.client("sts").get_caller_identity()
-        self.aws_account_id = _caller_identiy["Account"]
-        self.aws_user_id = _caller_identiy["UserId"]
-
+        BotoInterface.__init__(self, profile_name=profile_name, region=region)
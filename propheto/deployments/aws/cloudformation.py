@@ -1,5 +1,5 @@
 from typing import Optional
-from .boto_session import BotoInterface
+from .boto_session import BotoInterface, LazyClient
 from troposphere import (
     Ref as cf_Ref,
     Template as cf_Template,
@@ -54,9 +54,10 @@ class CloudFormation(BotoInterface):
     AWS CloudFormation Template Class
     """
 
+    cloudformation_client = LazyClient("cloudformation")
+
     def __init__(self, profile_name: str, region: Optional[str], *args, **kwargs) -> None:
         super().__init__(profile_name=profile_name, region=region)
-        self.cloudformation_client = self.boto_client.client("cloudformation")
         self.profile_name = profile_name
         self.cloud_template = cf_Template()
         # self.cloud_template.set_description(description)
@@ -1,11 +1,16 @@
+import json
 from ...utilities import unique_id
-from .boto_session import BotoInterface
+from .boto_session import BotoInterface, LazyClient
 from typing import Optional
 import logging
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Key the generated service handler checks to answer keepwarm pings
+# without running the model
+WARMER_KEY = "propheto-warmer"
+
 
 # # Create CloudWatchEvents client
 # cloudwatch_events = boto3.client('events')
@@ -42,6 +47,8 @@ class CloudWatch(BotoInterface):
     Cloudwatch for scheduling lambdas.
     """
 
+    cloudwatch_events = LazyClient("events")
+
     def __init__(
         self,
         profile_name: Optional[str] = "default",
@@ -52,7 +59,6 @@ class CloudWatch(BotoInterface):
     ) -> None:
         pass
         super().__init__(profile_name=profile_name, region=region)
-        self.cloudwatch_events = self.boto_client.client("events")
         self.profile_name = profile_name
         self.region = region
         self.rule_name = rule_name
@@ -99,7 +105,6 @@ class CloudWatch(BotoInterface):
                 Default profile name for the boto3 session object.
         """
         super().__init__(profile_name=profile_name, region=region)
-        self.cloudwatch_events = self.boto_client.client("events")
 
     def destroy(self, rule_name: Optional[str] = "") -> dict:
         """
@@ -129,13 +134,28 @@ class CloudWatch(BotoInterface):
         lambda_arn: str,
         id: Optional[str] = "",
         schedule_exprn: Optional[str] = "rate(5 minutes)",
+        concurrency: Optional[int] = 1,
     ) -> dict:
         """
         Create a lambda keepwarm event
 
+        Parameters
+        ----------
+        rule_name : str, required
+                Name for the rule
+        role_arn : str, required
+                Role the rule runs with
+        lambda_arn : str, required
+                ARN of the function, or of its alias, to keep warm
+        concurrency : int, optional
+                Number of execution environments warmed by each ping. The
+                service fans the ping out into that many concurrent invocations
         """
         ruleResponse = self.create_rule(rule_name, role_arn, schedule_exprn)
-        ruleTargetResponse = self.create_rule_target(rule_name, lambda_arn, id)
+        ping = {WARMER_KEY: True, "concurrency": concurrency}
+        ruleTargetResponse = self.create_rule_target(
+            rule_name, lambda_arn, id, input=json.dumps(ping)
+        )
         return ruleResponse
 
     def create_rule(
@@ -161,6 +181,7 @@ class CloudWatch(BotoInterface):
         rule_name: str,
         lambda_arn: str,
         id: Optional[str] = "",
+        input: Optional[str] = "",
     ) -> dict:
         """
         Create a rule target which is the lambda to execute on the scheduled interval
@@ -169,12 +190,17 @@ class CloudWatch(BotoInterface):
         ----------
         name : str, required
                 Name for the rule
+        input : str, optional
+                JSON event sent to the lambda instead of the scheduled event
         
         """
         id = id if id != "" else "Propheto-{0}".format(unique_id())
+        target = {"Arn": lambda_arn, "Id": id}
+        if input != "":
+            target["Input"] = input
         # Put target for rule
         response = self.cloudwatch_events.put_targets(
-            Rule=rule_name, Targets=[{"Arn": lambda_arn, "Id": id}],
+            Rule=rule_name, Targets=[target],
         )
         return response
 
@@ -1,23 +1,42 @@
 import re
 import json
-from time import sleep
 from typing import Optional
-from .boto_session import BotoInterface
+from .boto_session import BotoInterface, LazyClient
+from .waiters import poll
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Project cache settings for each opt-in cache mode. Dependencies are installed
+# inside the docker build, so the docker layer cache is what skips reinstalling them
+CACHE_MODES = {
+    "": {"type": "NO_CACHE"},
+    "local": {
+        "type": "LOCAL",
+        "modes": ["LOCAL_DOCKER_LAYER_CACHE", "LOCAL_SOURCE_CACHE"],
+    },
+}
+
+# Docker build output of a step (classic builder and BuildKit) and of a cache hit
+_CLASSIC_STEP = re.compile(r"^Step \d+/\d+ : ")
+_CLASSIC_CACHED = re.compile(r"^ ---> Using cache")
+_BUILDKIT_STEP = re.compile(r"^#(\d+) \[(?!internal|auth)[^\]]+\] ")
+_BUILDKIT_CACHED = re.compile(r"^#(\d+) CACHED")
+
 
 class CodeBuild(BotoInterface):
     """
     Interface for remotely building images for lambdas
     """
 
+    codebuild_client = LazyClient("codebuild")
+    logs_client = LazyClient("logs")
+
     def __init__(self, profile_name: str, region: Optional[str], project_name: Optional[str] = "") -> None:
         super().__init__(profile_name=profile_name, region=region)
-        self.codebuild_client = self.boto_client.client("codebuild")
         self.profile_name = profile_name
         self.project_name = project_name
+        self.cache_mode = ""
 
     def to_dict(self) -> dict:
         """
@@ -41,7 +60,7 @@ class CodeBuild(BotoInterface):
 
     def __getstate__(self):
         state = self.__dict__.copy()
-        for attribute in ["boto_client", "codebuild_client"]:
+        for attribute in ["boto_client", "codebuild_client", "logs_client"]:
             if attribute in state:
                 del state[attribute]
         return state
@@ -62,7 +81,6 @@ class CodeBuild(BotoInterface):
                 Region for the AWS services
         """
         super().__init__(profile_name=profile_name, region=region)
-        self.codebuild_client = self.boto_client.client("codebuild")
 
     def create_project(
         self,
@@ -70,9 +88,39 @@ class CodeBuild(BotoInterface):
         project_description: str,
         service_role_arn: str,
         code_location: str,
+        cache_mode: Optional[str] = "",
     ) -> dict:
+        """
+        Create the CodeBuild project building the service image.
+
+        Parameters
+        ----------
+        project_name : str
+                Name of the CodeBuild project
+        project_description : str
+                Description of the project
+        service_role_arn : str
+                Role CodeBuild runs the build as
+        code_location : str
+                S3 location of the zipped service, `bucket/key`
+        cache_mode : str, optional
+                '' for no cache or 'local' for the docker layer and source
+                caches on the build host. Any cache mode also pulls the
+                previous images from the registry as --cache-from
+        """
         # TODO: SUPPORT OTHER SOURCE CODE
+        if cache_mode not in CACHE_MODES:
+            raise Exception(
+                f"Cache mode {cache_mode} is unsupported. Please use one of {list(CACHE_MODES)}"
+            )
         self.project_name = project_name
+        self.cache_mode = cache_mode
+        cache = dict(CACHE_MODES[cache_mode])
+        environment_variables = []
+        if cache_mode != "":
+            environment_variables.append(
+                {"name": "PROPHETO_BUILD_CACHE", "value": "1", "type": "PLAINTEXT"}
+            )
         response = self.codebuild_client.create_project(
             name=project_name,
             description=project_description,
@@ -83,11 +131,12 @@ class CodeBuild(BotoInterface):
                 "insecureSsl": False,
             },
             artifacts={"type": "NO_ARTIFACTS",},
-            cache={"type": "NO_CACHE"},
+            cache=cache,
             environment={
                 "type": "LINUX_CONTAINER",
                 "image": "aws/codebuild/amazonlinux2-x86_64-standard:3.0",
                 "computeType": "BUILD_GENERAL1_MEDIUM",
+                "environmentVariables": environment_variables,
                 "privilegedMode": True,
                 "imagePullCredentialsType": "CODEBUILD",
             },
@@ -107,19 +156,51 @@ class CodeBuild(BotoInterface):
         )
         return response
 
-    def build_image(self, project_name: str) -> dict:
+    def build_image(
+        self,
+        project_name: str,
+        timeout: Optional[float] = 7200,
+        max_poll_delay: Optional[float] = 10,
+    ) -> dict:
+        """
+        Start a build of the project and wait for it to finish.
+
+        Parameters
+        ----------
+        project_name : str
+                Name of the CodeBuild project
+        timeout : float, optional
+                Overall deadline in seconds, covering the queued and build
+                timeouts of the project
+        max_poll_delay : float, optional
+                Upper bound in seconds between two status checks
+        """
         response = self.codebuild_client.start_build(projectName=project_name)
         print("Building image...")
         build_id = response["build"]["id"]
-        wait_counter = 0
-        build_status = "IN_PROGRESS"
-        while build_status == "IN_PROGRESS" and wait_counter < 30:
+        phases = []
+
+        def check_build() -> str:
             build_status, status_response = self.get_build_status(build_id)
-            wait_counter += 1
-            print(f"Build in progress... Status: {build_status} - {wait_counter}/30")
-            sleep(15)
+            phase = status_response["builds"][0].get("currentPhase", "")
+            if phase not in phases:
+                phases.append(phase)
+                print(f"Build in progress... Status: {build_status} - Phase: {phase}")
+            return build_status
+
+        build_status = poll(
+            check=check_build,
+            is_done=lambda status: status != "IN_PROGRESS",
+            timeout=timeout,
+            initial_delay=1,
+            max_delay=max_poll_delay,
+            multiplier=1.5,
+            description=f"build {build_id}",
+        )
         if build_status == "SUCCEEDED":
             print(f"Build completed successfully!")
+            if self.cache_mode != "":
+                self.print_cache_report(build_id)
         else:
             raise Exception(f"Build did not complete successfully - {build_status}")
         return response
@@ -142,6 +223,79 @@ class CodeBuild(BotoInterface):
             print(response)
             raise Exception
 
+    def get_build_logs(self, build_id: str) -> list:
+        """
+        Read all CloudWatch log lines of a build.
+        """
+        _, status_response = self.get_build_status(build_id)
+        logs = status_response["builds"][0].get("logs", {})
+        if "groupName" not in logs or "streamName" not in logs:
+            return []
+        lines = []
+        next_token = None
+        while True:
+            kwargs = {
+                "logGroupName": logs["groupName"],
+                "logStreamName": logs["streamName"],
+                "startFromHead": True,
+            }
+            if next_token:
+                kwargs["nextToken"] = next_token
+            response = self.logs_client.get_log_events(**kwargs)
+            lines.extend(event["message"].rstrip("\n") for event in response["events"])
+            if response.get("nextForwardToken") in (None, next_token):
+                break
+            next_token = response["nextForwardToken"]
+        return lines
+
+    @staticmethod
+    def cache_hit_rate(lines: list) -> dict:
+        """
+        Count the docker build steps served from the layer cache.
+
+        Parameters
+        ----------
+        lines : list
+                Build log lines
+
+        Returns
+        -------
+        report : dict
+                Number of steps, cached steps and the cache hit rate
+        """
+        steps, cached = 0, 0
+        buildkit_steps, buildkit_cached = set(), set()
+        for line in lines:
+            if _CLASSIC_STEP.match(line):
+                steps += 1
+            elif _CLASSIC_CACHED.match(line):
+                cached += 1
+            buildkit_step = _BUILDKIT_STEP.match(line)
+            if buildkit_step:
+                buildkit_steps.add(buildkit_step.group(1))
+            buildkit_hit = _BUILDKIT_CACHED.match(line)
+            if buildkit_hit:
+                buildkit_cached.add(buildkit_hit.group(1))
+        steps += len(buildkit_steps)
+        cached += len(buildkit_cached & buildkit_steps)
+        hit_rate = cached / steps if steps else 0.0
+        return {"steps": steps, "cached": cached, "hit_rate": hit_rate}
+
+    def print_cache_report(self, build_id: str) -> dict:
+        """
+        Print the docker layer cache hit rate of a finished build.
+        """
+        try:
+            report = self.cache_hit_rate(self.get_build_logs(build_id))
+        except Exception as error:
+            logger.debug("Unable to read the build logs", exc_info=True)
+            print(f"Build cache report unavailable - {error}")
+            return {}
+        print(
+            f"Build cache: {report['cached']}/{report['steps']} docker steps cached ({report['hit_rate']:.0%})"
+        )
+        return report
+
     def destroy(self, project_name: str) -> dict:
         """
         Destroy the ECR resource from AWS
@@ -1,5 +1,5 @@
 import json
-from .boto_session import BotoInterface
+from .boto_session import BotoInterface, LazyClient
 import logging
 from typing import Optional
 
@@ -11,11 +11,12 @@ class ECR(BotoInterface):
     Create and manage AWS Elastic Container Registry.
     """
 
+    ecr_client = LazyClient("ecr")
+
     def __init__(
         self, profile_name: str, region: str, ecr_repository_name: str = ""
     ) -> None:
         super().__init__(profile_name=profile_name, region=region)
-        self.ecr_client = self.boto_client.client("ecr")
         self.profile_name = profile_name
         self.ecr_repository_name = ecr_repository_name
 
@@ -63,7 +64,6 @@ class ECR(BotoInterface):
                 Region for the AWS services
         """
         super().__init__(profile_name=profile_name, region=region)
-        self.ecr_client = self.boto_client.client("ecr")
 
     def create_ecr_repository(self, repository_name: str) -> dict:
         """
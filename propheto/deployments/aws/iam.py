@@ -1,6 +1,6 @@
 import json
 from typing import Optional
-from .boto_session import BotoInterface
+from .boto_session import BotoInterface, LazyClient
 import logging
 
 logger = logging.getLogger(__name__)
@@ -155,10 +155,10 @@ class IAM(BotoInterface):
     assume_policy_str = ASSUME_POLICY
     attach_policy_str = ATTACH_POLICY
     role_name = "Propheto"
+    iam = LazyClient("iam")
 
     def __init__(self, profile_name: str, *args, **kwargs) -> None:
         super().__init__(profile_name=profile_name)
-        self.iam = self.boto_client.client("iam")
         self.profile_name = profile_name
         self.attach_policy_obj = json.loads(self.attach_policy_str)
         self.assume_policy_obj = json.loads(self.assume_policy_str)
@@ -194,7 +194,6 @@ class IAM(BotoInterface):
                 Default profile name for the boto3 session object.
         """
         super().__init__(profile_name=profile_name)
-        self.iam = self.boto_client.client("iam")
 
     def manage_iam(self, role_name: str, *args, **kwargs) -> str:
         if not self.check_iam_role_exists(role_name=role_name):
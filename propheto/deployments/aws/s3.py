@@ -1,20 +1,57 @@
 import os
+import json
 import requests
+import threading
 from tqdm import tqdm
-from ...utilities import human_size, unique_id, get_list_directory_files
-from .boto_session import BotoInterface
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from ...utilities import human_size, unique_id, get_list_directory_files, file_hash
+from .boto_session import BotoInterface, LazyClient
 from typing import Optional
 import logging
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+MB = 1024 ** 2
+
+# Multipart settings for large model artifacts and packages
+UPLOAD_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=32 * MB,
+    multipart_chunksize=16 * MB,
+    max_concurrency=16,
+    use_threads=True,
+)
+
+# Small files are sent with a single PUT so skip the per-transfer thread pool
+SMALL_FILE_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=32 * MB, use_threads=False,
+)
+
+
+class ProgressCallback:
+    """
+    Thread safe transfer callback feeding a single shared progress bar.
+    """
+
+    def __init__(self, progress: tqdm) -> None:
+        self.progress = progress
+        self._lock = threading.Lock()
+
+    def __call__(self, bytes_transferred: int) -> None:
+        with self._lock:
+            self.progress.update(bytes_transferred)
+
 
 class S3(BotoInterface):
     """
     Manage objects in S3
     """
 
+    s3_client = LazyClient("s3")
+
     def __init__(
         self,
         profile_name: Optional[str] = "default",
@@ -24,7 +61,6 @@ class S3(BotoInterface):
         **kwargs,
     ) -> None:
         super().__init__(profile_name=profile_name, region=region)
-        self.s3_client = self.boto_client.client("s3")
         self.s3_bucket_name = s3_bucket_name
         self.profile_name = profile_name
         self.region = region
@@ -71,16 +107,20 @@ class S3(BotoInterface):
                 Default profile name for the boto3 session object.
         """
         super().__init__(profile_name=profile_name, region=region)
-        self.s3_client = self.boto_client.client("s3")
 
     def manage_bucket(self) -> None:
         pass
 
     def upload_folder(
-        self, project_name: str, local_folder_path: str, output_folder_path: str
+        self,
+        project_name: str,
+        local_folder_path: str,
+        output_folder_path: str,
+        max_workers: Optional[int] = 16,
     ) -> str:
         """
         Upload a folder and all of the contents into a given s3 bucket.
+        Files are uploaded concurrently and reported on one progress bar.
 
         Parameters
         ----------
@@ -90,6 +130,8 @@ class S3(BotoInterface):
                 Path to the local folder to upload into S3
         output_folder_path : str
                 Output folder
+        max_workers : int, optional
+                Number of files uploaded at the same time
 
         Returns
         -------
@@ -97,15 +139,29 @@ class S3(BotoInterface):
                 S3 key string
         """
         local_files = get_list_directory_files(local_folder_path)
-        for _local_file in local_files:
-            filename = _local_file.parts[-1]
-            self.upload_file(
-                filename=filename,
-                project_name=Path(project_name, output_folder_path),
-                # project_name=project_name,
-                source_path=_local_file,
-            )
+        total_size = sum(os.path.getsize(_local_file) for _local_file in local_files)
         s3_key = f"{self.s3_bucket_name}/{project_name}/{output_folder_path}"
+        print(
+            "Uploading {0} files to {1} ({2})..".format(
+                len(local_files), s3_key, human_size(total_size)
+            )
+        )
+        progress = tqdm(total=float(total_size), unit_scale=True, unit="B")
+        callback = ProgressCallback(progress)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    self.upload_file,
+                    filename=_local_file.parts[-1],
+                    project_name=Path(project_name, output_folder_path),
+                    source_path=_local_file,
+                    callback=callback,
+                )
+                for _local_file in local_files
+            ]
+            for future in futures:
+                future.result()
+        progress.close()
         return s3_key
 
     def create_bucket(self, bucket_name: str, tags: dict = None) -> str:
@@ -155,23 +211,46 @@ class S3(BotoInterface):
         response = self.s3_client.delete_object(Bucket=bucket_name, Key=object_key)
         return response
 
-    def empty_bucket(self, bucket_name: str) -> dict:
+    def empty_bucket(self, bucket_name: str, max_workers: Optional[int] = 8) -> dict:
         """
-        Empty the s3 Bucket of all contents.
+        Empty the s3 Bucket of all contents. Every listing page of up to 1000
+        keys is deleted with one batched request and the requests run in parallel.
 
         Parameters
         ----------
         bucket_name : str
                 The AWS S3 BucketName that is to be emptied
+        max_workers : int, optional
+                Number of delete requests sent at the same time
+
+        Returns
+        -------
+        delete_objects_response : dict
+                Number of deleted objects and any per-key errors
         """
-        list_response = self.s3_client.list_objects(Bucket=bucket_name)
-        delete_objects_response = {}
-        if "Contents" in list_response:
-            bucket_contents = list_response["Contents"]
-            bucket_objects = [{"Key": record["Key"]} for record in bucket_contents]
-            delete_objects_response = self.s3_client.delete_objects(
-                Bucket=bucket_name, Delete={"Objects": bucket_objects, "Quiet": False},
+
+        def delete_page(keys: list) -> dict:
+            return self.s3_client.delete_objects(
+                Bucket=bucket_name, Delete={"Objects": keys, "Quiet": True},
+            )
+
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        futures = []
+        deleted_count = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for page in paginator.paginate(Bucket=bucket_name, PaginationConfig={"PageSize": 1000}):
+                bucket_objects = [{"Key": record["Key"]} for record in page.get("Contents", [])]
+                if bucket_objects:
+                    deleted_count += len(bucket_objects)
+                    futures.append(executor.submit(delete_page, bucket_objects))
+        errors = []
+        for future in futures:
+            errors.extend(future.result().get("Errors", []))
+        if errors:
+            raise Exception(
+                f"Failed to delete {len(errors)} objects from {bucket_name} - {errors[:5]}"
             )
+        delete_objects_response = {"DeletedCount": deleted_count, "Errors": errors}
         return delete_objects_response
 
     def destroy(self, bucket_name: str) -> dict:
@@ -191,11 +270,106 @@ class S3(BotoInterface):
         delete_bucket_response = self.s3_client.delete_bucket(Bucket=bucket_name)
         return delete_bucket_response
 
+    def get_object_digest(self, object_key: str) -> Optional[str]:
+        """
+        Get the sha256 content digest stored in the object metadata.
+
+        Parameters
+        ----------
+        object_key : str
+                Key of the object in the current bucket
+
+        Returns
+        -------
+        digest : str, optional
+                Stored digest or None if the object or the digest does not exist
+        """
+        try:
+            response = self.s3_client.head_object(
+                Bucket=self.s3_bucket_name, Key=object_key
+            )
+        except ClientError as error:
+            if error.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return response.get("Metadata", {}).get("sha256")
+
+    def upload_model_artifact(
+        self,
+        project_name: str,
+        source_path: str,
+        filename: str,
+        keep_history: Optional[bool] = True,
+    ) -> str:
+        """
+        Upload a model artifact addressed by the hash of its contents.
+        The bytes are stored once under `models/blobs/` and the model key read
+        by the service is a server-side copy of that blob, so unchanged models
+        are never uploaded again.
+
+        Parameters
+        ----------
+        project_name : str
+                Name of the current ML project/service
+        source_path : str
+                Local path of the serialized model
+        filename : str
+                Model key name within the project read by the service
+        keep_history : bool, optional
+                Whether to write a timestamped manifest pointing at the blob
+
+        Returns
+        -------
+        dest_path : str
+                S3 Path for the model read by the service
+        """
+        digest = file_hash(source_path)
+        dest_path = str(Path(str(project_name), str(filename)))
+        if self.get_object_digest(dest_path) == digest:
+            print(f"Model unchanged, skipping upload of {dest_path}")
+            return dest_path
+        suffix = "".join(Path(filename).suffixes)
+        blob_filename = f"models/blobs/{digest}{suffix}"
+        blob_path = str(Path(str(project_name), blob_filename))
+        metadata = {"sha256": digest}
+        if self.get_object_digest(blob_path) != digest:
+            self.upload_file(
+                filename=blob_filename,
+                project_name=project_name,
+                source_path=source_path,
+                extra_args={"Metadata": metadata},
+            )
+        self.s3_client.copy(
+            {"Bucket": self.s3_bucket_name, "Key": blob_path},
+            self.s3_bucket_name,
+            dest_path,
+            ExtraArgs={"Metadata": metadata, "MetadataDirective": "REPLACE"},
+            Config=UPLOAD_TRANSFER_CONFIG,
+        )
+        if keep_history:
+            _timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            _stem = Path(filename).name[: -len(suffix)] if suffix else Path(filename).name
+            manifest = {"key": blob_path, "sha256": digest, "created_at": _timestamp}
+            self.s3_client.put_object(
+                Body=json.dumps(manifest).encode("utf-8"),
+                Bucket=self.s3_bucket_name,
+                Key=str(Path(str(project_name), f"models/{_stem}_{_timestamp}{suffix}.json")),
+                Metadata=metadata,
+            )
+        return dest_path
+
     def upload_file(
-        self, filename: str, project_name: str, source_path: Optional[str] = ""
+        self,
+        filename: str,
+        project_name: str,
+        source_path: Optional[str] = "",
+        transfer_config: Optional[TransferConfig] = None,
+        callback: Optional[ProgressCallback] = None,
+        extra_args: Optional[dict] = None,
     ) -> str:
         """
-        Upload given file to S3 bucket
+        Upload given file to S3 bucket. Large files are sent as parallel
+        multipart uploads.
 
         Parameters
         ----------
@@ -205,6 +379,12 @@ class S3(BotoInterface):
                 Name of the current ML project/service 
         source_path : str, optional
                 Source path for the given file. Defaults to current directory
+        transfer_config : TransferConfig, optional
+                Multipart transfer settings. Defaults to UPLOAD_TRANSFER_CONFIG
+        callback : ProgressCallback, optional
+                Shared progress callback. If not passed the file gets its own progress bar
+        extra_args : dict, optional
+                Extra arguments for the upload such as object metadata
 
         Returns
         -------
@@ -215,16 +395,25 @@ class S3(BotoInterface):
         source_path = source_path if source_path != "" else Path(os.getcwd(), filename)
         dest_path = str(Path(str(project_name), str(filename)))
         source_size = os.stat(source_path).st_size
-        print("Uploading {0} ({1})..".format(dest_path, human_size(source_size)))
-        progress = tqdm(
-            total=float(os.path.getsize(source_path)), unit_scale=True, unit="B"
-        )
+        if not transfer_config:
+            if source_size < UPLOAD_TRANSFER_CONFIG.multipart_threshold:
+                transfer_config = SMALL_FILE_TRANSFER_CONFIG
+            else:
+                transfer_config = UPLOAD_TRANSFER_CONFIG
+        progress = None
+        if not callback:
+            print("Uploading {0} ({1})..".format(dest_path, human_size(source_size)))
+            progress = tqdm(total=float(source_size), unit_scale=True, unit="B")
+            callback = ProgressCallback(progress)
         self.s3_client.upload_file(
             str(source_path),
             str(self.s3_bucket_name),
             str(dest_path),
-            Callback=progress.update,
+            Callback=callback,
+            Config=transfer_config,
+            ExtraArgs=extra_args,
         )
-        progress.close()
+        if progress:
+            progress.close()
         return dest_path
 
@@ -0,0 +1,311 @@
+import re
+import json
+import base64
+from time import time
+from datetime import datetime
+from statistics import median
+from typing import Any, List, Optional
+from .aws_lambda import Lambda
+from .s3 import S3
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Memory sizes swept by default. 1769 MB is the size with one full vCPU
+DEFAULT_MEMORY_SIZES = [512, 1024, 1769, 2048, 3008]
+
+# x86 on-demand pricing in us-east-1
+PRICE_PER_GB_SECOND = 0.0000166667
+PRICE_PER_REQUEST = 0.20 / 1000000
+
+PREDICT_PATH = "/v1/models/predict"
+
+_REPORT_FIELDS = {
+    "duration": re.compile(r"\tDuration: ([\d.]+) ms"),
+    "billed_duration": re.compile(r"Billed Duration: ([\d.]+) ms"),
+    "memory_size": re.compile(r"Memory Size: (\d+) MB"),
+    "max_memory_used": re.compile(r"Max Memory Used: (\d+) MB"),
+    "init_duration": re.compile(r"Init Duration: ([\d.]+) ms"),
+}
+
+
+def parse_report(log_tail: str) -> dict:
+    """
+    Parse the REPORT line Lambda writes at the end of every invocation.
+
+    Parameters
+    ----------
+    log_tail : str
+            Decoded tail of the invocation log
+
+    Returns
+    -------
+    report : dict
+            Durations in milliseconds and memory sizes in MB. `init_duration`
+            is only present on a cold start
+    """
+    report = {}
+    for line in log_tail.splitlines():
+        if not line.startswith("REPORT"):
+            continue
+        for field, pattern in _REPORT_FIELDS.items():
+            match = pattern.search(line)
+            if match:
+                report[field] = float(match.group(1))
+    return report
+
+
+def api_gateway_event(payload: Any, path: Optional[str] = PREDICT_PATH, stage: Optional[str] = "dev") -> dict:
+    """
+    Wrap a prediction payload in the API Gateway proxy event the service receives.
+    """
+    return {
+        "resource": "/{proxy+}",
+        "path": path,
+        "httpMethod": "POST",
+        "headers": {"content-type": "application/json"},
+        "multiValueHeaders": {"content-type": ["application/json"]},
+        "queryStringParameters": None,
+        "multiValueQueryStringParameters": None,
+        "pathParameters": {"proxy": path.lstrip("/")},
+        "stageVariables": None,
+        "requestContext": {
+            "resourcePath": "/{proxy+}",
+            "httpMethod": "POST",
+            "path": f"/{stage}{path}",
+            "stage": stage,
+            "identity": {"sourceIp": "127.0.0.1"},
+        },
+        "body": json.dumps(payload),
+        "isBase64Encoded": False,
+    }
+
+
+def load_recorded_payloads(
+    s3: S3,
+    project_name: str,
+    limit: Optional[int] = 100,
+    since: Optional[datetime] = None,
+) -> List:
+    """
+    Read prediction payloads from the service prediction logs.
+
+    Log files are named after their creation time so they are listed oldest
+    first. Keys are paged through lazily and listing stops once `limit`
+    payloads are read.
+
+    Parameters
+    ----------
+    s3 : S3
+            S3 interface of the project bucket
+    project_name : str
+            Name of the current ML project/service
+    limit : int, optional
+            Maximum number of payloads to return
+    since : datetime, optional
+            Only read log files written after this time, e.g. to replay recent traffic
+    """
+    prefix = f"{project_name}/logs/predictions/"
+    kwargs = {"Bucket": s3.s3_bucket_name, "Prefix": prefix}
+    if since is not None:
+        kwargs["StartAfter"] = f"{prefix}predict-{since.isoformat()}"
+    paginator = s3.s3_client.get_paginator("list_objects_v2")
+    payloads = []
+    for page in paginator.paginate(**kwargs):
+        for s3_object in page.get("Contents", []):
+            body = s3.s3_client.get_object(Bucket=s3.s3_bucket_name, Key=s3_object["Key"])["Body"]
+            for line in body.read().decode("utf-8").splitlines():
+                if line.strip() == "":
+                    continue
+                payloads.append(parse_log_record(json.loads(line)))
+                if len(payloads) >= limit:
+                    return payloads
+    return payloads
+
+
+def parse_log_record(record: dict) -> Any:
+    """
+    Return the request payload of a prediction log record. Records hold the
+    response and the request, e.g.
+    {"created_at": ..., "data": {"prediction": ..., "data": payload}}
+    """
+    return record["data"]["data"]
+
+
+class LambdaTuner:
+    """
+    Find the Lambda memory size with the best cost and latency for a model by
+    replaying recorded payloads at a sweep of memory sizes.
+    """
+
+    def __init__(
+        self,
+        aws_lambda: Lambda,
+        function_name: str,
+        payloads: List,
+        memory_sizes: Optional[List[int]] = None,
+        invocations: Optional[int] = 20,
+        endpoint_url: Optional[str] = "",
+    ) -> None:
+        """
+        Parameters
+        ----------
+        aws_lambda : Lambda
+                Lambda interface used to configure and invoke the function
+        function_name : str
+                Name of the deployed function
+        payloads : list
+                Prediction payloads replayed in turn
+        memory_sizes : list, optional
+                Memory sizes in MB to try. Defaults to DEFAULT_MEMORY_SIZES
+        invocations : int, optional
+                Invocations per memory size, the first one being a cold start
+        endpoint_url : str, optional
+                Endpoint of a local Lambda runtime interface emulator. The
+                memory size cannot be changed there so only latency is measured
+        """
+        if len(payloads) == 0:
+            raise Exception("At least one payload is required to tune the function")
+        self.aws_lambda = aws_lambda
+        self.function_name = function_name
+        self.payloads = payloads
+        self.memory_sizes = memory_sizes if memory_sizes else DEFAULT_MEMORY_SIZES
+        self.invocations = invocations
+        self.endpoint_url = endpoint_url
+        self.results = []
+        self._emulator_client = None
+
+    def __repr__(self) -> str:
+        return f"LambdaTuner(function_name={self.function_name}, memory_sizes={self.memory_sizes})"
+
+    def __str__(self) -> str:
+        return f"LambdaTuner(function_name={self.function_name}, memory_sizes={self.memory_sizes})"
+
+    @property
+    def lambda_client(self) -> object:
+        if self.endpoint_url != "":
+            if self._emulator_client is None:
+                self._emulator_client = self.aws_lambda.boto_client.client(
+                    "lambda", endpoint_url=self.endpoint_url
+                )
+            return self._emulator_client
+        return self.aws_lambda.lambda_client
+
+    def invoke(self, payload: Any) -> dict:
+        """
+        Invoke the function once and return its REPORT timings.
+        """
+        started_at = time()
+        response = self.lambda_client.invoke(
+            FunctionName=self.function_name,
+            Payload=json.dumps(api_gateway_event(payload)).encode("utf-8"),
+            LogType="Tail",
+        )
+        elapsed = (time() - started_at) * 1000
+        body = json.loads(response["Payload"].read() or b"{}")
+        if response.get("FunctionError") or body.get("statusCode", 200) >= 400:
+            raise Exception(f"Invocation failed - {body}")
+        report = {}
+        if "LogResult" in response:
+            report = parse_report(base64.b64decode(response["LogResult"]).decode("utf-8"))
+        # The emulator sends no REPORT line so fall back to the client side latency
+        report.setdefault("duration", elapsed)
+        report.setdefault("billed_duration", elapsed)
+        return report
+
+    def measure(self, memory_size: int) -> dict:
+        """
+        Run the payloads at one memory size. Changing the configuration
+        replaces the execution environments so the first call is a cold start.
+        """
+        if self.endpoint_url == "":
+            self.aws_lambda.update_function_configuration(self.function_name, memory_size=memory_size)
+        reports = [
+            self.invoke(self.payloads[index % len(self.payloads)])
+            for index in range(self.invocations)
+        ]
+        cold = [report for report in reports if "init_duration" in report]
+        warm = [report for report in reports if "init_duration" not in report]
+        warm_durations = sorted(report["duration"] for report in warm) or [0.0]
+        billed = [report["billed_duration"] for report in reports]
+        average_billed = sum(billed) / len(billed)
+        cost_per_1k = 1000 * (
+            average_billed / 1000 * memory_size / 1024 * PRICE_PER_GB_SECOND + PRICE_PER_REQUEST
+        )
+        return {
+            "memory_size": memory_size,
+            "cold_start_ms": (
+                cold[0]["init_duration"] + cold[0]["duration"] if cold else None
+            ),
+            "warm_p50_ms": median(warm_durations),
+            "warm_p95_ms": warm_durations[min(len(warm_durations) - 1, int(len(warm_durations) * 0.95))],
+            "max_memory_used_mb": max(report.get("max_memory_used", 0) for report in reports),
+            "cost_per_1k": cost_per_1k,
+        }
+
+    @staticmethod
+    def best(results: List[dict], objective: Optional[str] = "cost", max_latency_ms: Optional[float] = None) -> dict:
+        """
+        Pick the best memory size.
+
+        Parameters
+        ----------
+        results : list
+                Measurements of every memory size
+        objective : str, optional
+                'cost' for the cheapest, 'latency' for the fastest warm p50 or
+                'balanced' for the lowest product of both
+        max_latency_ms : float, optional
+                Only consider sizes whose warm p95 is below this latency
+        """
+        candidates = results
+        if max_latency_ms is not None:
+            candidates = [result for result in results if result["warm_p95_ms"] <= max_latency_ms]
+            if not candidates:
+                candidates = results
+        keys = {
+            "cost": lambda result: result["cost_per_1k"],
+            "latency": lambda result: result["warm_p50_ms"],
+            "balanced": lambda result: result["cost_per_1k"] * result["warm_p50_ms"],
+        }
+        if objective not in keys:
+            raise Exception(f"Objective {objective} is unsupported. Please use one of {list(keys)}")
+        return min(candidates, key=keys[objective])
+
+    def format_results(self) -> str:
+        lines = [f"{'Memory':>8}  {'Cold start':>10}  {'Warm p50':>9}  {'Warm p95':>9}  {'Max used':>8}  {'$ per 1k':>10}"]
+        for result in self.results:
+            cold_start = f"{result['cold_start_ms']:.0f}ms" if result["cold_start_ms"] is not None else "-"
+            lines.append(
+                f"{result['memory_size']:>6}MB  {cold_start:>10}  {result['warm_p50_ms']:>7.1f}ms  "
+                f"{result['warm_p95_ms']:>7.1f}ms  {result['max_memory_used_mb']:>6.0f}MB  {result['cost_per_1k']:>10.6f}"
+            )
+        return "\n".join(lines)
+
+    def tune(
+        self,
+        objective: Optional[str] = "cost",
+        max_latency_ms: Optional[float] = None,
+        apply: Optional[bool] = True,
+    ) -> dict:
+        """
+        Sweep the memory sizes, print the measurements and apply the best setting.
+
+        Returns
+        -------
+        best : dict
+                Measurements of the selected memory size
+        """
+        self.results = []
+        for memory_size in self.memory_sizes:
+            print(f"Measuring {self.function_name} at {memory_size}MB...")
+            self.results.append(self.measure(memory_size))
+        print(self.format_results())
+        best = self.best(self.results, objective=objective, max_latency_ms=max_latency_ms)
+        print(f"Best memory size for {objective}: {best['memory_size']}MB")
+        if apply and self.endpoint_url == "":
+            self.aws_lambda.update_function_configuration(
+                self.function_name, memory_size=best["memory_size"]
+            )
+            print(f"Updated {self.function_name} to {best['memory_size']}MB")
+        return best
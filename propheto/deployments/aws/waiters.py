@@ -0,0 +1,128 @@
+import math
+import random
+from time import sleep, monotonic
+from typing import Any, Callable, Optional
+from botocore.exceptions import WaiterError
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def backoff_delays(
+    initial_delay: float = 1.0,
+    max_delay: float = 15.0,
+    multiplier: float = 2.0,
+    jitter: float = 0.5,
+):
+    """
+    Generate exponentially increasing delays with random jitter.
+
+    Parameters
+    ----------
+    initial_delay : float, optional
+                Delay in seconds before the first retry.
+    max_delay : float, optional
+                Upper bound in seconds for a single delay.
+    multiplier : float, optional
+                Factor the delay grows by after every attempt.
+    jitter : float, optional
+                Fraction of each delay that is randomised so concurrent
+                pollers do not call the API in lock step.
+    """
+    delay = initial_delay
+    while True:
+        capped = min(delay, max_delay)
+        yield capped * (1 - jitter) + random.uniform(0, capped * jitter)
+        delay *= multiplier
+
+
+def poll(
+    check: Callable[[], Any],
+    is_done: Callable[[Any], bool],
+    timeout: float = 600,
+    initial_delay: float = 1.0,
+    max_delay: float = 15.0,
+    multiplier: float = 2.0,
+    jitter: float = 0.5,
+    description: Optional[str] = "resource",
+) -> Any:
+    """
+    Call `check` with exponential backoff until `is_done` accepts its result
+    or the overall deadline passes.
+
+    Parameters
+    ----------
+    check : Callable
+                Function returning the current state of the resource.
+    is_done : Callable
+                Function returning True once the state is final.
+    timeout : float, optional
+                Overall deadline in seconds for the wait.
+    initial_delay : float, optional
+                Delay in seconds before the second check.
+    max_delay : float, optional
+                Upper bound in seconds for a single delay.
+    multiplier : float, optional
+                Factor the delay grows by after every check.
+    jitter : float, optional
+                Fraction of each delay that is randomised.
+    description : str, optional
+                Name of what is waited on for the timeout message.
+
+    Returns
+    -------
+    result : Any
+                Final result of `check`.
+    """
+    deadline = monotonic() + timeout
+    delays = backoff_delays(
+        initial_delay=initial_delay,
+        max_delay=max_delay,
+        multiplier=multiplier,
+        jitter=jitter,
+    )
+    while True:
+        result = check()
+        if is_done(result):
+            return result
+        remaining = deadline - monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Timed out after {timeout}s waiting for {description}")
+        sleep(min(next(delays), remaining))
+
+
+def wait_for(
+    client: object,
+    waiter_name: str,
+    timeout: float = 600,
+    delay: float = 2,
+    description: Optional[str] = "resource",
+    **kwargs,
+) -> None:
+    """
+    Block on a boto3 waiter with an overall deadline instead of the waiter
+    default attempt count.
+
+    Parameters
+    ----------
+    client : object
+                boto3 client providing the waiter.
+    waiter_name : str
+                Name of the waiter, e.g. 'function_active'.
+    timeout : float, optional
+                Overall deadline in seconds for the wait.
+    delay : float, optional
+                Seconds between waiter checks.
+    description : str, optional
+                Name of what is waited on for error messages.
+    kwargs
+                Arguments passed to the waiter's API call.
+    """
+    waiter = client.get_waiter(waiter_name)
+    max_attempts = max(1, math.ceil(timeout / delay))
+    try:
+        waiter.wait(WaiterConfig={"Delay": delay, "MaxAttempts": max_attempts}, **kwargs)
+    except WaiterError as error:
+        if "Max attempts exceeded" in str(error):
+            raise TimeoutError(f"Timed out after {timeout}s waiting for {description}")
+        raise Exception(f"Failed waiting for {description} - {error}")
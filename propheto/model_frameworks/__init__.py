@@ -1 +1,12 @@
-# TODO: PUT MODEL FRAMEWORK CLASSES HERE
+"""
+Framework adapters save, load and run the models of each supported ML library.
+The package has no dependency on the rest of propheto as the generated service
+ships a copy of it.
+"""
+from .base import FrameworkAdapter
+from .registry import ModelRegistry
+
+# Importing the adapters registers them, the frameworks are imported on use
+from . import sklearn, pytorch, tensorflow, xgboost
+
+__all__ = ["FrameworkAdapter", "ModelRegistry"]
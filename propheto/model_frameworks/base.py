@@ -0,0 +1,121 @@
+from pathlib import Path
+from typing import Any, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class FrameworkAdapter:
+    """
+    Save, load and run the models of one ML framework.
+
+    Adapters run in-process in the client, to save models, and in the generated
+    service, which ships a copy of this package, to load and run them. They only
+    import their framework inside methods so that registering every adapter
+    never imports a framework.
+    """
+
+    # Model type of the framework, e.g. 'sklearn'
+    name = ""
+    # Top level modules the model classes of the framework are defined in
+    module_names = []
+    # Top level module imported by the adapter, defaults to the first module name
+    framework = ""
+
+    def __init__(self, **options) -> None:
+        """
+        Parameters
+        ----------
+        options : dict, optional
+                Settings needed to load a saved model, as set by `save`
+        """
+        self.options = dict(options)
+        self.threads = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(name={self.name}, options={self.options})"
+
+    def __str__(self) -> str:
+        return f"{type(self).__name__}(name={self.name}, options={self.options})"
+
+    def configure(self, threads: Optional[int] = None) -> None:
+        """
+        Apply runtime settings before the model is loaded.
+
+        Parameters
+        ----------
+        threads : int, optional
+                Number of threads the framework uses for one prediction
+        """
+        self.threads = threads
+
+    def is_model(self, model: object) -> bool:
+        """
+        Check the model belongs to the framework. Only called once the
+        framework is imported so it may import it again for free.
+        """
+        return False
+
+    def save(self, model: object, save_path: str) -> Path:
+        """
+        Serialize the model into the directory and return the file path
+        """
+        raise NotImplementedError
+
+    def load(self, model_path: str) -> object:
+        """
+        Load the model saved by `save` from a local file
+        """
+        raise NotImplementedError
+
+    def preprocess_batch(self, rows: List) -> Any:
+        """
+        Build the model input for a list of input rows
+        """
+        import numpy as np
+
+        return np.asarray(rows)
+
+    def predict_on_batch(self, model: object, batch: Any) -> Any:
+        return model.predict(batch)
+
+    def postprocess_batch(self, pred: Any) -> list:
+        """
+        Convert the model output into one JSON serializable prediction per row
+        """
+        return pred.tolist()
+
+    def predict_batch(self, model: object, rows: List) -> list:
+        """
+        Run one vectorized prediction over a batch of input rows and return
+        one prediction per row.
+        """
+        if len(rows) == 0:
+            return []
+        batch = self.preprocess_batch(rows)
+        pred = self.predict_on_batch(model, batch)
+        return self.postprocess_batch(pred)
+
+    def single_prediction(self, pred: Any) -> Any:
+        """
+        Response of a request holding a single row, the row prediction by default
+        """
+        return pred
+
+    def predict(self, model: object, data: List) -> Any:
+        """
+        Predict a request holding either a single row or a list of rows
+        """
+        rows = data if len(data) > 0 and isinstance(data[0], list) else [data]
+        preds = self.predict_batch(model, rows)
+        return self.single_prediction(preds[0]) if len(preds) == 1 else preds
+
+
+def flatten_rows(pred: Any) -> list:
+    """
+    One prediction per row, single output models return scalars
+    """
+    import numpy as np
+
+    pred = np.asarray(pred).reshape(len(pred), -1).tolist()
+    return [row[0] if len(row) == 1 else row for row in pred]
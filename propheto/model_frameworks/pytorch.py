@@ -0,0 +1,83 @@
+from pathlib import Path
+from typing import Any, List, Optional
+from .base import FrameworkAdapter, flatten_rows
+from .registry import ModelRegistry
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@ModelRegistry.register
+class PytorchAdapter(FrameworkAdapter):
+    """
+    PyTorch modules saved as TorchScript, or pickled with cloudpickle when
+    TorchScript cannot compile them.
+    """
+
+    name = "pytorch"
+    module_names = ["torch"]
+
+    def configure(self, threads: Optional[int] = None) -> None:
+        super().configure(threads)
+        if threads:
+            import torch
+
+            torch.set_num_threads(threads)
+
+    def is_model(self, model: object) -> bool:
+        import torch
+
+        return isinstance(model, torch.nn.modules.module.Module)
+
+    def save(self, model: object, save_path: str) -> Path:
+        """
+        Save the model as TorchScript, which loads without the model class code.
+        """
+        import torch
+
+        try:
+            scripted_model = torch.jit.script(model)
+            file_path_dst = Path(save_path, "model.pt")
+            torch.jit.save(scripted_model, str(file_path_dst))
+        except Exception:
+            logger.debug("TorchScript compilation failed, pickling the model", exc_info=True)
+            import cloudpickle
+
+            file_path_dst = Path(save_path, "model.pth")
+            with open(file_path_dst, "wb") as model_file:
+                cloudpickle.dump(model, model_file)
+        return file_path_dst
+
+    def load(self, model_path: str) -> object:
+        if str(model_path).endswith(".pt"):
+            import torch
+
+            model = torch.jit.load(str(model_path), map_location="cpu")
+        else:
+            import cloudpickle
+
+            with open(model_path, "rb") as model_file:
+                model = cloudpickle.load(model_file)
+        # Dropout and batch norm layers behave differently while training
+        model.eval()
+        return model
+
+    def preprocess_batch(self, rows: List) -> Any:
+        import torch
+
+        return torch.tensor(rows)
+
+    def predict_on_batch(self, model: object, batch: Any) -> Any:
+        import torch
+
+        # inference_mode skips the autograd bookkeeping no_grad still does
+        no_grad = getattr(torch, "inference_mode", torch.no_grad)
+        with no_grad():
+            return model(batch)
+
+    def postprocess_batch(self, pred: Any) -> list:
+        return flatten_rows(pred.detach().cpu().numpy())
+
+    def single_prediction(self, pred: Any) -> Any:
+        # Single row predictions have always been returned as a one element list
+        return pred if isinstance(pred, list) else [pred]
@@ -1,3 +1,6 @@
+import sys
+from typing import List, Optional
+from .base import FrameworkAdapter
 import logging
 
 logger = logging.getLogger(__name__)
@@ -5,8 +8,71 @@ logger = logging.getLogger(__name__)
 
 class ModelRegistry:
     """
-    Model registry for storing the model objects.
+    Lookup of the framework adapters by model type.
     """
 
-    def __init__(self, project_name: str) -> None:
-        self.project_name = project_name
+    # Adapter classes in registration order, keyed by model type
+    adapters = {}
+
+    @classmethod
+    def register(cls, adapter: type) -> type:
+        """
+        Register an adapter class, can be used as a class decorator.
+
+        Parameters
+        ----------
+        adapter : type
+                FrameworkAdapter subclass with a unique `name`
+        """
+        if not issubclass(adapter, FrameworkAdapter):
+            raise Exception(f"{adapter} is not a FrameworkAdapter")
+        if adapter.name == "" or not adapter.module_names:
+            raise Exception(f"Adapter {adapter} needs a name and module names")
+        cls.adapters[adapter.name] = adapter
+        return adapter
+
+    @classmethod
+    def unregister(cls, name: str) -> None:
+        cls.adapters.pop(name, None)
+
+    @classmethod
+    def names(cls) -> List[str]:
+        return list(cls.adapters)
+
+    @classmethod
+    def get(cls, name: str) -> type:
+        """
+        Return the adapter class of a model type
+        """
+        if name not in cls.adapters:
+            raise Exception(
+                f"Model type {name} is unsupported. Please use one of {cls.names()}"
+            )
+        return cls.adapters[name]
+
+    @classmethod
+    def create(cls, name: str, **options) -> FrameworkAdapter:
+        """
+        Return a new adapter instance of a model type
+        """
+        return cls.get(name)(**options)
+
+    @classmethod
+    def detect(cls, model: object) -> Optional[str]:
+        """
+        Determine the model type from the modules of the model class
+        hierarchy. Classes are visited in method resolution order so a
+        subclass from one library wins over the base class of another, e.g.
+        an XGBoost estimator is not reported as a Scikit-learn one. Frameworks
+        are never imported, an adapter is only asked once its framework is loaded.
+        """
+        for klass in type(model).__mro__:
+            module_name = (klass.__module__ or "").split(".")[0]
+            for adapter in cls.adapters.values():
+                if module_name not in adapter.module_names:
+                    continue
+                if (adapter.framework or adapter.module_names[0]) not in sys.modules:
+                    continue
+                if adapter().is_model(model):
+                    return adapter.name
+        return None
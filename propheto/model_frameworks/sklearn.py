@@ -0,0 +1,50 @@
+from pathlib import Path
+from typing import Optional
+from .base import FrameworkAdapter
+from .registry import ModelRegistry
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@ModelRegistry.register
+class SklearnAdapter(FrameworkAdapter):
+    """
+    Scikit-learn estimators saved as uncompressed joblib files.
+    """
+
+    name = "sklearn"
+    module_names = ["sklearn"]
+
+    def configure(self, threads: Optional[int] = None) -> None:
+        super().configure(threads)
+        if threads:
+            try:
+                from threadpoolctl import threadpool_limits
+
+                # Caps the BLAS and OpenMP pools used by the estimators
+                threadpool_limits(limits=threads)
+            except ImportError:  # module not found
+                logger.debug("threadpoolctl is not installed, not limiting threads")
+
+    def is_model(self, model: object) -> bool:
+        import sklearn.base
+
+        return isinstance(model, sklearn.base.BaseEstimator)
+
+    def save(self, model: object, save_path: str) -> Path:
+        """
+        Save the model uncompressed so the numpy arrays can be memory-mapped when loaded.
+        """
+        import joblib
+
+        file_path_dst = Path(save_path, "model.joblib")
+        joblib.dump(model, file_path_dst, compress=0)
+        return file_path_dst
+
+    def load(self, model_path: str) -> object:
+        import joblib
+
+        # numpy arrays of uncompressed joblib files are memory-mapped, not
+        # copied. joblib also reads plain pickle files
+        return joblib.load(str(model_path), mmap_mode="r")
@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+from typing import Any, Optional
+from .base import FrameworkAdapter, flatten_rows
+from .registry import ModelRegistry
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@ModelRegistry.register
+class TensorflowAdapter(FrameworkAdapter):
+    """
+    Keras models saved to HDF5.
+    """
+
+    name = "tensorflow"
+    # Keras classes live in `keras` or `tf_keras` depending on the TensorFlow release
+    module_names = ["tensorflow", "keras", "tf_keras"]
+    framework = "tensorflow"
+
+    def configure(self, threads: Optional[int] = None) -> None:
+        super().configure(threads)
+        if threads:
+            import tensorflow as tf
+
+            try:
+                tf.config.threading.set_intra_op_parallelism_threads(threads)
+                tf.config.threading.set_inter_op_parallelism_threads(1)
+            except RuntimeError:
+                # Thread pools are fixed once the runtime is initialized
+                logger.warning("TensorFlow is already initialized, not limiting threads")
+
+    def is_model(self, model: object) -> bool:
+        import tensorflow as tf
+
+        # Functional and subclassed models are Models too, not only Sequential.
+        # Keras 3 and tf_keras models are not `tf.keras` ones depending on
+        # which one `tf.keras` resolves to, so any loaded Keras is checked.
+        model_classes = [tf.keras.Model]
+        for module_name in self.module_names[1:]:
+            if module_name in sys.modules:
+                model_classes.append(getattr(sys.modules[module_name], "Model", None))
+        return any(
+            isinstance(model, model_class) for model_class in model_classes if isinstance(model_class, type)
+        )
+
+    def save(self, model: object, save_path: str) -> Path:
+        # The '.h5' extension indicates that the model should be saved to HDF5.
+        file_path_dst = Path(save_path, "model.h5")
+        model.save(file_path_dst)
+        return file_path_dst
+
+    def load(self, model_path: str) -> object:
+        # https://stackoverflow.com/questions/47847942/load-keras-model-with-aws-lambda
+        import tensorflow as tf
+
+        return tf.keras.models.load_model(str(model_path))
+
+    def predict_on_batch(self, model: object, batch: Any) -> Any:
+        # Unlike `predict`, runs the batch in one step without a progress bar
+        return model.predict_on_batch(batch)
+
+    def postprocess_batch(self, pred: Any) -> list:
+        return flatten_rows(pred)
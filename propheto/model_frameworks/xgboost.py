@@ -0,0 +1,58 @@
+from pathlib import Path
+from typing import Any
+from .base import FrameworkAdapter
+from .registry import ModelRegistry
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@ModelRegistry.register
+class XgboostAdapter(FrameworkAdapter):
+    """
+    XGBoost estimators saved through `save_model`. The name of the estimator
+    class is kept in the `model_class` option to recreate it when loading.
+    """
+
+    name = "xgboost"
+    module_names = ["xgboost"]
+
+    def is_model(self, model: object) -> bool:
+        import xgboost as xgb
+
+        return isinstance(model, xgb.XGBModel)
+
+    def save(self, model: object, save_path: str) -> Path:
+        """
+        Save the model in the native binary JSON format, or JSON for releases before 1.6.
+        """
+        import xgboost
+
+        self.options["model_class"] = next(
+            klass.__name__
+            for klass in type(model).__mro__
+            if klass.__module__.split(".")[0] == "xgboost"
+        )
+        version = tuple(int(part) for part in xgboost.__version__.split(".")[:2])
+        file_path_dst = Path(save_path, "model.ubj" if version >= (1, 6) else "model.json")
+        model.save_model(str(file_path_dst))
+        return file_path_dst
+
+    def load(self, model_path: str) -> object:
+        if str(model_path).endswith((".ubj", ".json")):
+            import xgboost
+
+            model = getattr(xgboost, self.options.get("model_class", "XGBModel"))()
+            model.load_model(str(model_path))
+        else:
+            import cloudpickle
+
+            with open(model_path, "rb") as model_file:
+                model = cloudpickle.load(model_file)
+        if self.threads:
+            model.set_params(n_jobs=self.threads)
+        return model
+
+    def single_prediction(self, pred: Any) -> Any:
+        # Single row predictions have always been returned as a one element list
+        return pred if isinstance(pred, list) else [pred]
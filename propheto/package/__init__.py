@@ -4,4 +4,7 @@ from .service import APIService
 # from .cloud_formation import CloudFormationTemplate
 from .environment import VirtualEnvironment, ContainerEnvironment
 from .models import ModelSerializer
-from .introspect import CodeIntrospect
+from propheto.utilities import lazy_attributes
+
+# IPython is only imported when code introspection is used
+__getattr__ = lazy_attributes(globals(), {"CodeIntrospect": ".introspect"})
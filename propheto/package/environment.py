@@ -3,6 +3,7 @@ import os
 import pathlib
 import inspect
 import signal
+import shutil
 import subprocess
 import logging
 from typing import Optional
@@ -21,6 +22,7 @@ env:
   shell: bash
   variables:
     DOCKER_FILE_NAME: 'Dockerfile'
+    DOCKER_BUILDKIT: '1'
     CONTAINER_TO_RELEASE_NAME: 'propheto-ml'
     REPOSITORY_URI: '%{{AWS_ACCOUNT_ID}}%.dkr.ecr.%{{AWS_REGION}}%.amazonaws.com/%{{AWS_ECR}}%'
 
@@ -39,10 +41,15 @@ phases:
       - COMMIT_HASH=$(echo $CODEBUILD_RESOLVED_SOURCE_VERSION | cut -c 1-7)
       - IMAGE_TAG=${COMMIT_HASH:=latest}
       - echo CODEBUILD VERSION $CODEBUILD_RESOLVED_SOURCE_VERSION
+      # With build caching on, seed the layer cache from the previous images
+      - if [ "$PROPHETO_BUILD_CACHE" = "1" ]; then docker pull $REPOSITORY_URI:builder || true; docker pull $REPOSITORY_URI:latest || true; fi
   build:
     commands:
       - echo "Starting Docker build `date` in `pwd`"
-      - docker build -t $REPOSITORY_URI:latest -f $DOCKER_FILE_NAME .
+      # The dependency stage only changes with requirements.txt so it is built
+      # and tagged on its own and served from the docker layer cache afterwards
+      - docker build --target builder -t $REPOSITORY_URI:builder --build-arg BUILDKIT_INLINE_CACHE=1 --cache-from $REPOSITORY_URI:builder -f $DOCKER_FILE_NAME .
+      - docker build -t $REPOSITORY_URI:latest --build-arg BUILDKIT_INLINE_CACHE=1 --cache-from $REPOSITORY_URI:builder --cache-from $REPOSITORY_URI:latest -f $DOCKER_FILE_NAME .
       - docker tag $REPOSITORY_URI:latest $REPOSITORY_URI:$IMAGE_TAG
   post_build:
     commands:
@@ -51,6 +58,7 @@ phases:
       - docker push "${REPOSITORY_URI}:latest"
       - echo "Pushing to image uri $IMAGE_URI"
       - docker push $REPOSITORY_URI:$IMAGE_TAG
+      - if [ "$PROPHETO_BUILD_CACHE" = "1" ]; then docker push $REPOSITORY_URI:builder; fi
       - echo "--------BUILD DONE.--------"
 
 cache:
@@ -59,17 +67,49 @@ cache:
 
 
 # FROM public.ecr.aws/lambda/python:3.8
+# Layers are ordered from least to most frequently changed: dependencies are
+# installed, stripped and compiled in a builder stage keyed only on
+# requirements.txt, then the model and finally the service code are copied.
+# Only the service files are copied into the final stage, leaving the build
+# files out of the runtime image
 DOCKERFILE_TEXT = f"""# LAMBDA ECR
-FROM public.ecr.aws/lambda/python:{PYTHON_VERSION_NUMBER}
+FROM public.ecr.aws/lambda/python:{PYTHON_VERSION_NUMBER} AS builder
+
+RUN yum install -y binutils && yum clean all
+
+COPY requirements.txt .
 
-RUN /var/lang/bin/python{PYTHON_VERSION_NUMBER} -m pip install --upgrade pip
+RUN /var/lang/bin/python{PYTHON_VERSION_NUMBER} -m pip install --no-cache-dir --upgrade pip && \\
+    pip install --no-cache-dir --target /opt/packages -r requirements.txt
 
-COPY . .
+RUN find /opt/packages -type d \\( -name tests -o -name __pycache__ \\) -prune -exec rm -rf {{}} + && \\
+    find /opt/packages -name "*.so*" -type f -exec strip --strip-debug {{}} + ; \\
+    python -m compileall -q /opt/packages
+
+FROM public.ecr.aws/lambda/python:{PYTHON_VERSION_NUMBER}
 
-RUN pip install -r requirements.txt 
+COPY --from=builder /opt/packages ${{LAMBDA_TASK_ROOT}}
+%{{MODEL_LAYER}}%
+COPY main.py ${{LAMBDA_TASK_ROOT}}/
+COPY v1 ${{LAMBDA_TASK_ROOT}}/v1
+COPY model_frameworks ${{LAMBDA_TASK_ROOT}}/model_frameworks
+
+RUN python -m compileall -q ${{LAMBDA_TASK_ROOT}}
 
 CMD ["main.handler"]"""
 
+# Keep build files and caches out of the build context. requirements.txt stays
+# in it as the builder stage installs from it
+DOCKERIGNORE_TEXT = """Dockerfile
+.dockerignore
+buildspec.yml
+**/__pycache__
+**/*.pyc
+env
+.env
+venv
+.venv"""
+
 ## SKLEARN
 SKLEARN_REQUIREMENTS_TEXT = """asgiref==3.4.1
 boto3==1.17.112
@@ -176,7 +216,7 @@ six==1.16.0
 starlette==0.14.2
 typing-extensions==3.10.0.2
 urllib3==1.26.6
-xgboost==1.4.2
+xgboost==1.6.2
 scikit-learn==0.24.2"""
 
 
@@ -186,6 +226,7 @@ class EnvironmentBase:
     """
 
     docker = DOCKERFILE_TEXT
+    dockerignore = DOCKERIGNORE_TEXT
     sklearn_requirements = SKLEARN_REQUIREMENTS_TEXT
     pytorch_requirements = PYTORCH_REQUIREMENTS_TEXT
     tensorflow_requirements = TENSORFLOW_REQUIREMENTS_TEXT
@@ -195,6 +236,74 @@ class EnvironmentBase:
     def __init__(self) -> None:
         pass
 
+    def write_requirements(
+        self,
+        file_directory: str,
+        model_type: Optional[str] = "sklearn",
+        requirements_txt: Optional[str] = "",
+        extra_requirements: Optional[list] = None,
+    ) -> None:
+        """
+        Write the requirements.txt of the model framework
+
+        Parameters
+        ----------
+        file_directory : str
+                Directory the requirements.txt is written to
+        model_type : str, optional
+                Model framework used to pick the requirements
+        requirements_txt : str, optional
+                Custom requirements, currently unsupported
+        extra_requirements : list, optional
+                Requirements added to the ones of the model framework
+        """
+        with open(Path(file_directory, "requirements.txt"), "w") as requirements_file:
+            if requirements_txt == "":
+                if model_type == "sklearn":
+                    requirements_file.write(self.sklearn_requirements)
+                elif model_type == "pytorch":
+                    requirements_file.write(self.pytorch_requirements)
+                elif model_type == "tensorflow":
+                    requirements_file.write(self.tensorflow_requirements)
+                elif model_type == "xgboost":
+                    requirements_file.write(self.xgboost_requirements)
+                for requirement in extra_requirements if extra_requirements else []:
+                    requirements_file.write(f"\n{requirement}")
+            else:
+                raise Exception(
+                    "Model type {model_type} is unsupported. Please use a different model type."
+                )
+                # requirements_file.write(requirements_txt)
+
+    def generate_dockerfile(self, file_directory: str, model_path: Optional[str] = "") -> None:
+        """
+        Write the Dockerfile and .dockerignore into the build directory.
+
+        Parameters
+        ----------
+        file_directory : str
+                Docker build context directory
+        model_path : str, optional
+                Serialized model to bake into its own image layer
+        """
+        model_layer = ""
+        if model_path != "":
+            # The model sits in its own directory of the build context, which
+            # only the model layer copies, so code changes never rebuild it
+            model_filename = Path(model_path).name
+            model_directory = Path(file_directory, "model")
+            model_directory.mkdir(parents=True, exist_ok=True)
+            if Path(model_path).resolve() != Path(model_directory, model_filename).resolve():
+                shutil.copyfile(model_path, Path(model_directory, model_filename))
+            model_layer = (
+                f"\nCOPY model/{model_filename} ${{LAMBDA_TASK_ROOT}}/model/{model_filename}\n"
+                f"ENV PROPHETO_MODEL_PATH=/var/task/model/{model_filename}\n"
+            )
+        with open(Path(file_directory, "Dockerfile"), "w") as docker_file:
+            docker_file.write(self.docker.replace("%{MODEL_LAYER}%", model_layer))
+        with open(Path(file_directory, ".dockerignore"), "w") as dockerignore_file:
+            dockerignore_file.write(self.dockerignore)
+
 
 class VirtualEnvironment(EnvironmentBase):
     """
@@ -279,6 +388,7 @@ class VirtualEnvironment(EnvironmentBase):
         file_directory: Optional[str] = "",
         model_type: Optional[str] = "sklearn",
         requirements_txt: Optional[str] = "",
+        extra_requirements: Optional[list] = None,
     ) -> str:
         """
         Parent method to generate the environment.
@@ -286,24 +396,11 @@ class VirtualEnvironment(EnvironmentBase):
         self.create_environment(name)
         file_directory = file_directory if file_directory != "" else self.environment_directory
         print("Creating Dockerfile...")
-        with open(Path(file_directory, "Dockerfile"), "w") as docker_file:
-            docker_file.write(self.docker)
+        self.generate_dockerfile(file_directory)
         print("Creating requirements...")
-        with open(Path(file_directory, "requirements.txt"), "w") as requirements_file:
-            if requirements_txt == "":
-                if model_type == "sklearn":
-                    requirements_file.write(self.sklearn_requirements)
-                elif model_type == "pytorch":
-                    requirements_file.write(self.pytorch_requirements)
-                elif model_type == "tensorflow":
-                    requirements_file.write(self.tensorflow_requirements)
-                elif model_type == "xgboost":
-                    requirements_file.write(self.xgboost_requirements)
-            else:
-                raise Exception(
-                    "Model type {model_type} is unsupported. Please use a different model type."
-                )
-                # requirements_file.write(requirements_txt)
+        self.write_requirements(
+            file_directory, model_type, requirements_txt, extra_requirements
+        )
         self.install_packages()
         return self.environment
 
@@ -326,30 +423,38 @@ class ContainerEnvironment(EnvironmentBase):
         region: str = "us-east-1",
         model_type: str = "sklearn",
         requirements_txt: str = "",
+        model_path: str = "",
+        extra_requirements: Optional[list] = None,
     ) -> str:
         """
         Generate the container environment.
+
+        Parameters
+        ----------
+        file_directory : str
+                Docker build context directory
+        ecr_repo : str
+                ECR repository the image is pushed to
+        aws_account_id : str
+                AWS account of the ECR repository
+        region : str, optional
+                AWS region of the ECR repository
+        model_type : str, optional
+                Model framework used to pick the requirements
+        requirements_txt : str, optional
+                Custom requirements, currently unsupported
+        model_path : str, optional
+                Serialized model to bake into the image
+        extra_requirements : list, optional
+                Requirements added to the ones of the model framework
         """
         # TODO: REMOVE AWS REGION
         print("Creating Dockerfile...")
-        with open(Path(file_directory, "Dockerfile"), "w") as docker_file:
-            docker_file.write(self.docker)
+        self.generate_dockerfile(file_directory, model_path=model_path)
         print("Creating requirements...")
-        with open(Path(file_directory, "requirements.txt"), "w") as requirements_file:
-            if requirements_txt == "":
-                if model_type == "sklearn":
-                    requirements_file.write(self.sklearn_requirements)
-                elif model_type == "pytorch":
-                    requirements_file.write(self.pytorch_requirements)
-                elif model_type == "tensorflow":
-                    requirements_file.write(self.tensorflow_requirements)
-                elif model_type == "xgboost":
-                    requirements_file.write(self.xgboost_requirements)
-            else:
-                raise Exception(
-                    "Model type {model_type} is unsupported. Please use a different model type."
-                )
-                # requirements_file.write(requirements_txt)
+        self.write_requirements(
+            file_directory, model_type, requirements_txt, extra_requirements
+        )
         print("Creating buildspec...")
         with open(Path(file_directory, "buildspec.yml"), "w") as buildspec_file:
             buildspec_yaml = self.buildspec.replace(
@@ -1,28 +1,47 @@
 import os
-import pickle
+import shutil
 from datetime import datetime
 from time import time
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 import logging
 from pathlib import Path
+from ..utilities import human_size
+from ..model_frameworks import ModelRegistry
 
 logger = logging.getLogger(__name__)
 
 
 ## ---- GENERAL ----
 READ_MODEL_LOCAL = """
-    with open('%{model_filepath}%', 'rb') as model_file:
-        body = model_file.read()
+    model_path = local_model_path('%{model_filepath}%')
 """ 
 
 
 READ_MODEL_AWS = """
-    s3client = boto3.client("s3")
-    response = s3client.get_object(Bucket="%{bucket_name}%", Key="%{object_key}%")
-    body = response["Body"].read()
+    model_path = os.environ.get("PROPHETO_MODEL_PATH", "")
+    if model_path:
+        # Model baked into the image at build time
+        model_path = local_model_path(model_path)
+    else:
+        model_path = fetch_model(get_s3_client(), "%{bucket_name}%", "%{object_key}%")
 """ 
 
 
+MODEL_VERSION_LOCAL = """
+    version = str(os.path.getmtime('%{model_filepath}%'))
+"""
+
+
+MODEL_VERSION_AWS = """
+    # A model baked into the image never changes
+    version = os.environ.get("PROPHETO_MODEL_PATH", "")
+    if not version:
+        s3client = get_s3_client()
+        response = s3client.head_object(Bucket="%{bucket_name}%", Key="%{object_key}%")
+        version = response["ETag"]
+"""
+
+
 LIST_MODEL_LOCAL = """
     logs_path = '%{logs_path}%'
     response = os.listdir(logs_path)
@@ -30,34 +49,42 @@ LIST_MODEL_LOCAL = """
 
 
 LIST_MODEL_AWS = """
-    s3client = boto3.client("s3")
-    delimiter = f"{model_name}*" if model_name != "current" else "*"
-    response = s3client.list_objects(Bucket="%{bucket_name}%", Delimiter=delimiter)
-    response = response['Contents']
+    s3client = get_s3_client()
+    if model_name != "current":
+        prefix = f"%{project_name}%/models/{model_name}"
+        entries = iter_s3_objects(s3client, "%{bucket_name}%", prefix, continuation_token)
+    else:
+        # The served model key sits next to the models/ folder of the blobs
+        # and manifests, list both in key order so pagination still works
+        entries = (
+            entry
+            for entry in iter_s3_objects(
+                s3client, "%{bucket_name}%", "%{project_name}%/model", continuation_token
+            )
+            if entry["Key"] == "%{object_key}%" or entry["Key"].startswith("%{project_name}%/models/")
+        )
+    response = stream_listing(entries, limit=limit)
 """
 
 
 LIST_LOGS_AWS = """
-    s3client = boto3.client("s3")
-    delimiter = q if q else "*propheto-log-*"
-    prefix = "%{project_name}%/logs"
-    response = s3client.list_objects(
-        Bucket="%{bucket_name}%", Prefix=prefix, Delimiter=delimiter
-    )
-    if "Contents" not in response:
-        response['message'] = response
-    else:
-        response = response["Contents"]
+    s3client = get_s3_client()
+    log_base = "%{project_name}%/logs"
+    prefix = f"{log_base}/{prefix}" if prefix else log_base
+    entries = iter_s3_objects(s3client, "%{bucket_name}%", prefix, continuation_token)
+    response = stream_listing(entries, limit=limit, q=q, since=since, until=until)
 """
 
 
 GET_LOGS_AWS = """
-    s3client = boto3.client("s3")
+    s3client = get_s3_client()
     try:
         response = s3client.get_object(Bucket="%{bucket_name}%", Key=log_file)
         body = response["Body"]
         if str(log_file.split(".")[-1]).lower() == "json":
             return json.loads(body.read())
+        elif str(log_file.split(".")[-1]).lower() == "jsonl":
+            return [json.loads(line) for line in body.iter_lines() if line]
         else:
             return body.read()
     except ClientError as error:
@@ -69,9 +96,21 @@ GET_LOGS_AWS = """
 
 
 CREATE_LOGS_AWS = """
-    s3client = boto3.client("s3")
+    s3client = get_s3_client()
     log_base = "%{project_name}%/logs"
-    response = s3client.put_object(
+    response = await run_blocking(
+        s3client.put_object,
+        Body=file_data,
+        Bucket="%{bucket_name}%",
+        Key=f"{log_base}/{filename}",
+    )
+"""
+
+
+WRITE_LOGS_AWS = """
+    s3client = get_s3_client()
+    log_base = "%{project_name}%/logs"
+    s3client.put_object(
         Body=file_data, Bucket="%{bucket_name}%", Key=f"{log_base}/{filename}"
     )
 """
@@ -79,304 +118,230 @@ CREATE_LOGS_AWS = """
 
 LIST_LOGS_LOCAL = """
     logs_path = '%{logs_path}%'
-    response = get_list_directory_files(logs_path)
+    prefix = os.path.join(logs_path, prefix) if prefix else None
+    entries = iter_directory_files(logs_path, continuation_token, prefix)
+    response = stream_listing(entries, limit=limit, q=q, since=since, until=until)
 """
 
 
 GET_LOGS_LOCAL = """
     with open(f'{log_file}', 'rb') as log_file:
-        response = json.loads(log_file.read())
+        if str(log_file.name.split(".")[-1]).lower() == "jsonl":
+            response = [json.loads(line) for line in log_file if line.strip()]
+        else:
+            response = json.loads(log_file.read())
 """
 
 
 CREATE_LOGS_LOCAL = """
     logs_path = '%{logs_path}%'
     file_path = f"{logs_path}/{filename}"
-    with open(file_path, 'w') as outfile:
-        json.dump(file_data, outfile)
-"""
-
-
-## ---- PYTORCH ----
-DESERIALIZE_PYTORCH = """
-    # DESERIALIZE PYTORCH
-    import torch
-    import cloudpickle
-
-    body = b""
-    %{read_model}%
-    
-    model = cloudpickle.loads(body)
-"""
-
-
-PREPROCESS_PYTORCH = """
-    import torch
-    data = torch.tensor(data)
-"""
 
+    def write_log_file():
+        with open(file_path, 'w') as outfile:
+            json.dump(file_data, outfile)
 
-PREDICT_PYTORCH = """
-    pred = model(data) 
+    await run_blocking(write_log_file)
 """
 
 
-POSTPROCESS_PYTORCH = """
-    pred = [float(pred)]
-    data = str(data.numpy())
-"""
-
-
-### ---- SKLEARN ----
-
-DESERIALIZE_SKLEARN = """
-    # DESERIALIZE SKLEARN
-    import sklearn
-    import pickle
-
-    body = b""
-    %{read_model}%
-
-    model = pickle.loads(body)
-    print(model)
-"""
-
-
-PREPROCESS_SKLEARN = """
-"""
-
-
-PREDICT_SKLEARN = """
-    pred = model.predict(data) 
-"""
-
-
-POSTPROCESS_SKLEARN = """
-    pred = pred.tolist()[0]
+WRITE_LOGS_LOCAL = """
+    logs_path = '%{logs_path}%'
+    file_path = f"{logs_path}/{filename}"
+    with open(file_path, 'w') as outfile:
+        outfile.write(file_data)
 """
 
 
-## ---- TENSORFLOW ----
-
-# TODO FIGURE OUT TENSORFLOW LOCAL VS REMOTE
+## ---- COMPRESSION ----
 
-DESERIALIZE_TENSORFLOW = """
-    # DESERIALIZE TENSORFLOW
-    import tempfile
-    from tensorflow.keras.models import load_model
+# File suffix, service requirement and default level of the model compression codecs
+MODEL_CODECS = {
+    "zstd": {"module": "zstandard", "suffix": ".zst", "requirement": "zstandard==0.15.2", "level": 3},
+    "lz4": {"module": "lz4", "suffix": ".lz4", "requirement": "lz4==3.1.3", "level": 0},
+}
 
-    s3client = boto3.client("s3")
-    with tempfile.TemporaryDirectory() as tempdir:
-        filename = f"{tempdir}/model.h5"
-        result = s3client.download_file(Bucket="%{bucket_name}%", Key="%{object_key}%", Filename=filename)
-        model = load_model(filename)
-        print(model)
-"""
+# Bytes sampled from the start, middle and end of an artifact by the ratio probe
+PROBE_SAMPLE_SIZE = 256 * 1024
 
+# Artifacts compressing worse than this are left uncompressed
+MIN_COMPRESSION_RATIO = 1.2
 
-PREPROCESS_TENSORFLOW = """
-"""
+# lz4 decompresses faster, so it is picked when its ratio is this close to zstd's
+LZ4_RATIO_TOLERANCE = 0.1
 
+COPY_CHUNK_SIZE = 1024 * 1024
 
-PREDICT_TENSORFLOW = """
-    pred = model.predict(data) 
-"""
 
+def available_codecs() -> List[str]:
+    """
+    Compression codecs whose library is installed
+    """
+    import importlib.util
 
-POSTPROCESS_TENSORFLOW = """
-    pred = float(pred[0][0])
-"""
-
-
-## ---- XGBOOST ----
-DESERIALIZE_XGBOOST = """
-    # DESERIALIZE PYTORCH
-    import xgboost
-    import cloudpickle
-
-    body = b""
-    %{read_model}%
+    return [
+        codec
+        for codec, settings in MODEL_CODECS.items()
+        if importlib.util.find_spec(settings["module"]) is not None
+    ]
 
-    model = cloudpickle.loads(body)
-"""
 
+def _compress_bytes(codec: str, data: bytes, level: Optional[int] = None) -> bytes:
+    level = level if level is not None else MODEL_CODECS[codec]["level"]
+    if codec == "zstd":
+        import zstandard
 
-PREPROCESS_XGBOOST = """
-    import numpy as np
-    data = np.array(data)
-"""
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    import lz4.frame
 
+    return lz4.frame.compress(data, compression_level=level)
 
-PREDICT_XGBOOST = """
-    pred = model.predict(data)
-"""
 
+def probe_codec(
+    file_path: str, codecs: List[str], level: Optional[int] = None
+) -> Tuple[str, float]:
+    """
+    Pick the codec for an artifact by compressing samples of it.
+
+    Parameters
+    ----------
+    file_path : str
+            Path of the serialized model
+    codecs : list
+            Codecs to try
+    level : int, optional
+            Compression level, defaults to the level of each codec
+
+    Returns
+    -------
+    codec : str
+            Selected codec, empty when the artifact does not compress well enough
+    ratio : float
+            Compression ratio of the samples with the best codec
+    """
+    file_size = os.path.getsize(file_path)
+    offsets = sorted({0, max(0, file_size // 2 - PROBE_SAMPLE_SIZE // 2), max(0, file_size - PROBE_SAMPLE_SIZE)})
+    samples = []
+    with open(file_path, "rb") as model_file:
+        for offset in offsets:
+            model_file.seek(offset)
+            samples.append(model_file.read(PROBE_SAMPLE_SIZE))
+    sample = b"".join(samples)
+    if not sample:
+        return "", 1.0
+    ratios = {
+        codec: len(sample) / max(1, len(_compress_bytes(codec, sample, level))) for codec in codecs
+    }
+    codec = max(ratios, key=ratios.get)
+    if "lz4" in ratios and ratios["lz4"] >= ratios[codec] * (1 - LZ4_RATIO_TOLERANCE):
+        codec = "lz4"
+    if ratios[codec] < MIN_COMPRESSION_RATIO:
+        return "", ratios[codec]
+    return codec, ratios[codec]
+
+
+def compress_file(file_path: str, codec: str, level: Optional[int] = None) -> Path:
+    """
+    Stream compress the file next to the original with the codec suffix appended.
+    """
+    level = level if level is not None else MODEL_CODECS[codec]["level"]
+    compressed_path = Path(str(file_path) + MODEL_CODECS[codec]["suffix"])
+    with open(file_path, "rb") as source_file:
+        if codec == "zstd":
+            import zstandard
+
+            # Multi-threaded, with the content size written in the frame header
+            compressor = zstandard.ZstdCompressor(level=level, threads=-1)
+            with open(compressed_path, "wb") as compressed_file:
+                compressor.copy_stream(
+                    source_file, compressed_file, size=os.path.getsize(file_path)
+                )
+        else:
+            import lz4.frame
 
-POSTPROCESS_XGBOOST = """
-    pred = [float(pred)]
-    data = str(data)
-"""
+            with lz4.frame.open(compressed_path, "wb", compression_level=level) as compressed_file:
+                shutil.copyfileobj(source_file, compressed_file, COPY_CHUNK_SIZE)
+    return compressed_path
 
 
 class ModelSerializer:
     """
     Class to serialize and deserialize model objects based on the ML package type.
+    The framework specific work is done by the adapters of `ModelRegistry`.
     """
 
-    # TODO: REFACTOR FOR INDIVIDUAL ML PACKAGES
-
     def __init__(
         self,
         model_type: str = "sklearn",
         file_path: str = "",
         created_at: datetime = datetime.fromtimestamp(time()),
+        model_compression: Optional[str] = "",
+        model_compression_level: Optional[int] = None,
         *args,
         **kwargs,
     ) -> None:
+        """
+        Parameters
+        ----------
+        model_type : str, optional
+                Model framework, detected when the model is saved
+        file_path : str, optional
+                Path of the serialized model
+        model_compression : str, optional
+                Compression of the saved model, '' for none, 'zstd', 'lz4' or
+                'auto' to pick the installed codec by probing the artifact
+        model_compression_level : int, optional
+                Compression level, defaults to the default level of the codec
+        """
         self.model_type = model_type
         self.file_path = file_path
         self.created_at = created_at
+        self.adapter = None
+        self.model_compression = model_compression
+        self.model_compression_level = model_compression_level
+        self.codec = ""
 
-    def _get_model_type(self, model: object) -> str:
+    @property
+    def extra_requirements(self) -> List[str]:
         """
-        Determine what ML library the model was built using
+        Service requirements needed to read the saved model on top of the framework
         """
-        model_type = None
-        # SCIKIT LEARN
-        try:
-            import sklearn
-
-            is_sklearn = isinstance(model, sklearn.base.BaseEstimator)
-            if is_sklearn:
-                model_type = "sklearn"
-        except ImportError:  # module not found
-            pass
-
-        # PYTORCH
-        try:
-            import torch
-
-            is_pytorch = isinstance(model, torch.nn.modules.module.Module)
-            if is_pytorch:
-                model_type = "pytorch"
-        except ImportError:  # module not found
-            pass
-
-        # TENSORFLOW
-        try:
-            import tensorflow as tf
-
-            is_tensorflow = isinstance(model, tf.keras.models.Sequential)
-            if is_tensorflow:
-                model_type = "tensorflow"
-        except ImportError:  # module not found
-            pass
-
-        # XGBOOST
-        try:
-            import xgboost as xgb
-
-            is_xgboost = isinstance(model, xgb.XGBModel)
-            if is_xgboost:
-                model_type = "xgboost"
-        except ImportError:  # module not found
-            pass
-
-        return model_type
-
-    def _save_sklearn(self, model: object, save_path: str):
+        return [MODEL_CODECS[self.codec]["requirement"]] if self.codec else []
+
+    def _compress_model(self, compression: str, level: Optional[int] = None) -> None:
         """
-        Save the Scikit-learn model object to a local file
+        Compress the saved model file and point `file_path` at the compressed file.
         """
-        try:
-            pickle.dump(model, open(Path(save_path, "model.sav"), "wb"))
-            self.file_path = Path(save_path, "model.sav")
-            self.model_name = "model.sav"
-            # print(self.file_path)
-        except:
-            pass
-
-    def _load_sklearn(self, model_path: str) -> object:
+        if compression == "auto":
+            codecs = available_codecs()
+            if not codecs:
+                print("No model compression library installed, install zstandard or lz4 to compress models")
+                return
+            codec, ratio = probe_codec(self.file_path, codecs, level)
+            if codec == "":
+                print(f"Model only compresses {ratio:.1f}x, keeping it uncompressed")
+                return
+        elif compression in MODEL_CODECS:
+            codec = compression
+        else:
+            raise Exception(
+                f"Model compression {compression} is unsupported. Please use one of {list(MODEL_CODECS) + ['auto']}"
+            )
+        original_size = os.path.getsize(self.file_path)
+        compressed_path = compress_file(self.file_path, codec, level)
+        print(
+            f"Compressed model with {codec} from {human_size(original_size)} "
+            f"to {human_size(os.path.getsize(compressed_path))}"
+        )
+        os.remove(self.file_path)
+        self.file_path = compressed_path
+        self.codec = codec
+
+    def _get_model_type(self, model: object) -> str:
         """
-        Load Scikit Learn model and return model object.
+        Determine what ML library the model was built using
         """
-        try:
-            # load the model from disk
-            with open(model_path, "rb") as model_file:
-                model = pickle.load(model_file)
-        except ImportError:  # module not found
-            pass
-        return model
-
-    def _save_pytorch(self, model: object, save_path: str):
-        try:
-            import torch
-            import cloudpickle
-
-            file_path_dst = Path(save_path, "model.pth")
-            cloudpickle.dump(model, open(file_path_dst, "wb"))
-            self.file_path = file_path_dst
-        except ImportError:  # module not found
-            pass
-
-    def _load_pytorch(self, model_path: str) -> object:
-        model = object
-        try:
-            import cloudpickle
-
-            model = cloudpickle.load(open(model_path, "rb"))
-        except ImportError:  # module not found
-            pass
-        return model
-
-    def _save_tensorflow(self, model: object, save_path: str) -> str:
-        # TODO: IMPROVE THE TYPES FOR THE MODELS PER PACKAGE
-        try:
-            import tensorflow as tf
-
-            # Save the entire model to a HDF5 file.
-            # The '.h5' extension indicates that the model should be saved to HDF5.
-            model.save(Path(save_path, "model.h5"))
-            self.file_path = Path(save_path, "model.h5")
-        except ImportError:  # module not found
-            pass
-        return Path(save_path, "model.h5")
-
-    def _load_tensorflow(self, model_path: str) -> object:
-        model = object
-        try:
-            # https://stackoverflow.com/questions/47847942/load-keras-model-with-aws-lambda
-            import tensorflow as tf
-
-            model = tf.keras.models.load_model(model_path)
-        except ImportError:  # module not found
-            pass
-        return model
-
-    def _save_xgboost(self, model: object, save_path: str) -> str:
-        # Can use model.save_model('model_file_name.json') but deserializing is weird.
-        # going to use pickle
-        try:
-            import xgboost
-            import cloudpickle
-
-            file_path_dst = Path(save_path, "model.pkl")
-            cloudpickle.dump(model, open(file_path_dst, "wb"))
-            self.file_path = file_path_dst
-        except ImportError:  # module not found
-            pass
-
-    def _load_xgboost(self, model_path: str) -> object:
-        # bst = xgboost.Booster
-        # bst.load_model('model_file_name.json')
-        model = object
-        try:
-            import cloudpickle
-
-            model = cloudpickle.load(open(model_path, "rb"))
-        except ImportError:  # module not found
-            pass
-        return model
+        return ModelRegistry.detect(model)
 
     def get_model_processing_code(
         self, 
@@ -398,61 +363,54 @@ class ModelSerializer:
         output_code : dict
         """
         model_type = model_type if model_type != "" else self.model_type
-        serialization_code = ""
-        preprocessing_code = ""
-        predict_code = ""
-        postprocessing_code = ""
-        if model_type == "sklearn":
-            serialization_code = DESERIALIZE_SKLEARN
-            preprocessing_code = PREPROCESS_SKLEARN
-            predict_code = PREDICT_SKLEARN
-            postprocessing_code = POSTPROCESS_SKLEARN
-        elif model_type == "pytorch":
-            serialization_code = DESERIALIZE_PYTORCH
-            preprocessing_code = PREPROCESS_PYTORCH
-            predict_code = PREDICT_PYTORCH
-            postprocessing_code = POSTPROCESS_PYTORCH
-        elif model_type == "tensorflow":
-            serialization_code = DESERIALIZE_TENSORFLOW
-            preprocessing_code = PREPROCESS_TENSORFLOW
-            predict_code = PREDICT_TENSORFLOW
-            postprocessing_code = POSTPROCESS_TENSORFLOW
-        elif model_type == "xgboost":
-            serialization_code = DESERIALIZE_XGBOOST
-            preprocessing_code = PREPROCESS_XGBOOST
-            predict_code = PREDICT_XGBOOST
-            postprocessing_code = POSTPROCESS_XGBOOST
-        else:
+        if model_type not in ModelRegistry.names():
             raise Exception(f"INVALIDE MODEL TYPE {model_type}")
-        
+        # Settings the adapter recorded when saving the model, e.g. the XGBoost class
+        adapter_options = {}
+        if self.adapter is not None and self.adapter.name == model_type:
+            adapter_options = self.adapter.options
+
         # UPDATE CODE BASED ON TARGETS 
         if deployment_target == "local":
-            serialization_code = serialization_code.replace("%{read_model}%", READ_MODEL_LOCAL)
+            serialization_code = READ_MODEL_LOCAL
+            model_version_code = MODEL_VERSION_LOCAL
             list_model_code = LIST_MODEL_LOCAL
             list_logs_code = LIST_LOGS_LOCAL
             get_logs_code = GET_LOGS_LOCAL
             create_logs_code = CREATE_LOGS_LOCAL
+            write_logs_code = WRITE_LOGS_LOCAL
         elif deployment_target == "aws":
-            serialization_code = serialization_code.replace("%{read_model}%", READ_MODEL_AWS)
+            serialization_code = READ_MODEL_AWS
+            model_version_code = MODEL_VERSION_AWS
             list_model_code = LIST_MODEL_AWS
             list_logs_code = LIST_LOGS_AWS
             get_logs_code = GET_LOGS_AWS
             create_logs_code = CREATE_LOGS_AWS
+            write_logs_code = WRITE_LOGS_AWS
         else:
             raise Exception(f"INVALIDE DEPLOYMENT TARGET {deployment_target}")
         output_code = {
             "model_serializer": serialization_code, 
-            "model_preprocessor": preprocessing_code, 
-            "model_predictor": predict_code, 
-            "model_postprocessor": postprocessing_code,
+            "model_type": model_type,
+            "adapter_options": repr(adapter_options),
+            "model_version_code": model_version_code,
             "list_model_code": list_model_code,
             "list_logs_code": list_logs_code,
             "get_logs_code": get_logs_code,
-            "create_logs_code": create_logs_code
+            "create_logs_code": create_logs_code,
+            "write_logs_code": write_logs_code,
         }
         return output_code
 
-    def save_model(self, model: object, save_path: str = "", *args, **kwargs) -> str:
+    def save_model(
+        self,
+        model: object,
+        save_path: str = "",
+        compression: Optional[str] = None,
+        compression_level: Optional[int] = None,
+        *args,
+        **kwargs,
+    ) -> str:
         """
         Serialize the model to local directory based on the model type.
 
@@ -464,20 +422,25 @@ class ModelSerializer:
                 Path for the output of the saved model. If not passed default to current directory.
         model_class_str : str, optional
                 Class definition for the model object. required for pytorch models only.
+        compression : str, optional
+                Overrides the `model_compression` of the serializer
+        compression_level : int, optional
+                Overrides the `model_compression_level` of the serializer
         """
         model_type = self._get_model_type(model)
+        if model_type is None:
+            raise Exception("Model type error. Please check that the model is correct")
         self.model_type = model_type
         save_path = save_path if save_path != "" else os.getcwd()
         self.save_path = save_path
-        if model_type == "sklearn":
-            self._save_sklearn(model, save_path)
-        elif model_type == "tensorflow":
-            self._save_tensorflow(model, save_path)
-        elif model_type == "pytorch":
-            self._save_pytorch(model, save_path)
-        elif model_type == "xgboost":
-            self._save_xgboost(model, save_path)
-        else:
-            raise Exception("Model type error. Please check that the model is correct")
+        self.adapter = ModelRegistry.create(model_type)
+        self.file_path = self.adapter.save(model, save_path)
+        self.codec = ""
+        compression = compression if compression is not None else self.model_compression
+        if compression:
+            self._compress_model(
+                compression,
+                compression_level if compression_level is not None else self.model_compression_level,
+            )
         return self.file_path, model_type
 
@@ -8,6 +8,8 @@ logger = logging.getLogger(__name__)
 
 PKG_DIRECTORY_PATH = str(Path(os.path.abspath(__file__)).parent.absolute())
 API_TEMPLATES_DIRECTORY = Path(PKG_DIRECTORY_PATH, "templates", "api")
+# Framework adapters are shipped with the service, which imports them as `model_frameworks`
+MODEL_FRAMEWORKS_DIRECTORY = Path(PKG_DIRECTORY_PATH).parent / "model_frameworks"
 
 
 def get_list_directory_files(directory_path: str) -> list:
@@ -64,20 +66,22 @@ class APIService:
     def generate_service(
         self,
         model_serializer: str,
-        model_preprocessor: str,
-        model_predictor: str,
-        model_postprocessor: str,
         project_name: str,
         list_model_code: str,
         list_logs_code: str,
         get_logs_code: str,
         create_logs_code: str,
+        model_type: Optional[str] = "sklearn",
+        adapter_options: Optional[str] = "{}",
+        model_version_code: Optional[str] = "",
+        write_logs_code: Optional[str] = "",
         bucket_name: Optional[str] = "",
         object_key: Optional[str] = "",
         model_filepath: Optional[str] = "",
         logs_path: Optional[str] = "",
         output_path: Optional[str] = "",
         api_root_path: Optional[str] = "openapi_prefix",
+        micro_batching: Optional[bool] = False,
         *args,
         **kwargs,
     ) -> str:
@@ -88,13 +92,7 @@ class APIService:
         Parameters
         ----------
         model_serializer : str
-                Model serialzier code
-        model_preprocessor : str
-                Data preprocessor and transformation for the model
-        model_predictor : str
-                Predictor code for the actual model predictions 
-        model_postprocessor : str
-                Prostprocessing and data transformation code for the predictions before returning
+                Code reading the model file into a local `model_path`
         project_name : str
                 Project name created from the S3 Bucket
         list_model_code: str
@@ -105,6 +103,14 @@ class APIService:
                 API code for getting logs from remote log DB
         create_logs_code: str
                 Cod to create new logfile
+        model_type : str, optional
+                Model type of the framework adapter loading and running the model
+        adapter_options : str, optional
+                Python dict literal of the options the adapter recorded when saving the model
+        model_version_code: str, optional
+                API code for reading the stored model version used to refresh the model cache
+        write_logs_code: str, optional
+                API code to write a batch of buffered prediction logs
         bucket_name : str, optional
                 Bucket name for the model artifacts.
         object_key : str, optional
@@ -117,11 +123,16 @@ class APIService:
                 Output path directory for the API codes
         api_root_path : str, optional
                 'root_path' argument for API prefix.
+        micro_batching : bool, optional
+                Default for coalescing concurrent single-row predictions into batched model calls.
         Returns
         -------
         base_dir : str
             Output path for the generated API service code
         """
+        # Imported on use, the deployments package loads boto3
+        from ..deployments.aws.cloudwatch import WARMER_KEY
+
         output_path = output_path if output_path != "" else os.getcwd()
         base_dir = Path(output_path, "api")
         DIR_PATH = Path(base_dir)
@@ -131,14 +142,15 @@ class APIService:
         for filename in template_files:
             file_contents = self._read_file(filename)
             file_contents = file_contents.replace("%{model_serializer}%", model_serializer)
-            file_contents = file_contents.replace("%{model_preprocessor}%", model_preprocessor)
-            file_contents = file_contents.replace("%{model_predictor}%", model_predictor)
-            file_contents = file_contents.replace("%{model_postprocessor}%", model_postprocessor)
+            file_contents = file_contents.replace("%{model_type}%", model_type)
+            file_contents = file_contents.replace("%{adapter_options}%", adapter_options)
 
             file_contents = file_contents.replace("%{list_model_code}%", list_model_code)
             file_contents = file_contents.replace("%{list_logs_code}%", list_logs_code)
             file_contents = file_contents.replace("%{get_logs_code}%", get_logs_code)
             file_contents = file_contents.replace("%{create_logs_code}%", create_logs_code)
+            file_contents = file_contents.replace("%{model_version_code}%", model_version_code)
+            file_contents = file_contents.replace("%{write_logs_code}%", write_logs_code)
 
             file_contents = file_contents.replace("%{logs_path}%", logs_path)
 
@@ -148,6 +160,8 @@ class APIService:
             file_contents = file_contents.replace("%{model_filepath}%", model_filepath)
 
             file_contents = file_contents.replace("%{api_root_path}%", api_root_path)
+            file_contents = file_contents.replace("%{micro_batching}%", str(micro_batching).lower())
+            file_contents = file_contents.replace("%{warmer_key}%", WARMER_KEY)
             
             # TODO FIX THIS FILE NAMING THING AND FIGURE OUT DIRECTORY STUFF
             _filepath_parts = Path(filename).parts
@@ -159,4 +173,8 @@ class APIService:
             _output_filename = Path(*_output_tuple)
             _output_file = Path(base_dir, _output_filename)
             self._generate_file(_output_file, file_contents)
+        for filename in get_list_directory_files(MODEL_FRAMEWORKS_DIRECTORY):
+            if Path(filename).suffix == ".py":
+                _output_file = Path(base_dir, "model_frameworks", Path(filename).name)
+                self._generate_file(_output_file, self._read_file(filename))
         return base_dir
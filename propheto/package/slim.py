@@ -0,0 +1,234 @@
+import os
+import sys
+import shutil
+import hashlib
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from ..utilities import human_size
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Directories that are never imported at runtime
+SLIM_EXCLUDE_DIRS = ["__pycache__"]
+
+# Directories usually holding tests and documentation. Some packages import
+# from them at runtime, e.g. `numpy.testing`, so they are only dropped on request
+SLIM_TEST_DIRS = ["tests", "test", "docs", "doc", "examples"]
+
+# File suffixes that are never imported at runtime
+SLIM_EXCLUDE_SUFFIXES = [".pyc", ".pyo", ".pyi"]
+
+# Files kept from `*.dist-info` folders. Metadata and entry points are read
+# at runtime by importlib.metadata and pkg_resources, RECORD and WHEEL by
+# tools inspecting the installation, the rest is install records
+DIST_INFO_KEEP = ["METADATA", "entry_points.txt", "top_level.txt", "RECORD", "WHEEL"]
+
+# License files of `*.dist-info` folders, kept so the image still carries the
+# notices of the bundled packages
+DIST_INFO_KEEP_PREFIXES = ["LICENSE", "LICENCE", "COPYING", "NOTICE", "AUTHORS"]
+
+# Packages imported by name at runtime which static import analysis misses
+PRUNE_KEEP_PACKAGES = ["uvicorn", "mangum", "pydantic", "starlette", "fastapi", "anyio"]
+
+FileMap = Dict[str, Tuple[str, os.stat_result]]
+
+
+class PackageSlimmer:
+    """
+    Slim a bundled python environment before it is zipped by dropping files
+    that are never used at runtime, stripping debug symbols from shared
+    libraries and optionally pruning packages the service never imports.
+    """
+
+    def __init__(
+        self,
+        strip_binaries: Optional[bool] = True,
+        prune_modules: Optional[bool] = False,
+        prune_test_dirs: Optional[bool] = False,
+        keep_packages: Optional[List[str]] = None,
+        cache_dir: Optional[str] = "",
+        max_workers: Optional[int] = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        strip_binaries : bool, optional
+                Strip debug symbols from `.so` files with `strip --strip-debug`
+        prune_modules : bool, optional
+                Drop top level packages not reachable from the service imports
+        prune_test_dirs : bool, optional
+                Drop the test, doc and example directories of bundled packages
+        keep_packages : list, optional
+                Top level packages never pruned, on top of PRUNE_KEEP_PACKAGES
+        cache_dir : str, optional
+                Directory holding stripped copies of the shared libraries
+        max_workers : int, optional
+                Number of binaries stripped at the same time
+        """
+        self.strip_binaries = strip_binaries
+        self.prune_modules = prune_modules
+        self.prune_test_dirs = prune_test_dirs
+        self.keep_packages = PRUNE_KEEP_PACKAGES + (keep_packages if keep_packages else [])
+        self.cache_dir = (
+            cache_dir if cache_dir != "" else str(Path(tempfile.gettempdir(), "propheto-strip-cache"))
+        )
+        self.max_workers = max_workers if max_workers else (os.cpu_count() or 1)
+        self.report = {}
+
+    def __repr__(self) -> str:
+        return f"PackageSlimmer(strip_binaries={self.strip_binaries}, prune_modules={self.prune_modules})"
+
+    def __str__(self) -> str:
+        return f"PackageSlimmer(strip_binaries={self.strip_binaries}, prune_modules={self.prune_modules})"
+
+    def is_unused(self, arcname: str) -> bool:
+        """
+        Check if a site-packages file is never used at runtime.
+        """
+        parts = arcname.split("/")
+        exclude_dirs = SLIM_EXCLUDE_DIRS + (SLIM_TEST_DIRS if self.prune_test_dirs else [])
+        # Only directories inside a package, a top level `test` module is kept
+        if any(part in exclude_dirs for part in parts[1:-1]):
+            return True
+        if any(arcname.endswith(suffix) for suffix in SLIM_EXCLUDE_SUFFIXES):
+            return True
+        if parts[0].endswith(".dist-info"):
+            return not (
+                parts[-1] in DIST_INFO_KEEP
+                or parts[-1].upper().startswith(tuple(DIST_INFO_KEEP_PREFIXES))
+                or "licenses" in parts[1:-1]
+            )
+        return False
+
+    def strip_binary(self, file_path: str, file_stat: os.stat_result) -> Tuple[str, os.stat_result]:
+        """
+        Return a copy of the shared library without debug symbols, reusing
+        the cached copy while the source file is unchanged.
+        """
+        key = f"{os.path.abspath(file_path)}:{file_stat.st_size}:{file_stat.st_mtime_ns}"
+        cache_path = Path(
+            self.cache_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + Path(file_path).suffix
+        )
+        if not cache_path.exists():
+            temp_path = str(cache_path) + ".tmp"
+            shutil.copyfile(file_path, temp_path)
+            result = subprocess.run(
+                ["strip", "--strip-debug", temp_path],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            if result.returncode != 0:
+                os.remove(temp_path)
+                return file_path, file_stat
+            os.replace(temp_path, cache_path)
+        return str(cache_path), os.stat(cache_path)
+
+    def reachable_packages(self, entry_point: str, search_paths: List[str]) -> set:
+        """
+        Find the top level packages imported, directly or not, by the entry point.
+
+        Parameters
+        ----------
+        entry_point : str
+                Path of the service script, usually `api/main.py`
+        search_paths : list
+                Directories imports are resolved from
+        """
+        from modulefinder import ModuleFinder
+
+        finder = ModuleFinder(path=[str(path) for path in search_paths] + sys.path)
+        finder.run_script(str(entry_point))
+        reachable = {name.split(".")[0] for name in finder.modules}
+        reachable.update(name.split(".")[0] for name in finder.badmodules)
+        return reachable
+
+    def slim(
+        self,
+        files: FileMap,
+        entry_point: Optional[str] = "",
+        search_paths: Optional[List[str]] = None,
+    ) -> FileMap:
+        """
+        Slim the files of a bundled site-packages directory.
+
+        Parameters
+        ----------
+        files : dict
+                Source path and stat result of every file keyed by archive name
+        entry_point : str, optional
+                Service script used to prune unreachable packages
+        search_paths : list, optional
+                Directories imports of the entry point are resolved from
+
+        Returns
+        -------
+        files : dict
+                Slimmed files keyed by archive name
+        """
+        report = {
+            "original_bytes": sum(file_stat.st_size for _, file_stat in files.values()),
+            "removed_files": 0,
+            "removed_bytes": 0,
+            "stripped_files": 0,
+            "stripped_bytes": 0,
+            "pruned_packages": [],
+        }
+        reachable = None
+        if self.prune_modules and entry_point != "":
+            reachable = self.reachable_packages(entry_point, search_paths if search_paths else [])
+            reachable.update(self.keep_packages)
+        slimmed = {}
+        pruned = set()
+        for arcname, (file_path, file_stat) in files.items():
+            top_level = arcname.split("/")[0]
+            module_name = top_level.split(".")[0]
+            # Only importable names are pruned, *.libs, *.dist-info and *.pth stay
+            if "/" in arcname:
+                prunable = "." not in top_level
+            else:
+                prunable = top_level.endswith((".py", ".so"))
+            unreachable = reachable is not None and prunable and module_name not in reachable
+            if unreachable:
+                pruned.add(module_name)
+            if unreachable or self.is_unused(arcname):
+                report["removed_files"] += 1
+                report["removed_bytes"] += file_stat.st_size
+                continue
+            slimmed[arcname] = (file_path, file_stat)
+
+        if self.strip_binaries and shutil.which("strip") and sys.platform.startswith("linux"):
+            Path(self.cache_dir).mkdir(parents=True, exist_ok=True)
+            binaries = [arcname for arcname in slimmed if arcname.endswith(".so") or ".so." in arcname]
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                stripped = executor.map(lambda arcname: self.strip_binary(*slimmed[arcname]), binaries)
+                for arcname, (stripped_path, stripped_stat) in zip(binaries, stripped):
+                    saved = slimmed[arcname][1].st_size - stripped_stat.st_size
+                    if saved > 0:
+                        report["stripped_files"] += 1
+                        report["stripped_bytes"] += saved
+                        slimmed[arcname] = (stripped_path, stripped_stat)
+
+        report["pruned_packages"] = sorted(pruned)
+        self.report = report
+        return slimmed
+
+    def format_report(self) -> str:
+        """
+        Summary of the bytes saved by the last slimming run
+        """
+        if not self.report:
+            return "Package not slimmed"
+        saved = self.report["removed_bytes"] + self.report["stripped_bytes"]
+        lines = [
+            f"Slimmed package from {human_size(self.report['original_bytes'])} to "
+            f"{human_size(self.report['original_bytes'] - saved)}",
+            f"  Removed {self.report['removed_files']} files ({human_size(self.report['removed_bytes'])})",
+            f"  Stripped {self.report['stripped_files']} binaries ({human_size(self.report['stripped_bytes'])})",
+        ]
+        if self.report["pruned_packages"]:
+            lines.append(f"  Pruned packages: {', '.join(self.report['pruned_packages'])}")
+        return "\n".join(lines)
@@ -1,6 +1,9 @@
 import os
 from fastapi import FastAPI
 from v1.routers import router
+from v1.endpoints.model import batcher, MICRO_BATCHING
+from v1.prediction_log import prediction_log, LAMBDA_RUNTIME
+from v1.keepwarm import is_warm_ping, warm
 from mangum import Mangum
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -35,6 +38,25 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+async def start_micro_batcher():
+    if MICRO_BATCHING:
+        batcher.start()
+
+
+@app.on_event("shutdown")
+async def stop_micro_batcher():
+    await batcher.stop()
+
+
+@app.on_event("shutdown")
+def flush_prediction_log():
+    # Mangum may send the shutdown event after every invocation, on Lambda the
+    # handler flushes once a threshold is reached instead
+    if not LAMBDA_RUNTIME:
+        prediction_log.close()
+
+
 @app.get("/")
 def read_root():
     return {"Hello ML Practitioner": "from the Propheto ML service"}
@@ -51,4 +73,21 @@ def read_root():
 
 
 # to make it work with Amazon Lambda, we create a handler object
-handler = Mangum(app=app)
+asgi_handler = Mangum(app=app)
+
+
+def handler(event: dict, context: object) -> dict:
+    try:
+        if is_warm_ping(event):
+            return warm(event, context)
+        return asgi_handler(event, context)
+    finally:
+        # Flush while the invocation still runs, the process may be frozen or
+        # recycled afterwards. Keepwarm pings flush logs older than the age threshold.
+        # Trade-off: Lambda returns the response only once the handler returns,
+        # so the invocation that flushes waits for one S3 PUT, usually tens of ms.
+        # That is one invocation per PROPHETO_LOG_FLUSH_SIZE records or
+        # PROPHETO_LOG_FLUSH_SECONDS, raise them to flush less often at the cost
+        # of losing more records when an environment is recycled. Flushing after
+        # the response would need a Lambda extension to keep the process running.
+        prediction_log.flush_if_due()
@@ -0,0 +1,118 @@
+import asyncio
+from typing import Callable, List, Optional
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent prediction requests into a single batched model call.
+
+    Requests are queued and collected until either `max_batch_size` rows are
+    waiting or `max_wait_ms` has passed since the first request of the batch.
+    The rows are then sent through one call of `predict_fn` in a worker thread
+    and the predictions are fanned back out to the awaiting requests. When the
+    batched call fails, each request is predicted on its own.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[list], list],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ) -> None:
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def start(self) -> None:
+        """
+        Start the background batching task on the running event loop.
+        """
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.get_event_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Cancel the batching task and fail any requests still waiting.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batcher stopped"))
+
+    async def submit(self, rows: List) -> List:
+        """
+        Queue the rows of one request and wait for their predictions.
+        """
+        if not self.running:
+            self.start()
+        future = asyncio.get_event_loop().create_future()
+        await self._queue.put((rows, future))
+        return await future
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_event_loop()
+        batch = [await self._queue.get()]
+        batch_size = len(batch[0][0])
+        deadline = loop.time() + self.max_wait
+        while batch_size < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            batch_size += len(item[0])
+        return batch
+
+    async def _run_separately(self, batch: list) -> None:
+        """
+        Predict each request of a failed batch on its own so a bad row only
+        fails the request it came from.
+        """
+        loop = asyncio.get_event_loop()
+        for request_rows, future in batch:
+            if future.done():
+                continue
+            try:
+                predictions = await loop.run_in_executor(None, self.predict_fn, request_rows)
+            except Exception as error:
+                future.set_exception(error)
+            else:
+                future.set_result(predictions)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_event_loop()
+        while True:
+            batch = await self._collect()
+            rows = [row for request_rows, _ in batch for row in request_rows]
+            try:
+                predictions = await loop.run_in_executor(None, self.predict_fn, rows)
+            except Exception as error:
+                if len(batch) == 1:
+                    if not batch[0][1].done():
+                        batch[0][1].set_exception(error)
+                else:
+                    await self._run_separately(batch)
+                continue
+            offset = 0
+            for request_rows, future in batch:
+                if not future.done():
+                    future.set_result(predictions[offset : offset + len(request_rows)])
+                offset += len(request_rows)
@@ -0,0 +1,42 @@
+import os
+import boto3
+import asyncio
+import functools
+import threading
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+
+# Threads available for blocking I/O called from the async endpoints
+IO_WORKERS = int(os.environ.get("PROPHETO_IO_WORKERS", "16"))
+
+executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="propheto-io")
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_s3_client():
+    """
+    Return the S3 client shared by the whole process. Clients are thread safe
+    once created but creating them is not, so creation is guarded by a lock.
+    """
+    client = _clients.get("s3")
+    if client is None:
+        with _clients_lock:
+            client = _clients.get("s3")
+            if client is None:
+                config = Config(
+                    max_pool_connections=IO_WORKERS,
+                    retries={"max_attempts": 3, "mode": "standard"},
+                )
+                client = boto3.client("s3", config=config)
+                _clients["s3"] = client
+    return client
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Run a blocking call on the shared I/O executor without stalling the event loop.
+    """
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
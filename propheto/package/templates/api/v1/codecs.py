@@ -0,0 +1,37 @@
+import os
+import shutil
+
+# Model compression codec of each file suffix
+CODEC_SUFFIXES = {".zst": "zstd", ".lz4": "lz4"}
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def model_codec(model_path: str) -> str:
+    """
+    Return the compression codec of a model file, empty when it is not compressed.
+    """
+    return CODEC_SUFFIXES.get(os.path.splitext(model_path)[1], "")
+
+
+def decompress_to_file(compressed_file, codec: str, model_path: str) -> str:
+    """
+    Decompress a file object chunk by chunk into `model_path`, so neither the
+    compressed nor the decompressed model is ever held in memory whole. The
+    file is written next to its destination and renamed once complete.
+    """
+    if codec == "zstd":
+        import zstandard
+
+        reader = zstandard.ZstdDecompressor().stream_reader(compressed_file)
+    elif codec == "lz4":
+        import lz4.frame
+
+        reader = lz4.frame.LZ4FrameFile(compressed_file, mode="rb")
+    else:
+        raise ValueError(f"Unsupported model compression codec {codec}")
+    temp_path = f"{model_path}.tmp"
+    with reader, open(temp_path, "wb") as model_file:
+        shutil.copyfileobj(reader, model_file, CHUNK_SIZE)
+    os.replace(temp_path, model_path)
+    return model_path
@@ -2,6 +2,7 @@ import boto3
 from fastapi import APIRouter
 from typing import Optional
 from pydantic import BaseModel
+from ..clients import get_s3_client
 
 router = APIRouter()
 
@@ -14,7 +15,7 @@ class Response(BaseModel):
 
 @router.get("/alerts/{run_id}")
 def get_alerts(run_id: str):
-    s3client = boto3.client("s3")
+    s3client = get_s3_client()
     # Delimiter = model_name  #TODO: Figure out the model name param delimeter
     response = s3client.list_objects(Bucket="test")
     return response["Contents"]
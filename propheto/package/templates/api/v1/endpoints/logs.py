@@ -5,29 +5,124 @@ import json
 from pathlib import Path
 from botocore.exceptions import ClientError
 from fastapi import APIRouter
-from typing import Optional, List
+from fastapi.responses import StreamingResponse
+from typing import Optional, List, Iterator
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, timezone
+from ..clients import get_s3_client, run_blocking
 
 router = APIRouter()
 
 
-def get_list_directory_files(directory_path: str) -> list:
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def iter_directory_files(
+    directory_path: str,
+    start_after: Optional[str] = None,
+    prefix: Optional[str] = None,
+) -> Iterator[dict]:
     """
-    Utility function for getting the directory files.
+    Lazily walk the directory files in key order, skipping every file up to and
+    including `start_after` and any directory outside of `prefix`.
     """
-    directory_contents = os.listdir(directory_path)
-    directory_files = []
-    for _item in directory_contents:
-        _path = Path(directory_path, _item)
-        if os.path.isdir(_path):
-            subdirectory_files = get_list_directory_files(_path)
-            directory_files.extend(subdirectory_files)
+    with os.scandir(directory_path) as entries:
+        # Sort so the walk order matches plain string ordering of the paths
+        entries = sorted(
+            entries, key=lambda entry: entry.name + "/" if entry.is_dir() else entry.name
+        )
+    for entry in entries:
+        _path = entry.path
+        if entry.is_dir():
+            _dir_key = _path + "/"
+            if start_after and _dir_key < start_after and not start_after.startswith(_dir_key):
+                continue
+            if prefix and not (_dir_key.startswith(prefix) or prefix.startswith(_dir_key)):
+                continue
+            yield from iter_directory_files(_path, start_after, prefix)
         else:
             # Exclude any cache files
-            if str(_path)[-4:] != ".pyc": 
-                directory_files.append(_path)
-    return directory_files
+            if _path[-4:] == ".pyc":
+                continue
+            if start_after and _path <= start_after:
+                continue
+            if prefix and not _path.startswith(prefix):
+                continue
+            _stat = entry.stat()
+            yield {
+                "Key": _path,
+                "LastModified": datetime.fromtimestamp(_stat.st_mtime, tz=timezone.utc),
+                "Size": _stat.st_size,
+            }
+
+
+def iter_s3_objects(
+    s3client, bucket_name: str, prefix: str, start_after: Optional[str] = None
+) -> Iterator[dict]:
+    """
+    Lazily page through every object under the prefix with list_objects_v2.
+    """
+    kwargs = {"Bucket": bucket_name, "Prefix": prefix}
+    if start_after:
+        kwargs["StartAfter"] = start_after
+    paginator = s3client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(**kwargs):
+        for record in page.get("Contents", []):
+            yield {
+                "Key": record["Key"],
+                "LastModified": record["LastModified"],
+                "ETag": record.get("ETag"),
+                "Size": record["Size"],
+                "StorageClass": record.get("StorageClass"),
+            }
+
+
+def _json_default(value):
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def stream_listing(
+    entries: Iterator[dict],
+    limit: int = 1000,
+    q: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> StreamingResponse:
+    """
+    Stream up to `limit` matching entries as a JSON object. When more entries
+    remain, `NextContinuationToken` holds the cursor for the following page.
+    """
+    since, until = _as_utc(since), _as_utc(until)
+
+    def generate():
+        yield '{"Contents": ['
+        count = 0
+        last_key = None
+        is_truncated = False
+        for entry in entries:
+            if q and q not in entry["Key"]:
+                continue
+            if since and entry["LastModified"] < since:
+                continue
+            if until and entry["LastModified"] > until:
+                continue
+            if count >= limit:
+                is_truncated = True
+                break
+            yield ("," if count else "") + json.dumps(entry, default=_json_default)
+            count += 1
+            last_key = entry["Key"]
+        next_token = last_key if is_truncated else None
+        yield '], "KeyCount": %d, "IsTruncated": %s, "NextContinuationToken": %s}' % (
+            count,
+            json.dumps(is_truncated),
+            json.dumps(next_token),
+        )
+
+    return StreamingResponse(generate(), media_type="application/json")
 
 
 class LogsResponse(BaseModel):
@@ -55,7 +150,14 @@ def get_log(log_file: str):
 @router.get(
     "/logs/list", summary="List available logs"
 )
-def get_logs(q: Optional[str] = None):
+def get_logs(
+    q: Optional[str] = None,
+    prefix: Optional[str] = None,
+    continuation_token: Optional[str] = None,
+    limit: int = 1000,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
     response = {}
     # %{list_logs_code}%
     return response
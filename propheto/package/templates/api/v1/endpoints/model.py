@@ -6,13 +6,42 @@ from typing import Optional, List
 from pydantic import BaseModel
 from datetime import datetime
 from time import time
+from threading import Lock
 import json
 
 from starlette.types import Message
-from .logs import create_log
+from model_frameworks import ModelRegistry
+from ..batching import MicroBatcher
+from ..clients import get_s3_client, run_blocking
+from ..model_cache import fetch_model, local_model_path
+from ..prediction_log import prediction_log
+from .logs import iter_s3_objects, stream_listing
 
 router = APIRouter()
 
+# Seconds between checks of the stored model version. 0 checks on every
+# request and a negative value never re-checks once the model is loaded.
+MODEL_CACHE_TTL = float(os.environ.get("PROPHETO_MODEL_CACHE_TTL", "300"))
+PRELOAD_MODEL = os.environ.get("PROPHETO_PRELOAD_MODEL", "true").lower() == "true"
+
+# Process-lifetime model cache shared by all requests in the container
+_model_cache = {"model": None, "version": None, "checked_at": 0.0}
+_model_lock = Lock()
+
+# Coalesce concurrent /models/predict requests into one model call
+MICRO_BATCHING = (
+    os.environ.get("PROPHETO_MICRO_BATCHING", "%{micro_batching}%").lower() == "true"
+)
+MICRO_BATCH_SIZE = int(os.environ.get("PROPHETO_MICRO_BATCH_SIZE", "32"))
+MICRO_BATCH_WAIT_MS = float(os.environ.get("PROPHETO_MICRO_BATCH_WAIT_MS", "5"))
+
+# Threads the framework uses for one prediction, 0 keeps the framework default
+MODEL_THREADS = int(os.environ.get("PROPHETO_MODEL_THREADS", "0"))
+
+# Framework adapter saving, loading and running the model
+adapter = ModelRegistry.create("%{model_type}%", **%{adapter_options}%)
+adapter.configure(threads=MODEL_THREADS or None)
+
 
 class Response(BaseModel):
     code: int
@@ -20,15 +49,52 @@ class Response(BaseModel):
     result: dict
 
 
+def get_model_version():
+    version = None
+    # %{model_version_code}%
+    return version
+
+
 def get_deserialize_model():
-    model = object
+    model_path = ""
     # %{model_serializer}%
-    return model
+    return adapter.load(model_path)
+
+
+def _is_cache_fresh(now: float) -> bool:
+    if _model_cache["model"] is None:
+        return False
+    if MODEL_CACHE_TTL < 0:
+        return True
+    return now - _model_cache["checked_at"] < MODEL_CACHE_TTL
+
+
+def load_model(force: bool = False):
+    """
+    Return the cached model object, deserializing it only on the first call,
+    when the stored model version changes or when a reload is forced.
+    """
+    if not force and _is_cache_fresh(time()):
+        return _model_cache["model"]
+    with _model_lock:
+        # Another request may have refreshed the cache while waiting
+        if not force and _is_cache_fresh(time()):
+            return _model_cache["model"]
+        version = get_model_version()
+        if force or _model_cache["model"] is None or version != _model_cache["version"]:
+            _model_cache["model"] = get_deserialize_model()
+            _model_cache["version"] = version
+        _model_cache["checked_at"] = time()
+        return _model_cache["model"]
 
 
 @router.get("/models/")
-def get_models(model_name: Optional[str] = "current"):
-    response = Response(code="", message="", result={})
+def get_models(
+    model_name: Optional[str] = "current",
+    continuation_token: Optional[str] = None,
+    limit: int = 1000,
+):
+    response = {}
     # %{list_model_code}%
     # s3client = boto3.client("s3")
     # delimiter = f"{model_name}*" if model_name != "current" else "*"
@@ -42,26 +108,77 @@ async def log_prediction(data):
     created_at = datetime.fromtimestamp(time()).isoformat()
     js_data["created_at"] = created_at
     js_data["data"] = data
-    filename = f"predictions/predict-{created_at}.json"
-    await create_log(filename=filename, file_data=json.dumps(js_data))
+    # Buffered and flushed in the background as newline-delimited JSON
+    prediction_log.append(js_data)
 
 
 @router.post("/models/predict", response_model=Response)
 async def get_prediction(data: List):
-    pred = [0]
-    model = get_deserialize_model()
-    # preprocess data
-    # %{model_preprocessor}%
-    # predict from model
-    # %{model_predictor}%
-    # postprocessor for data
-    # %{model_postprocessor}%
+    if MICRO_BATCHING:
+        return await get_micro_batched_prediction(data)
+    model = await run_blocking(load_model)
+    pred = adapter.predict(model, data)
     response = {"prediction": pred}
     log_response = {"prediction": pred, "data": data}
     await log_prediction(log_response)
     return Response(code=200, message="Success", result=response)
 
 
+def predict_batch(model, data: List) -> list:
+    """
+    Run one vectorized prediction over a batch of input rows and return one
+    prediction per row.
+    """
+    return adapter.predict_batch(model, data)
+
+
+def predict_micro_batch(data: List) -> list:
+    return predict_batch(load_model(), data)
+
+
+batcher = MicroBatcher(
+    predict_fn=predict_micro_batch,
+    max_batch_size=MICRO_BATCH_SIZE,
+    max_wait_ms=MICRO_BATCH_WAIT_MS,
+)
+
+
+async def get_micro_batched_prediction(data: List):
+    # A request holds either a single row or a list of rows
+    rows = data if len(data) > 0 and isinstance(data[0], list) else [data]
+    preds = await batcher.submit(rows)
+    pred = adapter.single_prediction(preds[0]) if len(preds) == 1 else preds
+    response = {"prediction": pred}
+    log_response = {"prediction": pred, "data": data}
+    await log_prediction(log_response)
+    return Response(code=200, message="Success", result=response)
+
+
+@router.post("/models/predict/batch", response_model=Response)
+async def get_batch_prediction(data: List[List]):
+    model = await run_blocking(load_model)
+    pred = predict_batch(model, data)
+    response = {"predictions": pred}
+    log_response = {"predictions": pred, "data": data}
+    await log_prediction(log_response)
+    return Response(code=200, message="Success", result=response)
+
+
+@router.post("/models/reload", response_model=Response)
+def reload_model():
+    load_model(force=True)
+    result = {"version": _model_cache["version"]}
+    return Response(code=200, message="Model reloaded", result=result)
+
+
+# Load the model once at import so warm requests skip S3 and deserialization
+if PRELOAD_MODEL:
+    try:
+        load_model()
+    except Exception as error:
+        print(f"Model preload failed, loading on first request - {error}")
+
+
 # @router.post("/models/{model_name}", response_model=Response)
 # def set_model_api(model_name: str):
 #     s3client = boto3.client("s3")
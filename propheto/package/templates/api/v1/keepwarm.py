@@ -0,0 +1,48 @@
+import os
+import json
+from time import sleep
+from concurrent.futures import ThreadPoolExecutor
+
+# Key of the keepwarm pings sent by the CloudWatch rule of the deployment
+WARMER_KEY = "%{warmer_key}%"
+# Time a warmed container stays busy so concurrent pings land on other containers
+WARMER_DELAY = float(os.environ.get("PROPHETO_WARMER_DELAY", "0.075"))
+
+
+def is_warm_ping(event: object) -> bool:
+    """
+    Check the invocation is a keepwarm ping rather than an API request.
+    Scheduled events without a keepwarm input are pings from older rules.
+    """
+    if not isinstance(event, dict):
+        return False
+    if event.get(WARMER_KEY, False):
+        return True
+    return event.get("source") == "aws.events" and event.get("detail-type") == "Scheduled Event"
+
+
+def warm(event: dict, context: object) -> dict:
+    """
+    Answer a keepwarm ping without running the model. The scheduled ping
+    fans out into `concurrency` simultaneous invocations of this function
+    so that many execution environments are kept initialized.
+    """
+    concurrency = int(event.get("concurrency", 1))
+    if concurrency > 1 and not event.get("fanout", False):
+        import boto3
+
+        client = boto3.client("lambda")
+        payload = json.dumps({WARMER_KEY: True, "fanout": True}).encode("utf-8")
+
+        def invoke(_) -> None:
+            client.invoke(
+                FunctionName=context.invoked_function_arn,
+                InvocationType="RequestResponse",
+                Payload=payload,
+            )
+
+        with ThreadPoolExecutor(max_workers=concurrency - 1) as executor:
+            list(executor.map(invoke, range(concurrency - 1)))
+    else:
+        sleep(WARMER_DELAY)
+    return {"warmed": concurrency}
@@ -0,0 +1,92 @@
+import os
+import hashlib
+import tempfile
+from .codecs import model_codec, decompress_to_file
+
+# Models fetched from S3 are kept here keyed by their location and ETag. The
+# directory outlives the process, so a restarted runtime in the same container
+# or other workers on the same host skip the download. Point it at a mounted
+# file system to share it between containers and projects.
+MODEL_CACHE_DIR = os.environ.get(
+    "PROPHETO_MODEL_CACHE_DIR", os.path.join(tempfile.gettempdir(), "propheto-models")
+)
+
+
+def _cached_name(model_name: str) -> str:
+    # Compressed models are cached decompressed so the codec suffix is dropped
+    return os.path.splitext(model_name)[0] if model_codec(model_name) else model_name
+
+
+def _source_prefix(source: str) -> str:
+    """
+    Cache file name prefix of a model location, e.g. `bucket/key`, so models
+    of other projects sharing the directory are never mixed up or evicted
+    """
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16] + "-"
+
+
+def _cache_path(source: str, version: str, model_name: str) -> str:
+    """
+    Path of a model version in the cache
+    """
+    version = "".join(char for char in version if char.isalnum() or char in "-_")
+    return os.path.join(
+        MODEL_CACHE_DIR, f"{_source_prefix(source)}{version}-{_cached_name(model_name)}"
+    )
+
+
+def _evict_other_versions(model_path: str, source: str) -> None:
+    prefix = _source_prefix(source)
+    for filename in os.listdir(MODEL_CACHE_DIR):
+        file_path = os.path.join(MODEL_CACHE_DIR, filename)
+        if filename.startswith(prefix) and file_path != model_path:
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+
+
+def local_model_path(model_path: str) -> str:
+    """
+    Return a readable path for a model on local disk, decompressing it into
+    the cache once when it is compressed.
+    """
+    codec = model_codec(model_path)
+    if not codec:
+        return model_path
+    model_stat = os.stat(model_path)
+    source = os.path.abspath(model_path)
+    cache_path = _cache_path(
+        source, f"{model_stat.st_size}-{int(model_stat.st_mtime)}", os.path.basename(model_path)
+    )
+    if not os.path.exists(cache_path):
+        os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+        with open(model_path, "rb") as compressed_file:
+            decompress_to_file(compressed_file, codec, cache_path)
+        _evict_other_versions(cache_path, source)
+    return cache_path
+
+
+def fetch_model(s3client, bucket_name: str, object_key: str) -> str:
+    """
+    Return the local path of the current version of a model stored in S3,
+    downloading it only when that version is not cached yet.
+    """
+    etag = s3client.head_object(Bucket=bucket_name, Key=object_key)["ETag"].strip('"')
+    source = f"{bucket_name}/{object_key}"
+    cache_path = _cache_path(source, etag, os.path.basename(object_key))
+    if os.path.exists(cache_path):
+        return cache_path
+    os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+    codec = model_codec(object_key)
+    if codec:
+        # Decompressed while streaming from S3, only the decompressed model is written
+        response = s3client.get_object(Bucket=bucket_name, Key=object_key)
+        decompress_to_file(response["Body"], codec, cache_path)
+    else:
+        # Streamed to disk so the model is never held in memory as one bytes object
+        temp_path = f"{cache_path}.tmp"
+        s3client.download_file(Bucket=bucket_name, Key=object_key, Filename=temp_path)
+        os.replace(temp_path, cache_path)
+    _evict_other_versions(cache_path, source)
+    return cache_path
@@ -0,0 +1,142 @@
+import os
+import json
+import uuid
+import atexit
+import threading
+from collections import deque
+from datetime import datetime
+from time import time
+from .clients import get_s3_client
+
+# Flush once this many records are buffered or this many seconds have passed
+LOG_FLUSH_SIZE = int(os.environ.get("PROPHETO_LOG_FLUSH_SIZE", "500"))
+LOG_FLUSH_SECONDS = float(os.environ.get("PROPHETO_LOG_FLUSH_SECONDS", "30"))
+# Oldest records are dropped once the buffer holds this many records
+LOG_BUFFER_SIZE = int(os.environ.get("PROPHETO_LOG_BUFFER_SIZE", "10000"))
+# Lambda freezes the process between invocations, so neither a background
+# thread nor atexit can be relied on and the handler flushes instead
+LAMBDA_RUNTIME = "AWS_LAMBDA_FUNCTION_NAME" in os.environ
+
+
+def write_log_batch(filename: str, file_data: str) -> None:
+    # %{write_logs_code}%
+    return None
+
+
+class PredictionLogBuffer:
+    """
+    In-memory ring buffer of prediction records flushed in the background as
+    newline-delimited JSON objects instead of one object per prediction.
+    Without the background flusher, `flush_if_due` has to be called, e.g. at
+    the end of every Lambda invocation.
+    """
+
+    def __init__(
+        self,
+        flush_size: int = LOG_FLUSH_SIZE,
+        flush_seconds: float = LOG_FLUSH_SECONDS,
+        buffer_size: int = LOG_BUFFER_SIZE,
+        background: bool = not LAMBDA_RUNTIME,
+    ) -> None:
+        self.flush_size = flush_size
+        self.flush_seconds = flush_seconds
+        self.background = background
+        self.dropped = 0
+        self._records = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread = None
+        self._last_flush = time()
+
+    def append(self, record: dict) -> None:
+        """
+        Buffer a record and wake the flusher when a threshold is reached.
+        """
+        if self.background and self._thread is None:
+            self.start()
+        with self._lock:
+            if len(self._records) == self._records.maxlen:
+                self.dropped += 1
+            self._records.append(record)
+        if self.flush_due():
+            self._wake.set()
+
+    def flush_due(self) -> bool:
+        """
+        Check whether the size or age threshold of the buffered records is reached.
+        """
+        with self._lock:
+            buffered = len(self._records)
+        if buffered == 0:
+            return False
+        return buffered >= self.flush_size or time() - self._last_flush >= self.flush_seconds
+
+    def flush_if_due(self) -> bool:
+        """
+        Flush when a threshold is reached. Failures are reported, not raised,
+        and the records are kept for the next attempt.
+        """
+        if not self.flush_due():
+            return False
+        try:
+            self.flush()
+        except Exception as error:
+            print(f"Prediction log flush failed - {error}")
+            return False
+        return True
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="propheto-prediction-log", daemon=True
+            )
+            self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self) -> None:
+        while not self._closed.is_set():
+            self._wake.wait(timeout=self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as error:
+                print(f"Prediction log flush failed - {error}")
+
+    def flush(self) -> None:
+        """
+        Write all buffered records as a single newline-delimited JSON object.
+        """
+        with self._flush_lock:
+            with self._lock:
+                records = list(self._records)
+                self._records.clear()
+            self._last_flush = time()
+            if len(records) == 0:
+                return
+            created_at = datetime.fromtimestamp(time()).isoformat()
+            filename = f"predictions/predict-{created_at}-{uuid.uuid4().hex[:8]}.jsonl"
+            file_data = "\n".join(json.dumps(record) for record in records) + "\n"
+            try:
+                write_log_batch(filename=filename, file_data=file_data)
+            except Exception:
+                # Keep the records for the next flush attempt
+                with self._lock:
+                    self._records.extendleft(reversed(records))
+                raise
+
+    def close(self) -> None:
+        """
+        Stop the background flusher and write any remaining records.
+        """
+        self._closed.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.flush_seconds)
+        self.flush()
+
+
+prediction_log = PredictionLogBuffer()
@@ -1,8 +1,17 @@
-from ..utilities import copytree, human_size
-import tempfile
+from ..utilities import file_hash, human_size
+from .slim import PackageSlimmer
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import struct
 import zipfile
+import zlib
+import json
+import glob
 import os
-import shutil
 import logging
 
 logger = logging.getLogger(__name__)
@@ -25,12 +34,129 @@ ZIP_EXCLUDES = [
 
 ZIP_CODEBUILD_EXCLUDES = [
     # IF DOING CODEBUILD EXCLUDE VENV
-    "env/*"
-    ".env/*"
-    ".venv/*"
-    "venv/*"
+    "env/*",
+    ".env/*",
+    ".venv/*",
+    "venv/*",
 ]
 
+# Already compressed formats gain nothing from deflate so they are stored as is
+STORE_SUFFIXES = [
+    ".so",
+    ".whl",
+    ".h5",
+    ".hdf5",
+    ".pkl",
+    ".pickle",
+    ".joblib",
+    ".pt",
+    ".pth",
+    ".zip",
+    ".gz",
+    ".bz2",
+    ".xz",
+    ".zst",
+    ".lz4",
+    ".ubj",
+    ".npz",
+    ".png",
+    ".jpg",
+]
+
+# Files above this size are deflated by zipfile in chunks rather than in memory
+LARGE_FILE_SIZE = 256 * 1024 ** 2
+
+# Bytes of source files compressed in memory ahead of the archive writer
+WINDOW_BYTES = 256 * 1024 ** 2
+
+# Suffix of the manifest stored next to the archive
+MANIFEST_SUFFIX = ".manifest.json"
+
+# Size of the fixed part of a zip local file header
+_LOCAL_HEADER_SIZE = 30
+
+
+def is_excluded(name: str, is_dir: bool, excludes: List[str]) -> bool:
+    """
+    Check a file or directory name against the exclude patterns. Patterns
+    are matched against the name like `shutil.ignore_patterns` and a pattern
+    ending in `/*` excludes a directory with that name.
+    """
+    for pattern in excludes:
+        if fnmatch(name, pattern):
+            return True
+        if is_dir and pattern.endswith("/*") and fnmatch(name, pattern[:-2]):
+            return True
+    return False
+
+
+def read_raw_entry(archive: zipfile.ZipFile, zinfo: zipfile.ZipInfo) -> bytes:
+    """
+    Read the still compressed bytes of an archive member.
+    """
+    archive.fp.seek(zinfo.header_offset)
+    header = archive.fp.read(_LOCAL_HEADER_SIZE)
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    archive.fp.seek(zinfo.header_offset + _LOCAL_HEADER_SIZE + name_length + extra_length)
+    return archive.fp.read(zinfo.compress_size)
+
+
+def write_raw_entry(archive: zipfile.ZipFile, zinfo: zipfile.ZipInfo, data: bytes) -> None:
+    """
+    Append an already compressed member to an archive opened for writing.
+    `zinfo` must carry the CRC, sizes and compression type of `data`.
+    """
+    with archive._lock:
+        zinfo.header_offset = archive.fp.tell()
+        # Sizes and CRC are known so they go in the header, not a data descriptor
+        zinfo.flag_bits &= ~0x08
+        archive.fp.write(zinfo.FileHeader())
+        archive.fp.write(data)
+        archive.filelist.append(zinfo)
+        archive.NameToInfo[zinfo.filename] = zinfo
+        archive.start_dir = archive.fp.tell()
+        archive._didModify = True
+
+
+def compress_file(
+    file_path: str, arcname: str, compression_level: int, store: bool
+) -> Tuple[zipfile.ZipInfo, bytes, str]:
+    """
+    Read and compress a file into a raw zip member. zlib and hashlib release
+    the GIL so several files are compressed at once on a thread pool.
+
+    Parameters
+    ----------
+    file_path : str
+            Path of the source file
+    arcname : str
+            Name of the member in the archive
+    compression_level : int
+            zlib compression level from 0 to 9
+    store : bool
+            Store the file without compression
+
+    Returns
+    -------
+    zinfo, data, sha256 : tuple
+            Member info, compressed bytes and hex digest of the file contents
+    """
+    with open(file_path, "rb") as source_file:
+        contents = source_file.read()
+    zinfo = zipfile.ZipInfo.from_file(file_path, arcname)
+    zinfo.file_size = len(contents)
+    zinfo.CRC = zlib.crc32(contents) & 0xFFFFFFFF
+    data = contents
+    zinfo.compress_type = zipfile.ZIP_STORED
+    if not store and len(contents) > 0:
+        compressor = zlib.compressobj(compression_level, zlib.DEFLATED, -15)
+        deflated = compressor.compress(contents) + compressor.flush()
+        if len(deflated) < len(contents):
+            data = deflated
+            zinfo.compress_type = zipfile.ZIP_DEFLATED
+    zinfo.compress_size = len(data)
+    return zinfo, data, hashlib.sha256(contents).hexdigest()
+
 
 class ZipService:
     """
@@ -42,74 +168,226 @@ class ZipService:
         app_directory: str = None,
         zip_filename: str = "lambda.zip",
         zip_codebuild: bool = True,
+        compression_level: int = 6,
+        max_workers: Optional[int] = None,
+        store_suffixes: Optional[List[str]] = None,
+        slim: bool = True,
+        prune_modules: bool = False,
+        prune_test_dirs: bool = False,
         *args,
         **kwargs
     ) -> None:
         self.app_directory = app_directory if app_directory else os.getcwd()
         self.zip_filename = zip_filename
-        self.temp_dir = None
         self.zip_codebuild = zip_codebuild  # ZIP PROJECT FOR CODEBUILD
+        self.compression_level = compression_level
+        self.max_workers = max_workers if max_workers else (os.cpu_count() or 1)
+        self.store_suffixes = store_suffixes if store_suffixes is not None else STORE_SUFFIXES
+        self.slim = slim  # SLIM BUNDLED PACKAGES BEFORE ZIPPING
+        self.slimmer = PackageSlimmer(
+            prune_modules=prune_modules, prune_test_dirs=prune_test_dirs, max_workers=self.max_workers
+        )
+
+    @property
+    def compression_settings(self) -> dict:
+        return {"level": self.compression_level, "store_suffixes": sorted(self.store_suffixes)}
+
+    def is_stored(self, arcname: str) -> bool:
+        """
+        Check if the file is already compressed and should be stored as is.
+        """
+        return any(arcname.lower().endswith(suffix) for suffix in self.store_suffixes)
 
-    def create_temp_directory(self, prefix: str = "propheto-package") -> str:
+    def collect_files(
+        self, source_path: str, excludes: Optional[List[str]] = None
+    ) -> Dict[str, Tuple[str, os.stat_result]]:
         """
-        Generate a temporary directory. 
+        Walk the source tree and list the files to package.
+
+        Parameters
+        ----------
+        source_path : str
+                Directory whose contents go to the root of the archive
+        excludes : list, optional
+                Exclude patterns. Defaults to the zip excludes for this service
+
+        Returns
+        -------
+        files : dict
+                Source path and stat result of every file keyed by archive name
         """
-        temp_project_path = tempfile.mkdtemp(prefix=prefix)
-        self.temp_dir = temp_project_path
-        return temp_project_path
+        if excludes is None:
+            excludes = ZIP_EXCLUDES + (ZIP_CODEBUILD_EXCLUDES if self.zip_codebuild else [])
+        source_path = str(source_path)
+        files = {}
+        for root, dirs, filenames in os.walk(source_path, followlinks=True):
+            dirs[:] = sorted(d for d in dirs if not is_excluded(d, True, excludes))
+            relative_root = os.path.relpath(root, source_path)
+            for filename in sorted(filenames):
+                if is_excluded(filename, False, excludes):
+                    continue
+                file_path = os.path.join(root, filename)
+                arcname = filename if relative_root == "." else f"{relative_root}/{filename}"
+                files[arcname.replace(os.sep, "/")] = (file_path, os.stat(file_path))
+        return files
 
-    def copy_directory(self, source_path: str, target_path: str = None) -> None:
+    def load_manifest(self, zip_filename: str) -> dict:
+        """
+        Load the manifest of the previous archive if it still matches the
+        archive on disk and was written with the same compression settings.
         """
-        Copy the files into the directory
+        manifest_path = str(zip_filename) + MANIFEST_SUFFIX
+        if not os.path.exists(zip_filename) or not os.path.exists(manifest_path):
+            return {}
+        try:
+            with open(manifest_path, "r") as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            return {}
+        archive_stat = os.stat(zip_filename)
+        archive = manifest.get("archive", {})
+        if archive.get("size") != archive_stat.st_size or archive.get("mtime_ns") != archive_stat.st_mtime_ns:
+            return {}
+        if manifest.get("compression") != self.compression_settings:
+            return {}
+        return manifest.get("files", {})
+
+    def zip_files(
+        self, files: Dict[str, Tuple[str, os.stat_result]], zip_filename: str = None
+    ) -> str:
         """
-        source_path = source_path if source_path else self.app_directory
-        target_path = target_path if target_path else self.temp_dir
-        ## COPY THE PACKAGE FILES
-        excludes = ZIP_EXCLUDES
-        excludes += ZIP_CODEBUILD_EXCLUDES if self.zip_codebuild else []
-        ignore = shutil.ignore_patterns(*excludes)
-        copytree(
-            source_path, target_path, metadata=False, symlinks=False, ignore=ignore,
+        Write the files into the archive straight from their source paths.
+        Changed files are compressed in parallel and appended in order, while
+        members of unchanged files are copied still compressed from the
+        previous archive using the manifest stored next to it.
+
+        Parameters
+        ----------
+        files : dict
+                Source path and stat result of every file keyed by archive name
+        zip_filename : str, optional
+                Output archive path
+
+        Returns
+        -------
+        zip_filename : str
+                Output archive path
+        """
+        zip_filename = str(zip_filename if zip_filename else self.zip_filename)
+        previous_files = self.load_manifest(zip_filename)
+        previous_archive = zipfile.ZipFile(zip_filename, "r") if previous_files else None
+        temp_filename = zip_filename + ".tmp"
+        manifest_files = {}
+        reused = 0
+        # Members waiting to be written, bounded by the bytes compressed in
+        # memory so memory use stays flat whatever the file sizes
+        window = deque()
+        window_size = self.max_workers * 4
+        window_bytes = 0
+
+        def write_next(zip_file: zipfile.ZipFile) -> None:
+            nonlocal window_bytes
+            arcname, kind, payload = window.popleft()
+            if kind == "reuse":
+                write_raw_entry(zip_file, payload, read_raw_entry(previous_archive, payload))
+            elif kind == "large":
+                compress_type = zipfile.ZIP_STORED if self.is_stored(arcname) else zipfile.ZIP_DEFLATED
+                zip_file.write(
+                    payload,
+                    arcname=arcname,
+                    compress_type=compress_type,
+                    compresslevel=self.compression_level,
+                )
+            else:
+                zinfo, data, digest = payload.result()
+                window_bytes -= manifest_files[arcname]["size"]
+                manifest_files[arcname]["sha256"] = digest
+                write_raw_entry(zip_file, zinfo, data)
+
+        try:
+            with zipfile.ZipFile(temp_filename, "w") as zip_file, ThreadPoolExecutor(
+                max_workers=self.max_workers
+            ) as executor:
+                for arcname, (file_path, file_stat) in files.items():
+                    entry = {"size": file_stat.st_size, "mtime_ns": file_stat.st_mtime_ns}
+                    manifest_files[arcname] = entry
+                    previous = previous_files.get(arcname)
+                    unchanged = False
+                    if previous and previous["size"] == file_stat.st_size:
+                        if previous["mtime_ns"] == file_stat.st_mtime_ns:
+                            entry["sha256"] = previous["sha256"]
+                            unchanged = True
+                        else:
+                            entry["sha256"] = file_hash(file_path)
+                            unchanged = entry["sha256"] == previous["sha256"]
+                    if unchanged and arcname in previous_archive.NameToInfo:
+                        window.append((arcname, "reuse", previous_archive.getinfo(arcname)))
+                        reused += 1
+                    elif file_stat.st_size > LARGE_FILE_SIZE:
+                        if "sha256" not in entry:
+                            entry["sha256"] = file_hash(file_path)
+                        window.append((arcname, "large", file_path))
+                    else:
+                        future = executor.submit(
+                            compress_file,
+                            file_path,
+                            arcname,
+                            self.compression_level,
+                            self.is_stored(arcname),
+                        )
+                        window.append((arcname, "compress", future))
+                        window_bytes += file_stat.st_size
+                    while len(window) > window_size or (window and window_bytes > WINDOW_BYTES):
+                        write_next(zip_file)
+                while window:
+                    write_next(zip_file)
+        finally:
+            if previous_archive:
+                previous_archive.close()
+        os.replace(temp_filename, zip_filename)
+        archive_stat = os.stat(zip_filename)
+        manifest = {
+            "archive": {"size": archive_stat.st_size, "mtime_ns": archive_stat.st_mtime_ns},
+            "compression": self.compression_settings,
+            "files": manifest_files,
+        }
+        with open(zip_filename + MANIFEST_SUFFIX, "w") as manifest_file:
+            json.dump(manifest, manifest_file)
+        logger.info(
+            f"Packaged {len(files)} files ({reused} unchanged) into {zip_filename} ({human_size(archive_stat.st_size)})"
         )
+        return zip_filename
 
     def zip_directory(self, zip_filename: str = None, file_dir: str = None) -> str:
         """
-        Zip the directory 
+        Zip the directory
         """
         zip_filename = zip_filename if zip_filename else self.zip_filename
-        file_dir = file_dir if file_dir else self.temp_dir
-        # Assign the name of the directory to zip
-        # writing files to a zipfile
-        zip_file = zipfile.ZipFile(zip_filename, "w")
-        with zip_file:
-            # Read all directory, subdirectories and file lists
-            for root, dirs, files in os.walk(file_dir):
-                for file in files:
-                    # Create the full filepath by using os module.
-                    zip_file.write(
-                        os.path.join(root, file),
-                        arcname=os.path.join(root.replace(file_dir, ""), file),
-                        compress_type=zipfile.ZIP_DEFLATED,
-                    )
-        return zip_filename
+        file_dir = file_dir if file_dir else self.app_directory
+        return self.zip_files(self.collect_files(file_dir), zip_filename=zip_filename)
 
     def package_project(self, app_dir: str = None) -> str:
         """
         Create a package for the project.
         """
-        temp_project_path = self.create_temp_directory()
         # TODO: FIGURE OUT WAY TO PARSE THE ENVIRONMENT AND PYTHON VERSION
-        app_dir = app_dir if app_dir else self.app_directory
-        # COPY THE VIRTUAL ENVIRONMENT
+        app_dir = Path(app_dir if app_dir else self.app_directory)
+        api_dir = app_dir.joinpath("api")
+        files = {}
         # IF DOING VIRTUAL ENV ZIP THEN INCLUDE SITEPACKAGES
         if not self.zip_codebuild:
-            packages_dir = app_dir + "/env/lib/python3.7/site-packages"
-            self.copy_directory(source_path=packages_dir, target_path=temp_project_path)
-        # COPY THE APPLICATION DIRECTORY
-        api_dir = app_dir.joinpath("api")
-        self.copy_directory(source_path=api_dir, target_path=temp_project_path)
-        zip_filename = self.zip_directory(
-            zip_filename="lambda.zip", file_dir=temp_project_path
-        )
+            packages_dirs = sorted(glob.glob(str(app_dir.joinpath("env", "lib", "python*", "site-packages"))))
+            if packages_dirs:
+                package_files = self.collect_files(packages_dirs[-1])
+                if self.slim:
+                    package_files = self.slimmer.slim(
+                        package_files,
+                        entry_point=str(api_dir.joinpath("main.py")),
+                        search_paths=[str(api_dir), packages_dirs[-1]],
+                    )
+                    print(self.slimmer.format_report())
+                files.update(package_files)
+        # THE APPLICATION DIRECTORY OVERRIDES ANY PACKAGE FILE WITH THE SAME NAME
+        files.update(self.collect_files(api_dir))
+        zip_filename = self.zip_files(files, zip_filename="lambda.zip")
         return zip_filename
-
@@ -0,0 +1,192 @@
+from time import time
+from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Step:
+    """
+    Single unit of work in a pipeline
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Dict[str, Any]], Any],
+        depends_on: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        name : str
+                Unique name of the step
+        func : Callable
+                Function called with the dictionary of results of the
+                finished steps, keyed by step name
+        depends_on : list, optional
+                Names of the steps that have to finish before this one starts
+        """
+        self.name = name
+        self.func = func
+        self.depends_on = list(depends_on) if depends_on else []
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def duration(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+    def __repr__(self) -> str:
+        return f"Step(name={self.name}, depends_on={self.depends_on})"
+
+    def __str__(self) -> str:
+        return f"Step(name={self.name}, depends_on={self.depends_on})"
+
+
+class Pipeline:
+    """
+    Run a directed acyclic graph of steps on a thread pool. Each step starts
+    as soon as all of the steps it depends on have finished, so independent
+    steps run in parallel.
+    """
+
+    def __init__(self, name: Optional[str] = "", max_workers: Optional[int] = 8) -> None:
+        """
+        Parameters
+        ----------
+        name : str, optional
+                Name of the pipeline used in the timing report
+        max_workers : int, optional
+                Maximum number of steps running at the same time
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.steps = {}
+        self.results = {}
+        self.started_at = None
+        self.finished_at = None
+
+    def __repr__(self) -> str:
+        return f"Pipeline(name={self.name}, steps={list(self.steps)})"
+
+    def __str__(self) -> str:
+        return f"Pipeline(name={self.name}, steps={list(self.steps)})"
+
+    def add_step(
+        self,
+        name: str,
+        func: Callable[[Dict[str, Any]], Any],
+        depends_on: Optional[List[str]] = None,
+    ) -> Step:
+        """
+        Add a step to the pipeline
+
+        Parameters
+        ----------
+        name : str
+                Unique name of the step
+        func : Callable
+                Function called with the dictionary of results of the finished steps
+        depends_on : list, optional
+                Names of the steps that have to finish before this one starts
+        """
+        if name in self.steps:
+            raise Exception(f"Step {name} already exists in the pipeline")
+        step = Step(name=name, func=func, depends_on=depends_on)
+        self.steps[name] = step
+        return step
+
+    def _validate(self) -> None:
+        """
+        Check every dependency exists and the steps do not form a cycle
+        """
+        for step in self.steps.values():
+            for dependency in step.depends_on:
+                if dependency not in self.steps:
+                    raise Exception(f"Step {step.name} depends on unknown step {dependency}")
+        visited, in_progress = set(), set()
+
+        def visit(name: str) -> None:
+            if name in visited:
+                return
+            if name in in_progress:
+                raise Exception(f"Pipeline steps have a circular dependency on {name}")
+            in_progress.add(name)
+            for dependency in self.steps[name].depends_on:
+                visit(dependency)
+            in_progress.discard(name)
+            visited.add(name)
+
+        for name in self.steps:
+            visit(name)
+
+    def _run_step(self, step: Step) -> Any:
+        step.started_at = time()
+        try:
+            return step.func(dict(self.results))
+        finally:
+            step.finished_at = time()
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run all steps, respecting their dependencies. When a step fails no new
+        steps are started, the running ones are allowed to finish and the
+        first error is raised.
+
+        Returns
+        -------
+        results : dict
+                Return value of every step keyed by step name
+        """
+        self._validate()
+        self.results = {}
+        self.started_at = time()
+        pending = dict(self.steps)
+        running = {}
+        error = None
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                if error is None:
+                    for name, step in list(pending.items()):
+                        if all(dependency in self.results for dependency in step.depends_on):
+                            running[executor.submit(self._run_step, step)] = step
+                            del pending[name]
+                if not running:
+                    break
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    try:
+                        self.results[step.name] = future.result()
+                    except Exception as step_error:
+                        logger.debug(f"Step {step.name} failed", exc_info=True)
+                        if error is None:
+                            print(f"Step {step.name} failed - {step_error}")
+                            error = step_error
+        self.finished_at = time()
+        if error is not None:
+            raise error
+        return self.results
+
+    def report(self) -> str:
+        """
+        Timing report of the steps in the order they started
+        """
+        started = [step for step in self.steps.values() if step.started_at is not None]
+        started.sort(key=lambda step: step.started_at)
+        width = max([len(step.name) for step in started] + [4])
+        lines = [f"{'Step':<{width}}  {'Start':>8}  {'Duration':>8}"]
+        for step in started:
+            offset = step.started_at - self.started_at
+            lines.append(f"{step.name:<{width}}  {offset:>7.1f}s  {step.duration:>7.1f}s")
+        if self.started_at is not None and self.finished_at is not None:
+            total = self.finished_at - self.started_at
+            serial = sum(step.duration for step in started)
+            lines.append(
+                f"{self.name or 'Pipeline'} finished in {total:.1f}s ({serial:.1f}s of step time)"
+            )
+        return "\n".join(lines)
@@ -1,4 +1,3 @@
-from botocore import credentials
 from requests import session
 from time import time
 from propheto.utilities import unique_id
@@ -1,10 +1,14 @@
 import pickle
 from typing import Optional, List
 from .resource import Resource
+from ...pipeline import Pipeline
 from datetime import datetime, date
 from time import time
 import copy
 
+# Resources that have to be destroyed before any resource with the given name
+DESTROY_AFTER = {"AWSLambda": ["APIGateway", "Cloudwatch"]}
+
 
 class Iteration:
     """
@@ -108,17 +112,35 @@ class Iteration:
         self, excludes: Optional[List[str]] = [], includes: Optional[List[str]] = []
     ) -> str:
         """
-        Destroy the AWS resources
+        Destroy the AWS resources. Independent resources are destroyed in
+        parallel while resources listed in `DESTROY_AFTER` wait for the ones
+        that depend on them.
         """
+        selected = {}
         for resource_id, resource in self.resources.items():
             if includes != []:
                 if resource_id in includes or resource.name in includes:
-                    print(f"Destroying - {resource.name}")
-                    resource.destroy()
-                    print("Destroyed")
+                    selected[resource_id] = resource
             else:
                 if resource_id not in excludes and resource.name not in excludes:
-                    print(f"Destroying - {resource.name}")
-                    resource.destroy()
-                    print("Destroyed")
+                    selected[resource_id] = resource
+
+        def destroy_resource(resource: Resource):
+            def destroy_step(results: dict) -> None:
+                print(f"Destroying - {resource.name}")
+                resource.destroy()
+                print(f"Destroyed - {resource.name}")
+
+            return destroy_step
+
+        pipeline = Pipeline(name="Destroy")
+        for resource_id, resource in selected.items():
+            destroy_first = DESTROY_AFTER.get(resource.name, [])
+            depends_on = [
+                other_id
+                for other_id, other in selected.items()
+                if other.name in destroy_first
+            ]
+            pipeline.add_step(resource_id, destroy_resource(resource), depends_on)
+        pipeline.run()
         return "Resources destroyed"
@@ -1,10 +1,13 @@
 import os
+import sys
 import stat
+import hashlib
 import shutil
 import random
 import logging
+import importlib
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -134,3 +137,67 @@ def get_list_directory_files(directory_path: str) -> list:
             if str(_path)[-4:] != ".pyc":
                 directory_files.append(_path)
     return directory_files
+
+
+def file_hash(
+    file_path: str, algorithm: Optional[str] = "sha256", chunk_size: Optional[int] = 1024 ** 2
+) -> str:
+    """
+    Hash the file contents without reading the whole file into memory.
+
+    Parameters
+    ----------
+    file_path : str
+            Path to the file to hash.
+    algorithm : str, optional
+            Any algorithm name supported by hashlib.
+    chunk_size : int, optional
+            Number of bytes read at a time.
+
+    Returns
+    -------
+    digest : str
+            Hex digest of the file contents
+    """
+    file_digest = hashlib.new(algorithm)
+    with open(file_path, "rb") as _file:
+        for chunk in iter(lambda: _file.read(chunk_size), b""):
+            file_digest.update(chunk)
+    return file_digest.hexdigest()
+
+
+def lazy_attributes(module_globals: Dict[str, Any], attributes: Dict[str, str]) -> Callable:
+    """
+    Defer importing the public attributes of a package until they are first
+    used, through a module level `__getattr__` (PEP 562). Python 3.6 has no
+    module `__getattr__` so the attributes are imported right away there.
+
+    Parameters
+    ----------
+    module_globals : dict
+            `globals()` of the package
+    attributes : dict
+            Relative module each attribute is imported from, keyed by attribute name
+
+    Returns
+    -------
+    __getattr__ : Callable
+            Function to assign to the package `__getattr__`
+    """
+    package = module_globals["__name__"]
+
+    def load(name: str) -> Any:
+        value = getattr(importlib.import_module(attributes[name], package), name)
+        # Cache on the package so later lookups skip __getattr__
+        module_globals[name] = value
+        return value
+
+    def __getattr__(name: str) -> Any:
+        if name in attributes:
+            return load(name)
+        raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+    if sys.version_info[:2] < (3, 7):
+        for name in attributes:
+            load(name)
+    return __getattr__
@@ -0,0 +1,33 @@
+import sys
+import importlib
+import importlib.util
+
+import pytest
+
+from propheto.package.service import API_TEMPLATES_DIRECTORY
+
+# Package name the v1 templates of the generated service are imported under
+SERVICE_PACKAGE = "propheto_service_v1"
+
+
+def load_template_module(name: str):
+    """
+    Import a module of the generated service straight from the templates.
+    Only modules without code placeholders behave like the generated ones.
+    """
+    if SERVICE_PACKAGE not in sys.modules:
+        package_directory = API_TEMPLATES_DIRECTORY / "v1"
+        spec = importlib.util.spec_from_file_location(
+            SERVICE_PACKAGE,
+            package_directory / "__init__.py",
+            submodule_search_locations=[str(package_directory)],
+        )
+        package = importlib.util.module_from_spec(spec)
+        sys.modules[SERVICE_PACKAGE] = package
+        spec.loader.exec_module(package)
+    return importlib.import_module(f"{SERVICE_PACKAGE}.{name}")
+
+
+@pytest.fixture
+def template_module():
+    return load_template_module
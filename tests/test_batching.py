@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+
+def _predict(rows):
+    if any(not isinstance(value, (int, float)) for row in rows for value in row):
+        raise ValueError("Invalid row")
+    return [sum(row) for row in rows]
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_requests_are_batched(template_module):
+    batching = template_module("batching")
+    calls = []
+
+    def predict(rows):
+        calls.append(len(rows))
+        return _predict(rows)
+
+    async def run():
+        batcher = batching.MicroBatcher(predict, max_batch_size=8, max_wait_ms=50)
+        results = await asyncio.gather(
+            batcher.submit([[1, 2]]), batcher.submit([[3, 4], [5, 6]])
+        )
+        await batcher.stop()
+        return results
+
+    assert _run(run()) == [[3], [7, 11]]
+    assert calls == [3]
+
+
+def test_failed_batch_only_fails_the_bad_request(template_module):
+    batching = template_module("batching")
+    calls = []
+
+    def predict(rows):
+        calls.append(len(rows))
+        return _predict(rows)
+
+    async def run():
+        batcher = batching.MicroBatcher(predict, max_batch_size=8, max_wait_ms=50)
+        results = await asyncio.gather(
+            batcher.submit([[1, 2]]),
+            batcher.submit([["bad", 2]]),
+            batcher.submit([[3, 4]]),
+            return_exceptions=True,
+        )
+        await batcher.stop()
+        return results
+
+    good, bad, other = _run(run())
+    assert good == [3]
+    assert other == [7]
+    assert isinstance(bad, ValueError)
+    # One batched call, then one call per request
+    assert calls == [3, 1, 1, 1]
+
+
+def test_single_failed_request_is_not_retried(template_module):
+    batching = template_module("batching")
+    calls = []
+
+    def predict(rows):
+        calls.append(len(rows))
+        return _predict(rows)
+
+    async def run():
+        batcher = batching.MicroBatcher(predict, max_batch_size=8, max_wait_ms=1)
+        try:
+            with pytest.raises(ValueError):
+                await batcher.submit([["bad"]])
+        finally:
+            await batcher.stop()
+
+    _run(run())
+    assert calls == [1]
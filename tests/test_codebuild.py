@@ -0,0 +1,94 @@
+import pytest
+
+from propheto.deployments.aws.codebuild import CodeBuild
+
+CLASSIC_LOG = [
+    "Step 1/6 : FROM public.ecr.aws/lambda/python:3.8 AS builder",
+    " ---> 5a1b2c3d4e5f",
+    "Step 2/6 : COPY requirements.txt .",
+    " ---> Using cache",
+    "Step 3/6 : RUN pip install --no-cache-dir --target /opt/packages -r requirements.txt",
+    " ---> Using cache",
+    "Step 4/6 : COPY main.py ${LAMBDA_TASK_ROOT}/",
+    " ---> 6b2c3d4e5f6a",
+]
+
+BUILDKIT_LOG = [
+    "#1 [internal] load build definition from Dockerfile",
+    "#2 [internal] load .dockerignore",
+    "#5 [builder 1/4] FROM public.ecr.aws/lambda/python:3.8",
+    "#5 CACHED",
+    "#6 [builder 2/4] COPY requirements.txt .",
+    "#6 CACHED",
+    "#7 [stage-1 3/4] COPY main.py ${LAMBDA_TASK_ROOT}/",
+    "#7 DONE 0.1s",
+    "#7 [stage-1 3/4] COPY main.py ${LAMBDA_TASK_ROOT}/",
+]
+
+
+class FakeCodeBuildClient:
+    def __init__(self):
+        self.projects = []
+
+    def create_project(self, **kwargs):
+        self.projects.append(kwargs)
+        return {"project": {"name": kwargs["name"]}}
+
+
+def _codebuild(log_lines=None):
+    codebuild = CodeBuild.__new__(CodeBuild)
+    codebuild.profile_name = "default"
+    codebuild.project_name = ""
+    codebuild.cache_mode = ""
+    codebuild.codebuild_client = FakeCodeBuildClient()
+    if log_lines is not None:
+        codebuild.get_build_logs = lambda build_id: log_lines
+    return codebuild
+
+
+def test_cache_hit_rate_classic_builder():
+    report = CodeBuild.cache_hit_rate(CLASSIC_LOG)
+    assert report == {"steps": 4, "cached": 2, "hit_rate": 0.5}
+
+
+def test_cache_hit_rate_buildkit():
+    # Internal steps are not counted and a step logged twice counts once
+    report = CodeBuild.cache_hit_rate(BUILDKIT_LOG)
+    assert report["steps"] == 3
+    assert report["cached"] == 2
+    assert report["hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_cache_hit_rate_without_steps():
+    assert CodeBuild.cache_hit_rate([]) == {"steps": 0, "cached": 0, "hit_rate": 0.0}
+
+
+def test_print_cache_report(capsys):
+    report = _codebuild(CLASSIC_LOG).print_cache_report("build:1")
+    assert report["hit_rate"] == 0.5
+    assert "2/4 docker steps cached (50%)" in capsys.readouterr().out
+
+
+def test_print_cache_report_without_logs(capsys):
+    codebuild = _codebuild()
+
+    def get_build_logs(build_id):
+        raise Exception("Log group not found")
+
+    codebuild.get_build_logs = get_build_logs
+    assert codebuild.print_cache_report("build:1") == {}
+    assert "Build cache report unavailable" in capsys.readouterr().out
+
+
+def test_create_project_cache_modes():
+    codebuild = _codebuild()
+    codebuild.create_project("project", "description", "role", "bucket/lambda.zip")
+    codebuild.create_project("project", "description", "role", "bucket/lambda.zip", cache_mode="local")
+    uncached, cached = codebuild.codebuild_client.projects
+    assert uncached["cache"] == {"type": "NO_CACHE"}
+    assert uncached["environment"]["environmentVariables"] == []
+    assert cached["cache"]["type"] == "LOCAL"
+    assert "LOCAL_DOCKER_LAYER_CACHE" in cached["cache"]["modes"]
+    assert cached["environment"]["environmentVariables"][0]["name"] == "PROPHETO_BUILD_CACHE"
+    with pytest.raises(Exception):
+        codebuild.create_project("project", "description", "role", "bucket/lambda.zip", cache_mode="s3")
@@ -0,0 +1,73 @@
+import os
+from fnmatch import fnmatch
+from pathlib import Path
+
+from propheto.package import APIService, ContainerEnvironment, ModelSerializer
+
+
+def _generate_build_context(tmp_path, model_path=""):
+    code = ModelSerializer().get_model_processing_code("sklearn", "aws")
+    app_directory = APIService().generate_service(
+        bucket_name="bucket",
+        object_key="project/model.joblib",
+        project_name="project",
+        output_path=str(tmp_path),
+        **code
+    )
+    ContainerEnvironment().generate_environment(
+        app_directory, ecr_repo="repo", aws_account_id="123456789012", model_path=model_path
+    )
+    return Path(app_directory)
+
+
+def _is_ignored(relative_path, patterns):
+    parts = Path(relative_path).parts
+    return any(
+        fnmatch(relative_path, pattern) or fnmatch(parts[0], pattern)
+        for pattern in patterns
+    )
+
+
+def _copy_sources(build_context):
+    """
+    Sources of the COPY instructions reading from the build context
+    """
+    sources = []
+    for line in (build_context / "Dockerfile").read_text().splitlines():
+        if line.startswith("COPY ") and not line.startswith("COPY --from"):
+            sources.extend(line.split()[1:-1])
+    return sources
+
+
+def _assert_sources_in_context(build_context):
+    patterns = [
+        line.strip()
+        for line in (build_context / ".dockerignore").read_text().splitlines()
+        if line.strip()
+    ]
+    sources = _copy_sources(build_context)
+    assert sources
+    for source in sources:
+        source = source.rstrip("/")
+        assert (build_context / source).exists(), source
+        assert not _is_ignored(source, patterns), source
+
+
+def test_dockerfile_sources_are_in_build_context(tmp_path):
+    build_context = _generate_build_context(tmp_path)
+    _assert_sources_in_context(build_context)
+    assert "requirements.txt" in _copy_sources(build_context)
+    # The build files stay out of the runtime image
+    assert "." not in _copy_sources(build_context)
+
+
+def test_baked_model_is_in_build_context(tmp_path):
+    model_path = tmp_path / "model.joblib"
+    model_path.write_bytes(b"model")
+    build_context = _generate_build_context(tmp_path / "service", str(model_path))
+    _assert_sources_in_context(build_context)
+    assert "model/model.joblib" in _copy_sources(build_context)
+    dockerfile = (build_context / "Dockerfile").read_text()
+    assert "ENV PROPHETO_MODEL_PATH=/var/task/model/model.joblib" in dockerfile
+    # The model layer comes before the code so code changes keep it cached
+    assert dockerfile.index("COPY model/") < dockerfile.index("COPY main.py")
@@ -0,0 +1,43 @@
+import sys
+import json
+import subprocess
+
+# Modules only needed once a deployment target or code introspection is used
+DEFERRED_MODULES = ["boto3", "botocore", "troposphere", "IPython", "tqdm"]
+
+# Generous budget, a fully eager import took well over a second
+IMPORT_TIME_BUDGET = 0.5
+
+
+def _import_in_subprocess(statement: str) -> dict:
+    code = (
+        "import sys, json\n"
+        "from time import perf_counter\n"
+        "started_at = perf_counter()\n"
+        f"{statement}\n"
+        "elapsed = perf_counter() - started_at\n"
+        "print(json.dumps({'elapsed': elapsed, 'modules': list(sys.modules)}))\n"
+    )
+    output = subprocess.check_output([sys.executable, "-c", code])
+    return json.loads(output.decode("utf-8").strip().splitlines()[-1])
+
+
+def test_import_defers_backends():
+    result = _import_in_subprocess("import propheto")
+    loaded = [name for name in DEFERRED_MODULES if name in result["modules"]]
+    assert loaded == []
+    assert "propheto.app" not in result["modules"]
+
+
+def test_import_propheto_class_defers_backends():
+    result = _import_in_subprocess("from propheto import Propheto")
+    loaded = [name for name in DEFERRED_MODULES if name in result["modules"]]
+    assert loaded == []
+
+
+def test_import_time():
+    # Best of a few runs to smooth out a cold file system cache
+    elapsed = min(
+        _import_in_subprocess("import propheto")["elapsed"] for _ in range(3)
+    )
+    assert elapsed < IMPORT_TIME_BUDGET
@@ -0,0 +1,92 @@
+import sys
+import json
+import types
+import threading
+
+import pytest
+
+from propheto.deployments.aws.cloudwatch import WARMER_KEY
+from propheto.package import APIService, ModelSerializer
+
+
+@pytest.fixture
+def keepwarm(template_module, monkeypatch):
+    module = template_module("keepwarm")
+    # Value the generated service gets from the CloudWatch constant
+    monkeypatch.setattr(module, "WARMER_KEY", WARMER_KEY)
+    monkeypatch.setattr(module, "WARMER_DELAY", 0)
+    return module
+
+
+@pytest.fixture
+def lambda_invokes(monkeypatch):
+    """
+    Stand-in boto3 module recording the fan-out invocations
+    """
+    invokes = []
+    lock = threading.Lock()
+
+    class FakeLambdaClient:
+        def invoke(self, **kwargs):
+            with lock:
+                invokes.append(kwargs)
+
+    boto3 = types.ModuleType("boto3")
+    boto3.client = lambda service_name: FakeLambdaClient()
+    monkeypatch.setitem(sys.modules, "boto3", boto3)
+    return invokes
+
+
+CONTEXT = types.SimpleNamespace(invoked_function_arn="arn:aws:lambda:us-east-1:123456789012:function:fn")
+
+
+@pytest.mark.parametrize(
+    "event, expected",
+    [
+        ({WARMER_KEY: True, "concurrency": 3}, True),
+        ({"source": "aws.events", "detail-type": "Scheduled Event", "detail": {}}, True),
+        ({"source": "aws.events", "detail-type": "EC2 Instance State-change Notification"}, False),
+        ({"source": "aws.s3", "detail-type": "Scheduled Event"}, False),
+        ({"httpMethod": "POST", "path": "/v1/predict", "body": "{}"}, False),
+        ({"version": "2.0", "routeKey": "POST /v1/predict", "rawPath": "/v1/predict"}, False),
+        ([1, 2, 3], False),
+    ],
+)
+def test_is_warm_ping(keepwarm, event, expected):
+    assert keepwarm.is_warm_ping(event) is expected
+
+
+@pytest.mark.parametrize("concurrency", [2, 5])
+def test_warm_fans_out(keepwarm, lambda_invokes, concurrency):
+    response = keepwarm.warm({WARMER_KEY: True, "concurrency": concurrency}, CONTEXT)
+    assert response == {"warmed": concurrency}
+    # This invocation warms one environment, the others warm the rest
+    assert len(lambda_invokes) == concurrency - 1
+    for invoke in lambda_invokes:
+        assert invoke["FunctionName"] == CONTEXT.invoked_function_arn
+        assert invoke["InvocationType"] == "RequestResponse"
+        payload = json.loads(invoke["Payload"])
+        assert payload == {WARMER_KEY: True, "fanout": True}
+        assert keepwarm.is_warm_ping(payload)
+
+
+@pytest.mark.parametrize(
+    "event", [{WARMER_KEY: True}, {WARMER_KEY: True, "concurrency": 4, "fanout": True}]
+)
+def test_warm_does_not_fan_out(keepwarm, lambda_invokes, event):
+    keepwarm.warm(event, CONTEXT)
+    assert lambda_invokes == []
+
+
+def test_generated_service_uses_cloudwatch_warmer_key(tmp_path):
+    code = ModelSerializer().get_model_processing_code("sklearn", "aws")
+    app_directory = APIService().generate_service(
+        bucket_name="bucket",
+        object_key="project/model.joblib",
+        project_name="project",
+        output_path=str(tmp_path),
+        **code
+    )
+    keepwarm_code = (app_directory / "v1" / "keepwarm.py").read_text()
+    assert f'WARMER_KEY = "{WARMER_KEY}"' in keepwarm_code
+    assert "%{" not in keepwarm_code
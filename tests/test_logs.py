@@ -0,0 +1,189 @@
+import os
+import json
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from propheto.package.models import LIST_LOGS_AWS, LIST_MODEL_AWS
+
+
+@pytest.fixture
+def logs(template_module):
+    return template_module("endpoints.logs")
+
+
+def _read(response):
+    async def collect():
+        return "".join([chunk async for chunk in response.body_iterator])
+
+    return json.loads(asyncio.run(collect()))
+
+
+def _at(minute):
+    return datetime(2021, 8, 1, 12, minute, tzinfo=timezone.utc)
+
+
+class FakePaginator:
+    def __init__(self, client):
+        self.client = client
+
+    def paginate(self, Bucket, Prefix, StartAfter=""):
+        keys = sorted(key for key in self.client.objects if key.startswith(Prefix) and key > StartAfter)
+        for index in range(0, len(keys), self.client.page_size):
+            self.client.pages_read += 1
+            yield {
+                "Contents": [
+                    {"Key": key, "LastModified": self.client.objects[key], "Size": 1, "ETag": '"etag"'}
+                    for key in keys[index:index + self.client.page_size]
+                ]
+            }
+
+
+class FakeS3Client:
+    def __init__(self, objects, page_size=2):
+        self.objects = objects
+        self.page_size = page_size
+        self.pages_read = 0
+
+    def get_paginator(self, operation_name):
+        return FakePaginator(self)
+
+
+LOG_OBJECTS = {f"project/logs/predictions/predict-{index:02d}.jsonl": _at(index) for index in range(7)}
+
+
+def test_iter_s3_objects_start_after(logs):
+    client = FakeS3Client(dict(LOG_OBJECTS, **{"project/models/model.json": _at(0)}))
+    keys = [entry["Key"] for entry in logs.iter_s3_objects(client, "bucket", "project/logs/")]
+    assert keys == sorted(LOG_OBJECTS)
+    start_after = "project/logs/predictions/predict-04.jsonl"
+    keys = [entry["Key"] for entry in logs.iter_s3_objects(client, "bucket", "project/logs/", start_after)]
+    assert keys == ["project/logs/predictions/predict-05.jsonl", "project/logs/predictions/predict-06.jsonl"]
+
+
+def test_stream_listing_pages_with_continuation_token(logs):
+    client = FakeS3Client(LOG_OBJECTS, page_size=2)
+    first = _read(logs.stream_listing(logs.iter_s3_objects(client, "bucket", "project/logs/"), limit=3))
+    assert [entry["Key"] for entry in first["Contents"]] == sorted(LOG_OBJECTS)[:3]
+    assert first["KeyCount"] == 3
+    assert first["IsTruncated"] is True
+    assert first["NextContinuationToken"] == sorted(LOG_OBJECTS)[2]
+    # Listing stops once one entry past the limit is found
+    assert client.pages_read == 2
+
+    entries = logs.iter_s3_objects(client, "bucket", "project/logs/", first["NextContinuationToken"])
+    second = _read(logs.stream_listing(entries, limit=10))
+    assert [entry["Key"] for entry in second["Contents"]] == sorted(LOG_OBJECTS)[3:]
+    assert second["IsTruncated"] is False
+    assert second["NextContinuationToken"] is None
+    # Dates are serialized as ISO strings
+    assert second["Contents"][0]["LastModified"] == _at(3).isoformat()
+
+
+def test_stream_listing_filters(logs):
+    client = FakeS3Client(dict(LOG_OBJECTS, **{"project/logs/alerts/alert-03.json": _at(3)}))
+
+    def keys(**kwargs):
+        entries = logs.iter_s3_objects(client, "bucket", "project/logs/")
+        return [entry["Key"] for entry in _read(logs.stream_listing(entries, **kwargs))["Contents"]]
+
+    assert keys(q="alert") == ["project/logs/alerts/alert-03.json"]
+    assert keys(q="predict", since=_at(5)) == sorted(LOG_OBJECTS)[5:]
+    assert keys(q="predict", until=_at(1)) == sorted(LOG_OBJECTS)[:2]
+    # Naive dates are read as UTC
+    assert keys(since=datetime(2021, 8, 1, 12, 2), until=datetime(2021, 8, 1, 12, 3)) == [
+        "project/logs/alerts/alert-03.json",
+        "project/logs/predictions/predict-02.jsonl",
+        "project/logs/predictions/predict-03.jsonl",
+    ]
+    # The filter does not count towards the limit
+    response = _read(logs.stream_listing(logs.iter_s3_objects(client, "bucket", "project/logs/"), limit=1, q="06"))
+    assert [entry["Key"] for entry in response["Contents"]] == ["project/logs/predictions/predict-06.jsonl"]
+    assert response["IsTruncated"] is False
+
+
+def test_iter_directory_files(logs, tmp_path):
+    files = ["a.json", "b/c.jsonl", "b/d.jsonl", "b/e/f.jsonl", "b.json", "g.pyc", "h.json"]
+    for name in files:
+        file_path = tmp_path / name
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text("{}")
+    base = str(tmp_path)
+
+    def keys(start_after=None, prefix=None):
+        return [
+            os.path.relpath(entry["Key"], base)
+            for entry in logs.iter_directory_files(base, start_after, prefix)
+        ]
+
+    # Plain key order, "b.json" sorts before the "b/" directory and caches are skipped
+    assert keys() == ["a.json", "b.json", "b/c.jsonl", "b/d.jsonl", "b/e/f.jsonl", "h.json"]
+    assert keys(start_after=os.path.join(base, "b/c.jsonl")) == ["b/d.jsonl", "b/e/f.jsonl", "h.json"]
+    assert keys(start_after=os.path.join(base, "b/e/f.jsonl")) == ["h.json"]
+    assert keys(prefix=os.path.join(base, "b/")) == ["b/c.jsonl", "b/d.jsonl", "b/e/f.jsonl"]
+    assert keys(start_after=os.path.join(base, "b/c.jsonl"), prefix=os.path.join(base, "b/e")) == ["b/e/f.jsonl"]
+    entry = next(logs.iter_directory_files(base))
+    assert entry["Size"] == 2
+    assert entry["LastModified"].tzinfo is timezone.utc
+
+
+def _endpoint(logs, code, client, arguments):
+    """
+    Build a generated endpoint from its code snippet, as the service generator does
+    """
+    code = code.replace("%{bucket_name}%", "bucket").replace("%{project_name}%", "project")
+    code = code.replace("%{object_key}%", "project/model.joblib")
+    source = f"def endpoint({arguments}):\n    response = {{}}\n{code}\n    return response\n"
+    namespace = {
+        "get_s3_client": lambda: client,
+        "iter_s3_objects": logs.iter_s3_objects,
+        "stream_listing": logs.stream_listing,
+    }
+    exec(source, namespace)
+    return namespace["endpoint"]
+
+
+MODEL_OBJECTS = {
+    "project/model.joblib": _at(0),
+    "project/model.joblib.json": _at(0),
+    "project/models/blobs/abc.joblib": _at(0),
+    "project/models/model_2021-08-01_12-00-00.joblib.json": _at(0),
+    "project/logs/predictions/predict-00.jsonl": _at(0),
+}
+
+
+def test_list_models_includes_served_model(logs):
+    client = FakeS3Client(MODEL_OBJECTS)
+    get_models = _endpoint(
+        logs, LIST_MODEL_AWS, client, "model_name='current', continuation_token=None, limit=1000"
+    )
+    assert [entry["Key"] for entry in _read(get_models())["Contents"]] == [
+        "project/model.joblib",
+        "project/models/blobs/abc.joblib",
+        "project/models/model_2021-08-01_12-00-00.joblib.json",
+    ]
+    first = _read(get_models(limit=1))
+    assert first["NextContinuationToken"] == "project/model.joblib"
+    second = _read(get_models(continuation_token=first["NextContinuationToken"]))
+    assert [entry["Key"] for entry in second["Contents"]] == [
+        "project/models/blobs/abc.joblib",
+        "project/models/model_2021-08-01_12-00-00.joblib.json",
+    ]
+    assert [entry["Key"] for entry in _read(get_models(model_name="blobs"))["Contents"]] == [
+        "project/models/blobs/abc.joblib"
+    ]
+
+
+def test_list_logs(logs):
+    client = FakeS3Client(dict(LOG_OBJECTS, **{"project/models/blobs/abc.joblib": _at(0)}))
+    get_logs = _endpoint(
+        logs,
+        LIST_LOGS_AWS,
+        client,
+        "q=None, prefix=None, continuation_token=None, limit=1000, since=None, until=None",
+    )
+    assert [entry["Key"] for entry in _read(get_logs())["Contents"]] == sorted(LOG_OBJECTS)
+    assert [entry["Key"] for entry in _read(get_logs(prefix="predictions/predict-0", since=_at(6)))["Contents"]] == [
+        "project/logs/predictions/predict-06.jsonl"
+    ]
@@ -0,0 +1,87 @@
+import io
+import os
+import shutil
+
+import pytest
+
+
+class FakeS3Client:
+    def __init__(self):
+        self.objects = {}
+        self.downloads = 0
+
+    def put(self, bucket_name, object_key, body, etag):
+        self.objects[(bucket_name, object_key)] = (body, etag)
+
+    def head_object(self, Bucket, Key):
+        return {"ETag": f'"{self.objects[(Bucket, Key)][1]}"'}
+
+    def get_object(self, Bucket, Key):
+        self.downloads += 1
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)][0])}
+
+    def download_file(self, Bucket, Key, Filename):
+        self.downloads += 1
+        with open(Filename, "wb") as model_file:
+            model_file.write(self.objects[(Bucket, Key)][0])
+
+
+@pytest.fixture
+def model_cache(template_module, monkeypatch, tmp_path):
+    module = template_module("model_cache")
+    monkeypatch.setattr(module, "MODEL_CACHE_DIR", str(tmp_path / "cache"))
+    return module
+
+
+def _read(file_path):
+    with open(file_path, "rb") as model_file:
+        return model_file.read()
+
+
+def test_fetch_model_downloads_each_version_once(model_cache):
+    s3client = FakeS3Client()
+    s3client.put("bucket", "project/models/model.joblib", b"v1", "etag1")
+    first = model_cache.fetch_model(s3client, "bucket", "project/models/model.joblib")
+    second = model_cache.fetch_model(s3client, "bucket", "project/models/model.joblib")
+    assert first == second
+    assert _read(first) == b"v1"
+    assert s3client.downloads == 1
+
+    s3client.put("bucket", "project/models/model.joblib", b"v2", "etag2")
+    latest = model_cache.fetch_model(s3client, "bucket", "project/models/model.joblib")
+    assert _read(latest) == b"v2"
+    # The previous version of the same model is evicted
+    assert os.listdir(model_cache.MODEL_CACHE_DIR) == [os.path.basename(latest)]
+
+
+def test_models_of_other_projects_are_kept(model_cache):
+    s3client = FakeS3Client()
+    s3client.put("bucket", "first/models/model.joblib", b"first", "etag1")
+    s3client.put("bucket", "second/models/model.joblib", b"second", "etag2")
+    s3client.put("other-bucket", "first/models/model.joblib", b"other", "etag3")
+    first = model_cache.fetch_model(s3client, "bucket", "first/models/model.joblib")
+    second = model_cache.fetch_model(s3client, "bucket", "second/models/model.joblib")
+    other = model_cache.fetch_model(s3client, "other-bucket", "first/models/model.joblib")
+    assert len({first, second, other}) == 3
+    assert [_read(first), _read(second), _read(other)] == [b"first", b"second", b"other"]
+
+    s3client.put("bucket", "second/models/model.joblib", b"second v2", "etag4")
+    model_cache.fetch_model(s3client, "bucket", "second/models/model.joblib")
+    assert os.path.exists(first) and os.path.exists(other)
+    assert not os.path.exists(second)
+    assert s3client.downloads == 4
+
+
+def test_local_model_path(model_cache, tmp_path):
+    model_path = tmp_path / "model.joblib"
+    model_path.write_bytes(b"model")
+    # Uncompressed models are read in place
+    assert model_cache.local_model_path(str(model_path)) == str(model_path)
+
+    zstandard = pytest.importorskip("zstandard")
+    compressed_path = tmp_path / "model.joblib.zst"
+    compressed_path.write_bytes(zstandard.ZstdCompressor().compress(b"model"))
+    cached_path = model_cache.local_model_path(str(compressed_path))
+    assert cached_path.endswith("-model.joblib")
+    assert _read(cached_path) == b"model"
+    assert model_cache.local_model_path(str(compressed_path)) == cached_path
@@ -0,0 +1,166 @@
+import sys
+import types
+
+import pytest
+
+from propheto.model_frameworks import FrameworkAdapter, ModelRegistry
+from propheto.model_frameworks.base import flatten_rows
+
+
+class DummyModel:
+    def predict(self, rows):
+        return [sum(row) for row in rows]
+
+
+class DummyAdapter(FrameworkAdapter):
+    name = "dummy"
+    module_names = [__name__.split(".")[0]]
+
+    def is_model(self, model):
+        return isinstance(model, DummyModel)
+
+    def preprocess_batch(self, rows):
+        return rows
+
+    def postprocess_batch(self, pred):
+        return list(pred)
+
+
+@pytest.fixture
+def dummy_adapter():
+    ModelRegistry.register(DummyAdapter)
+    yield DummyAdapter
+    ModelRegistry.unregister(DummyAdapter.name)
+
+
+def test_builtin_adapters_are_registered():
+    assert {"sklearn", "pytorch", "tensorflow", "xgboost"} <= set(ModelRegistry.names())
+
+
+def test_unknown_model_type():
+    with pytest.raises(Exception):
+        ModelRegistry.get("unknown")
+    assert ModelRegistry.detect(object()) is None
+
+
+def test_detect_and_predict(dummy_adapter):
+    model = DummyModel()
+    assert ModelRegistry.detect(model) == "dummy"
+    adapter = ModelRegistry.create("dummy")
+    assert adapter.predict_batch(model, [[1, 2], [3, 4]]) == [3, 7]
+    assert adapter.predict_batch(model, []) == []
+    # A request holds either a single row or a list of rows
+    assert adapter.predict(model, [1, 2]) == 3
+    assert adapter.predict(model, [[1, 2], [3, 4]]) == [3, 7]
+
+
+def test_flatten_rows():
+    np = pytest.importorskip("numpy")
+    assert flatten_rows(np.array([[0.5], [1.5]])) == [0.5, 1.5]
+    assert flatten_rows(np.array([[0.1, 0.9], [0.8, 0.2]])) == [[0.1, 0.9], [0.8, 0.2]]
+    assert flatten_rows(np.array([1.0, 2.0])) == [1.0, 2.0]
+
+
+def test_sklearn_adapter_round_trip(tmp_path):
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("sklearn")
+    from sklearn.linear_model import LinearRegression
+
+    X = np.array([[0.0, 1.0], [1.0, 0.0], [1.0, 1.0], [2.0, 1.0]])
+    model = LinearRegression().fit(X, X @ np.array([2.0, 3.0]) + 1.0)
+    assert ModelRegistry.detect(model) == "sklearn"
+
+    adapter = ModelRegistry.create("sklearn")
+    model_path = adapter.save(model, str(tmp_path))
+    assert model_path.name == "model.joblib"
+
+    loaded = ModelRegistry.create("sklearn").load(str(model_path))
+    # Uncompressed joblib files memory-map the model arrays
+    assert isinstance(loaded.coef_, np.memmap)
+    assert adapter.predict_batch(loaded, [[1.0, 1.0], [2.0, 0.0]]) == pytest.approx([6.0, 5.0])
+    assert adapter.predict(loaded, [[1.0, 1.0]]) == pytest.approx(6.0)
+    assert adapter.predict(loaded, [1.0, 1.0]) == pytest.approx(6.0)
+
+
+class FakeXGBModel:
+    def __init__(self):
+        self.params = {}
+        self.loaded_from = ""
+
+    def save_model(self, file_path):
+        with open(file_path, "w") as model_file:
+            model_file.write("{}")
+
+    def load_model(self, file_path):
+        self.loaded_from = file_path
+
+    def set_params(self, **params):
+        self.params.update(params)
+
+    def predict(self, batch):
+        return batch.sum(axis=1)
+
+
+@pytest.fixture
+def fake_xgboost(monkeypatch):
+    """
+    Minimal stand-in for the xgboost module, enough to exercise the adapter
+    """
+    module = types.ModuleType("xgboost")
+    module.__version__ = "1.6.2"
+    module.XGBModel = type("XGBModel", (FakeXGBModel,), {"__module__": "xgboost.sklearn"})
+    module.XGBClassifier = type("XGBClassifier", (module.XGBModel,), {"__module__": "xgboost.sklearn"})
+    monkeypatch.setitem(sys.modules, "xgboost", module)
+    return module
+
+
+def test_xgboost_adapter_model_class(tmp_path, fake_xgboost):
+    pytest.importorskip("numpy")
+
+    class TunedClassifier(fake_xgboost.XGBClassifier):
+        pass
+
+    adapter = ModelRegistry.create("xgboost")
+    model_path = adapter.save(TunedClassifier(), str(tmp_path))
+    assert model_path.name == "model.ubj"
+    # The closest xgboost class is recorded, not the user subclass
+    assert adapter.options == {"model_class": "XGBClassifier"}
+
+    service_adapter = ModelRegistry.create("xgboost", **adapter.options)
+    service_adapter.configure(threads=2)
+    loaded = service_adapter.load(str(model_path))
+    assert type(loaded) is fake_xgboost.XGBClassifier
+    assert loaded.loaded_from == str(model_path)
+    assert loaded.params == {"n_jobs": 2}
+    # Without the option the generic estimator is recreated
+    assert type(ModelRegistry.create("xgboost").load(str(model_path))) is fake_xgboost.XGBModel
+
+    assert service_adapter.predict_batch(loaded, [[1.0, 2.0], [3.0, 4.0]]) == [3.0, 7.0]
+    # Single row predictions keep their one element list response
+    assert service_adapter.predict(loaded, [[1.0, 2.0]]) == [3.0]
+    assert service_adapter.predict(loaded, [[1.0, 2.0], [3.0, 4.0]]) == [3.0, 7.0]
+
+
+@pytest.fixture
+def fake_tensorflow(monkeypatch):
+    """
+    Minimal stand-ins for tensorflow and Keras 3, whose models are not `tf.keras` ones
+    """
+    tensorflow = types.ModuleType("tensorflow")
+    tf_model = type("Model", (), {"__module__": "tensorflow.keras"})
+    tensorflow.keras = types.SimpleNamespace(Model=tf_model)
+    keras = types.ModuleType("keras")
+    keras.Model = type("Model", (), {"__module__": "keras.src.models.model"})
+    monkeypatch.setitem(sys.modules, "tensorflow", tensorflow)
+    monkeypatch.setitem(sys.modules, "keras", keras)
+    return tensorflow, keras
+
+
+def test_tensorflow_adapter_detects_any_keras_model(fake_tensorflow):
+    tensorflow, keras = fake_tensorflow
+    # Functional and subclassed models, not only Sequential ones
+    functional = type("Functional", (tensorflow.keras.Model,), {"__module__": "tensorflow.keras"})
+    subclassed = type("Regressor", (keras.Model,), {"__module__": "__main__"})
+    assert ModelRegistry.detect(functional()) == "tensorflow"
+    assert ModelRegistry.detect(subclassed()) == "tensorflow"
+    assert not ModelRegistry.create("tensorflow").is_model(object())
@@ -0,0 +1,136 @@
+import io
+import sys
+import zlib
+import types
+
+import pytest
+
+from propheto.package import models
+from propheto.package.models import MODEL_CODECS, ModelSerializer, compress_file, probe_codec
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    model_path = tmp_path / "model.joblib"
+    model_path.write_bytes(b"coefficients " * 50000)
+    return model_path
+
+
+@pytest.fixture
+def codec_ratios(monkeypatch):
+    """
+    Fake codecs shrinking the probe samples by a set ratio
+    """
+    ratios = {}
+
+    def compress_bytes(codec, data, level=None):
+        return data[: int(len(data) / ratios[codec])]
+
+    monkeypatch.setattr(models, "_compress_bytes", compress_bytes)
+    return ratios
+
+
+@pytest.mark.parametrize(
+    "zstd_ratio, lz4_ratio, expected, expected_ratio",
+    [
+        # lz4 decompresses faster so it wins within 10% of zstd
+        (4.0, 3.7, "lz4", 3.7),
+        (4.0, 3.5, "zstd", 4.0),
+        (1.5, 2.0, "lz4", 2.0),
+        # Below 1.2x the model is left uncompressed
+        (1.15, 1.0, "", 1.15),
+        (1.25, 1.0, "zstd", 1.25),
+    ],
+)
+def test_probe_codec_selection(model_file, codec_ratios, zstd_ratio, lz4_ratio, expected, expected_ratio):
+    codec_ratios.update({"zstd": zstd_ratio, "lz4": lz4_ratio})
+    codec, ratio = probe_codec(str(model_file), ["zstd", "lz4"])
+    assert codec == expected
+    assert ratio == pytest.approx(expected_ratio, rel=1e-3)
+
+
+def test_probe_codec_single_codec(model_file, codec_ratios):
+    codec_ratios["zstd"] = 1.3
+    assert probe_codec(str(model_file), ["zstd"])[0] == "zstd"
+    codec_ratios["zstd"] = 1.1
+    assert probe_codec(str(model_file), ["zstd"])[0] == ""
+
+
+def test_probe_codec_empty_file(tmp_path, codec_ratios):
+    model_path = tmp_path / "model.joblib"
+    model_path.write_bytes(b"")
+    assert probe_codec(str(model_path), ["zstd", "lz4"]) == ("", 1.0)
+
+
+@pytest.fixture
+def fake_zstandard(monkeypatch):
+    """
+    zlib backed stand-in for zstandard, so the compression round trip runs
+    whether or not the codec libraries are installed
+    """
+    module = types.ModuleType("zstandard")
+
+    class ZstdCompressor:
+        def __init__(self, level=3, threads=0):
+            self.level = level
+
+        def compress(self, data):
+            return zlib.compress(data, self.level)
+
+        def copy_stream(self, source_file, compressed_file, size=-1):
+            compressed_file.write(zlib.compress(source_file.read(), self.level))
+
+    class ZstdDecompressor:
+        def stream_reader(self, compressed_file):
+            return io.BytesIO(zlib.decompress(compressed_file.read()))
+
+    module.ZstdCompressor = ZstdCompressor
+    module.ZstdDecompressor = ZstdDecompressor
+    monkeypatch.setitem(sys.modules, "zstandard", module)
+    return module
+
+
+def test_compress_model_round_trip(model_file, tmp_path, fake_zstandard, template_module, monkeypatch):
+    contents = model_file.read_bytes()
+    monkeypatch.setattr(models, "available_codecs", lambda: ["zstd"])
+    serializer = ModelSerializer(file_path=str(model_file))
+    serializer._compress_model("auto")
+    assert serializer.codec == "zstd"
+    assert str(serializer.file_path).endswith(".joblib.zst")
+    assert not model_file.exists()
+    assert serializer.extra_requirements == [MODEL_CODECS["zstd"]["requirement"]]
+
+    # Read back the way the generated service does
+    codecs = template_module("codecs")
+    assert codecs.model_codec(str(serializer.file_path)) == "zstd"
+    with open(serializer.file_path, "rb") as compressed_file:
+        model_path = codecs.decompress_to_file(compressed_file, "zstd", str(tmp_path / "model.joblib"))
+    with open(model_path, "rb") as restored_file:
+        assert restored_file.read() == contents
+
+
+def test_compress_model_without_codecs(model_file, monkeypatch):
+    monkeypatch.setattr(models, "available_codecs", lambda: [])
+    serializer = ModelSerializer(file_path=str(model_file))
+    serializer._compress_model("auto")
+    assert serializer.codec == ""
+    assert serializer.file_path == str(model_file)
+    assert model_file.exists()
+
+
+def test_compress_model_unknown_codec(model_file):
+    with pytest.raises(Exception, match="Model compression brotli is unsupported"):
+        ModelSerializer(file_path=str(model_file))._compress_model("brotli")
+
+
+@pytest.mark.parametrize("codec", list(MODEL_CODECS))
+def test_codec_round_trip(model_file, tmp_path, template_module, codec):
+    pytest.importorskip(MODEL_CODECS[codec]["module"])
+    contents = model_file.read_bytes()
+    compressed_path = compress_file(str(model_file), codec)
+    assert compressed_path.stat().st_size < len(contents)
+    codecs = template_module("codecs")
+    with open(compressed_path, "rb") as compressed_file:
+        model_path = codecs.decompress_to_file(compressed_file, codec, str(tmp_path / "restored.joblib"))
+    with open(model_path, "rb") as restored_file:
+        assert restored_file.read() == contents
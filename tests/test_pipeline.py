@@ -0,0 +1,95 @@
+import threading
+from time import sleep
+
+import pytest
+
+from propheto.pipeline import Pipeline
+
+
+def _recorder(calls, name, value=None):
+    def step(results):
+        calls.append(name)
+        return value if value is not None else name
+
+    return step
+
+
+def test_steps_run_after_their_dependencies():
+    calls = []
+    pipeline = Pipeline(name="deploy")
+    # Added out of order on purpose
+    pipeline.add_step("deploy", _recorder(calls, "deploy"), ["build", "upload"])
+    pipeline.add_step("upload", _recorder(calls, "upload"), ["package"])
+    pipeline.add_step("build", _recorder(calls, "build"), ["package"])
+    pipeline.add_step("package", _recorder(calls, "package"))
+    results = pipeline.run()
+    assert results == {name: name for name in ["package", "build", "upload", "deploy"]}
+    assert calls[0] == "package"
+    assert calls[-1] == "deploy"
+    assert "deploy finished in" in pipeline.report()
+
+
+def test_steps_receive_the_results_of_their_dependencies():
+    pipeline = Pipeline()
+    pipeline.add_step("bucket", lambda results: "propheto-bucket")
+    pipeline.add_step("key", lambda results: f"{results['bucket']}/lambda.zip", ["bucket"])
+    assert pipeline.run()["key"] == "propheto-bucket/lambda.zip"
+
+
+def test_independent_steps_run_in_parallel():
+    # Both steps have to be running at the same time to pass the barrier
+    barrier = threading.Barrier(2, timeout=5)
+    pipeline = Pipeline(max_workers=4)
+    pipeline.add_step("first", lambda results: barrier.wait())
+    pipeline.add_step("second", lambda results: barrier.wait())
+    pipeline.add_step("last", lambda results: "done", ["first", "second"])
+    assert pipeline.run()["last"] == "done"
+
+
+def test_unknown_dependency():
+    pipeline = Pipeline()
+    pipeline.add_step("deploy", lambda results: None, ["build"])
+    with pytest.raises(Exception, match="unknown step build"):
+        pipeline.run()
+
+
+def test_circular_dependency():
+    calls = []
+    pipeline = Pipeline()
+    pipeline.add_step("first", _recorder(calls, "first"), ["third"])
+    pipeline.add_step("second", _recorder(calls, "second"), ["first"])
+    pipeline.add_step("third", _recorder(calls, "third"), ["second"])
+    with pytest.raises(Exception, match="circular dependency"):
+        pipeline.run()
+    assert calls == []
+
+
+def test_duplicate_step():
+    pipeline = Pipeline()
+    pipeline.add_step("build", lambda results: None)
+    with pytest.raises(Exception, match="already exists"):
+        pipeline.add_step("build", lambda results: None)
+
+
+def test_stops_on_first_failed_step():
+    calls = []
+
+    def fail(results):
+        calls.append("fail")
+        raise ValueError("Build failed")
+
+    def slow(results):
+        sleep(0.2)
+        calls.append("slow")
+        return "slow"
+
+    pipeline = Pipeline()
+    pipeline.add_step("fail", fail)
+    pipeline.add_step("after_fail", _recorder(calls, "after_fail"), ["fail"])
+    pipeline.add_step("slow", slow)
+    pipeline.add_step("after_slow", _recorder(calls, "after_slow"), ["slow"])
+    with pytest.raises(ValueError, match="Build failed"):
+        pipeline.run()
+    # The running step finishes but no new step starts
+    assert sorted(calls) == ["fail", "slow"]
+    assert pipeline.results == {"slow": "slow"}
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def prediction_log(template_module, monkeypatch):
+    module = template_module("prediction_log")
+    written = []
+
+    def write_log_batch(filename, file_data):
+        written.append((filename, [json.loads(line) for line in file_data.splitlines()]))
+
+    monkeypatch.setattr(module, "write_log_batch", write_log_batch)
+    module.written = written
+    return module
+
+
+def _records(count, start=0):
+    return [{"data": {"prediction": index, "data": [index]}} for index in range(start, start + count)]
+
+
+def test_size_threshold(prediction_log):
+    buffer = prediction_log.PredictionLogBuffer(flush_size=3, flush_seconds=60, background=False)
+    assert not buffer.flush_if_due()
+    for record in _records(2):
+        buffer.append(record)
+    assert not buffer.flush_due()
+    buffer.append(_records(1, start=2)[0])
+    assert buffer.flush_if_due()
+    (filename, records), = prediction_log.written
+    assert filename.startswith("predictions/predict-") and filename.endswith(".jsonl")
+    assert records == _records(3)
+    assert not buffer.flush_due()
+
+
+def test_age_threshold(prediction_log):
+    buffer = prediction_log.PredictionLogBuffer(flush_size=100, flush_seconds=30, background=False)
+    buffer.append(_records(1)[0])
+    assert not buffer.flush_due()
+    buffer._last_flush -= 31
+    assert buffer.flush_if_due()
+    assert [records for _, records in prediction_log.written] == [_records(1)]
+
+
+def test_failed_upload_requeues_records(prediction_log, monkeypatch, capsys):
+    buffer = prediction_log.PredictionLogBuffer(flush_size=2, flush_seconds=60, background=False)
+    for record in _records(2):
+        buffer.append(record)
+
+    def failing_write(filename, file_data):
+        raise Exception("Upload failed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(prediction_log, "write_log_batch", failing_write)
+        with pytest.raises(Exception):
+            buffer.flush()
+        assert not buffer.flush_if_due()
+    assert "Prediction log flush failed" in capsys.readouterr().out
+
+    buffer.append(_records(1, start=2)[0])
+    assert buffer.flush_if_due()
+    # Requeued records are written first and in order
+    assert [records for _, records in prediction_log.written] == [_records(3)]
+
+
+def test_lambda_buffer_has_no_background_thread(prediction_log):
+    buffer = prediction_log.PredictionLogBuffer(background=False)
+    buffer.append(_records(1)[0])
+    assert buffer._thread is None
+
+
+def test_close_flushes_and_stops_the_flusher(prediction_log):
+    buffer = prediction_log.PredictionLogBuffer(flush_size=100, flush_seconds=60)
+    for record in _records(3):
+        buffer.append(record)
+    assert buffer._thread is not None and buffer._thread.is_alive()
+    buffer.close()
+    assert not buffer._thread.is_alive()
+    assert [records for _, records in prediction_log.written] == [_records(3)]
+    assert not buffer.flush_due()
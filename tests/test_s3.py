@@ -0,0 +1,202 @@
+import json
+import threading
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+from propheto.deployments.aws.s3 import S3
+from propheto.project.configuration.iteration import Iteration
+from propheto.utilities import file_hash
+
+
+class FakePaginator:
+    def __init__(self, keys, page_size=1000):
+        self.keys = keys
+        self.page_size = page_size
+
+    def paginate(self, Bucket, PaginationConfig=None):
+        for start in range(0, len(self.keys), self.page_size):
+            yield {"Contents": [{"Key": key} for key in self.keys[start : start + self.page_size]]}
+
+
+class FakeS3Client:
+    """
+    In memory bucket recording the calls made by the S3 helpers
+    """
+
+    def __init__(self, keys=None, failed_keys=None):
+        self.objects = {}
+        self.keys = keys if keys else []
+        self.failed_keys = failed_keys if failed_keys else []
+        self.uploads = []
+        self.copies = []
+        self.delete_requests = []
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        return {"Metadata": self.objects[Key]["Metadata"]}
+
+    def upload_file(self, source_path, bucket, key, Callback=None, Config=None, ExtraArgs=None):
+        self.uploads.append(key)
+        with open(source_path, "rb") as source_file:
+            self.objects[key] = {"Body": source_file.read(), "Metadata": ExtraArgs["Metadata"]}
+
+    def copy(self, source, bucket, key, ExtraArgs=None, Config=None):
+        self.copies.append((source["Key"], key))
+        self.objects[key] = {
+            "Body": self.objects[source["Key"]]["Body"],
+            "Metadata": ExtraArgs["Metadata"],
+        }
+
+    def put_object(self, Body, Bucket, Key, Metadata=None):
+        self.objects[Key] = {"Body": Body, "Metadata": Metadata}
+
+    def get_paginator(self, operation_name):
+        return FakePaginator(self.keys)
+
+    def delete_objects(self, Bucket, Delete):
+        self.delete_requests.append([record["Key"] for record in Delete["Objects"]])
+        errors = [
+            {"Key": record["Key"], "Code": "AccessDenied"}
+            for record in Delete["Objects"]
+            if record["Key"] in self.failed_keys
+        ]
+        return {"Errors": errors} if errors else {}
+
+
+def _s3(client):
+    s3 = S3.__new__(S3)
+    s3.profile_name = "default"
+    s3.region = "us-east-1"
+    s3.s3_bucket_name = "bucket"
+    s3.s3_client = client
+    return s3
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    model_path = tmp_path / "model.joblib"
+    model_path.write_bytes(b"model-v1" * 100)
+    return model_path
+
+
+def test_upload_model_artifact_uploads_blob_and_copies(model_file):
+    client = FakeS3Client()
+    s3 = _s3(client)
+    digest = file_hash(str(model_file))
+
+    dest_path = s3.upload_model_artifact("project", str(model_file), "model.joblib")
+    blob_path = f"project/models/blobs/{digest}.joblib"
+    assert dest_path == "project/model.joblib"
+    assert client.uploads == [blob_path]
+    assert client.copies == [(blob_path, dest_path)]
+    assert client.objects[dest_path]["Metadata"] == {"sha256": digest}
+    assert client.objects[dest_path]["Body"] == model_file.read_bytes()
+
+    manifests = [key for key in client.objects if key.endswith(".joblib.json")]
+    assert len(manifests) == 1
+    assert manifests[0].startswith("project/models/model_")
+    manifest = json.loads(client.objects[manifests[0]]["Body"])
+    assert manifest["key"] == blob_path
+    assert manifest["sha256"] == digest
+
+
+def test_upload_model_artifact_skips_unchanged_model(model_file):
+    client = FakeS3Client()
+    s3 = _s3(client)
+    s3.upload_model_artifact("project", str(model_file), "model.joblib")
+    objects = dict(client.objects)
+    del client.uploads[:], client.copies[:]
+
+    assert s3.upload_model_artifact("project", str(model_file), "model.joblib") == "project/model.joblib"
+    assert client.uploads == []
+    assert client.copies == []
+    assert client.objects == objects
+
+
+def test_upload_model_artifact_changed_model(model_file):
+    client = FakeS3Client()
+    s3 = _s3(client)
+    s3.upload_model_artifact("project", str(model_file), "model.joblib", keep_history=False)
+    model_file.write_bytes(b"model-v2" * 100)
+    del client.uploads[:], client.copies[:]
+
+    s3.upload_model_artifact("project", str(model_file), "model.joblib", keep_history=False)
+    blob_path = f"project/models/blobs/{file_hash(str(model_file))}.joblib"
+    assert client.uploads == [blob_path]
+    assert client.copies == [(blob_path, "project/model.joblib")]
+    assert client.objects["project/model.joblib"]["Body"] == model_file.read_bytes()
+    assert not any(key.endswith(".json") for key in client.objects)
+
+
+def test_upload_model_artifact_reuses_existing_blob(model_file):
+    client = FakeS3Client()
+    s3 = _s3(client)
+    s3.upload_model_artifact("project", str(model_file), "model.joblib", keep_history=False)
+    # Model key overwritten by another version, the blob is still there
+    client.objects["project/model.joblib"]["Metadata"] = {"sha256": "other"}
+    del client.uploads[:], client.copies[:]
+
+    s3.upload_model_artifact("project", str(model_file), "model.joblib", keep_history=False)
+    assert client.uploads == []
+    assert len(client.copies) == 1
+
+
+def test_empty_bucket_deletes_every_page():
+    keys = [f"project/file-{index}" for index in range(2500)]
+    client = FakeS3Client(keys=keys)
+    response = _s3(client).empty_bucket("bucket", max_workers=2)
+    assert response == {"DeletedCount": 2500, "Errors": []}
+    assert sorted(len(request) for request in client.delete_requests) == [500, 1000, 1000]
+    assert sorted(key for request in client.delete_requests for key in request) == sorted(keys)
+
+
+def test_empty_bucket_raises_on_errors():
+    keys = [f"project/file-{index}" for index in range(1500)]
+    client = FakeS3Client(keys=keys, failed_keys=["project/file-3", "project/file-1200"])
+    with pytest.raises(Exception, match="Failed to delete 2 objects from bucket"):
+        _s3(client).empty_bucket("bucket")
+    # Every page was still sent
+    assert len(client.delete_requests) == 2
+
+
+class FakeRemoteObject:
+    """
+    Remote object recording when each of its resources is destroyed
+    """
+
+    def __init__(self, events, delay=0.0):
+        self.events = events
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def destroy(self, id):
+        time.sleep(self.delay)
+        with self.lock:
+            self.events.append(id)
+
+
+def test_iteration_destroys_lambda_after_api_and_cloudwatch():
+    events = []
+    iteration = Iteration(id="iteration", iteration_name="iteration", version="0.1", resources={})
+    # The Lambda function is the fastest to destroy, it still goes last
+    iteration.add_resource(id="function", name="AWSLambda", remote_object=FakeRemoteObject(events))
+    iteration.add_resource(id="api", name="APIGateway", remote_object=FakeRemoteObject(events, 0.05))
+    iteration.add_resource(id="rule", name="Cloudwatch", remote_object=FakeRemoteObject(events, 0.05))
+    iteration.add_resource(id="bucket", name="S3", remote_object=FakeRemoteObject(events))
+
+    assert iteration.destroy() == "Resources destroyed"
+    assert sorted(events) == ["api", "bucket", "function", "rule"]
+    assert events.index("function") > events.index("api")
+    assert events.index("function") > events.index("rule")
+
+
+def test_iteration_destroy_excludes():
+    events = []
+    iteration = Iteration(id="iteration", iteration_name="iteration", version="0.1", resources={})
+    iteration.add_resource(id="function", name="AWSLambda", remote_object=FakeRemoteObject(events))
+    iteration.add_resource(id="api", name="APIGateway", remote_object=FakeRemoteObject(events))
+    iteration.destroy(excludes=["APIGateway"])
+    assert events == ["function"]
@@ -0,0 +1,155 @@
+import os
+import subprocess
+
+import pytest
+
+from propheto.package import slim as slim_module
+from propheto.package.slim import PackageSlimmer
+
+
+@pytest.mark.parametrize(
+    "arcname",
+    [
+        "numpy-1.26.0.dist-info/METADATA",
+        "numpy-1.26.0.dist-info/entry_points.txt",
+        "numpy-1.26.0.dist-info/top_level.txt",
+        "numpy-1.26.0.dist-info/RECORD",
+        "numpy-1.26.0.dist-info/WHEEL",
+        "numpy-1.26.0.dist-info/LICENSE.txt",
+        "requests-2.31.0.dist-info/LICENCE",
+        "attrs-23.1.0.dist-info/licenses/LICENSE",
+        "six-1.16.0.dist-info/COPYING",
+        "six-1.16.0.dist-info/NOTICE",
+        "six-1.16.0.dist-info/AUTHORS.rst",
+        "numpy/testing/__init__.py",
+        "numpy/tests/test_core.py",
+        "test.py",
+    ],
+)
+def test_is_unused_keeps_runtime_and_license_files(arcname):
+    assert not PackageSlimmer().is_unused(arcname)
+
+
+@pytest.mark.parametrize(
+    "arcname",
+    [
+        "numpy-1.26.0.dist-info/INSTALLER",
+        "numpy-1.26.0.dist-info/direct_url.json",
+        "numpy/__pycache__/core.cpython-39.pyc",
+        "numpy/core.pyi",
+    ],
+)
+def test_is_unused_drops_install_records_and_caches(arcname):
+    assert PackageSlimmer().is_unused(arcname)
+
+
+def test_is_unused_drops_test_dirs_on_request():
+    slimmer = PackageSlimmer(prune_test_dirs=True)
+    assert slimmer.is_unused("numpy/tests/test_core.py")
+    assert slimmer.is_unused("pandas/docs/index.rst")
+    assert not slimmer.is_unused("numpy/testing/__init__.py")
+    assert not slimmer.is_unused("test.py")
+
+
+@pytest.fixture
+def strip_calls(monkeypatch):
+    """
+    Replace `strip` by a command halving the file, or failing once `fail` is set
+    """
+    calls = []
+    state = {"fail": False}
+
+    def run(command, **kwargs):
+        calls.append(command)
+        if state["fail"]:
+            return subprocess.CompletedProcess(command, 1)
+        file_path = command[-1]
+        with open(file_path, "r+b") as f:
+            f.truncate(os.path.getsize(file_path) // 2)
+        return subprocess.CompletedProcess(command, 0)
+
+    monkeypatch.setattr(slim_module.subprocess, "run", run)
+    return calls, state
+
+
+def test_strip_binary_reuses_cached_copy(tmp_path, strip_calls):
+    calls, _ = strip_calls
+    library = tmp_path / "lib.so"
+    library.write_bytes(b"\0" * 1024)
+    slimmer = PackageSlimmer(cache_dir=str(tmp_path / "cache"))
+    (tmp_path / "cache").mkdir()
+
+    stripped_path, stripped_stat = slimmer.strip_binary(str(library), os.stat(library))
+    assert stripped_path != str(library)
+    assert stripped_stat.st_size == 512
+    assert len(calls) == 1
+
+    assert slimmer.strip_binary(str(library), os.stat(library))[0] == stripped_path
+    assert len(calls) == 1
+
+    # A changed library is stripped again
+    library.write_bytes(b"\0" * 2048)
+    assert slimmer.strip_binary(str(library), os.stat(library))[1].st_size == 1024
+    assert len(calls) == 2
+
+
+def test_strip_binary_falls_back_to_source_on_failure(tmp_path, strip_calls):
+    _, state = strip_calls
+    state["fail"] = True
+    library = tmp_path / "lib.so"
+    library.write_bytes(b"\0" * 1024)
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    slimmer = PackageSlimmer(cache_dir=str(cache_dir))
+
+    file_stat = os.stat(library)
+    assert slimmer.strip_binary(str(library), file_stat) == (str(library), file_stat)
+    assert list(cache_dir.iterdir()) == []
+
+
+def _files(tmp_path, arcnames):
+    files = {}
+    for arcname in arcnames:
+        file_path = tmp_path / arcname
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_bytes(b"x" * 10)
+        files[arcname] = (str(file_path), os.stat(file_path))
+    return files
+
+
+def test_prune_modules_keeps_reachable_and_kept_packages(tmp_path, monkeypatch):
+    files = _files(
+        tmp_path,
+        [
+            "requests/__init__.py",
+            "fastapi/__init__.py",
+            "numpy/__init__.py",
+            "pandas/__init__.py",
+            "pandas-2.1.0.dist-info/METADATA",
+            "pandas.libs/libz.so",
+            "six.py",
+            "extras.pth",
+        ],
+    )
+    slimmer = PackageSlimmer(strip_binaries=False, prune_modules=True, keep_packages=["numpy"])
+    monkeypatch.setattr(slimmer, "reachable_packages", lambda entry_point, search_paths: {"requests"})
+
+    slimmed = slimmer.slim(files, entry_point="main.py")
+    assert sorted(slimmed) == [
+        "extras.pth",
+        "fastapi/__init__.py",
+        "numpy/__init__.py",
+        "pandas-2.1.0.dist-info/METADATA",
+        "pandas.libs/libz.so",
+        "requests/__init__.py",
+    ]
+    assert slimmer.report["pruned_packages"] == ["pandas", "six"]
+    assert slimmer.report["removed_files"] == 2
+
+
+def test_reachable_packages_follows_imports(tmp_path):
+    (tmp_path / "helper.py").write_text("import json\n")
+    entry_point = tmp_path / "main.py"
+    entry_point.write_text("import helper\n")
+    reachable = PackageSlimmer().reachable_packages(str(entry_point), [str(tmp_path)])
+    assert {"helper", "json"} <= reachable
@@ -0,0 +1,223 @@
+import io
+import json
+import base64
+from datetime import datetime
+
+import pytest
+
+from propheto.deployments.aws.tuning import (
+    PREDICT_PATH,
+    PRICE_PER_GB_SECOND,
+    PRICE_PER_REQUEST,
+    LambdaTuner,
+    load_recorded_payloads,
+    parse_report,
+)
+
+# A line of a prediction log file as written by the generated service
+LOG_LINE = json.dumps(
+    {
+        "created_at": "2021-08-01T12:00:00.000000",
+        "data": {"prediction": 1, "data": [[0.9, 0.1, 0.2]]},
+    }
+)
+BATCH_LOG_LINE = json.dumps(
+    {
+        "created_at": "2021-08-01T12:00:01.000000",
+        "data": {"predictions": [1, 0], "data": [[0.9, 0.1], [0.1, 0.5]]},
+    }
+)
+
+
+class FakePaginator:
+    def __init__(self, client):
+        self.client = client
+
+    def paginate(self, Bucket, Prefix, StartAfter=""):
+        keys = sorted(key for key in self.client.objects if key.startswith(Prefix) and key > StartAfter)
+        for index in range(0, len(keys), self.client.page_size):
+            self.client.pages_read += 1
+            yield {"Contents": [{"Key": key} for key in keys[index:index + self.client.page_size]]}
+
+
+class FakeS3Client:
+    def __init__(self, objects, page_size=2):
+        self.objects = objects
+        self.page_size = page_size
+        self.pages_read = 0
+
+    def get_paginator(self, operation_name):
+        return FakePaginator(self)
+
+    def get_object(self, Bucket, Key):
+        return {"Body": io.BytesIO(self.objects[Key].encode("utf-8"))}
+
+
+class FakeS3:
+    def __init__(self, objects, page_size=2):
+        self.s3_bucket_name = "bucket"
+        self.s3_client = FakeS3Client(objects, page_size)
+
+
+def _log_key(index):
+    return f"project/logs/predictions/predict-2021-08-01T12:00:{index:02d}.000000-0000abcd.jsonl"
+
+
+def test_load_recorded_payloads_returns_request_bodies():
+    s3 = FakeS3({_log_key(0): f"{LOG_LINE}\n{BATCH_LOG_LINE}\n"})
+    payloads = load_recorded_payloads(s3, "project")
+    assert payloads == [[[0.9, 0.1, 0.2]], [[0.9, 0.1], [0.1, 0.5]]]
+
+
+def test_load_recorded_payloads_stops_listing_at_limit():
+    s3 = FakeS3({_log_key(index): f"{LOG_LINE}\n" for index in range(10)}, page_size=2)
+    payloads = load_recorded_payloads(s3, "project", limit=3)
+    assert len(payloads) == 3
+    assert s3.s3_client.pages_read == 2
+
+
+def test_load_recorded_payloads_since():
+    s3 = FakeS3({_log_key(0): f"{LOG_LINE}\n", _log_key(5): f"{BATCH_LOG_LINE}\n"})
+    payloads = load_recorded_payloads(s3, "project", since=datetime(2021, 8, 1, 12, 0, 3))
+    assert payloads == [[[0.9, 0.1], [0.1, 0.5]]]
+
+
+def test_parse_report():
+    report = parse_report(
+        "START RequestId: 1\nREPORT RequestId: 1\tDuration: 12.50 ms\tBilled Duration: 13 ms\t"
+        "Memory Size: 1024 MB\tMax Memory Used: 180 MB\tInit Duration: 900.10 ms\n"
+    )
+    assert report == {
+        "duration": 12.5,
+        "billed_duration": 13.0,
+        "memory_size": 1024.0,
+        "max_memory_used": 180.0,
+        "init_duration": 900.1,
+    }
+
+
+class FakeLambdaClient:
+    """
+    Function whose duration halves when its memory doubles, the first
+    invocation after a configuration change being a cold start
+    """
+
+    def __init__(self, aws_lambda):
+        self.aws_lambda = aws_lambda
+        self.events = []
+
+    def invoke(self, FunctionName, Payload, LogType):
+        assert LogType == "Tail"
+        self.events.append(json.loads(Payload))
+        memory_size = self.aws_lambda.memory_size
+        duration = 102400.0 / memory_size
+        report = (
+            f"REPORT RequestId: {len(self.events)}\tDuration: {duration:.2f} ms\t"
+            f"Billed Duration: {duration:.0f} ms\tMemory Size: {memory_size} MB\tMax Memory Used: 150 MB"
+        )
+        if self.aws_lambda.cold:
+            report += "\tInit Duration: 800.00 ms"
+            self.aws_lambda.cold = False
+        return {
+            "StatusCode": 200,
+            "Payload": io.BytesIO(json.dumps({"statusCode": 200, "body": "[1]"}).encode("utf-8")),
+            "LogResult": base64.b64encode(report.encode("utf-8")).decode("utf-8"),
+        }
+
+
+class FakeLambda:
+    def __init__(self):
+        self.memory_size = 128
+        self.cold = True
+        self.updates = []
+        self.lambda_client = FakeLambdaClient(self)
+
+    def update_function_configuration(self, function_name, memory_size):
+        self.updates.append((function_name, memory_size))
+        self.memory_size = memory_size
+        self.cold = True
+
+
+def test_measure():
+    aws_lambda = FakeLambda()
+    tuner = LambdaTuner(aws_lambda, "fn", [[1, 2], [3, 4]], invocations=5)
+    result = tuner.measure(1024)
+    assert aws_lambda.updates == [("fn", 1024)]
+    # Payloads are replayed in turn inside API Gateway events
+    events = aws_lambda.lambda_client.events
+    assert [json.loads(event["body"]) for event in events] == [[1, 2], [3, 4], [1, 2], [3, 4], [1, 2]]
+    assert all(event["path"] == PREDICT_PATH for event in events)
+    assert result["memory_size"] == 1024
+    assert result["cold_start_ms"] == 900.0
+    assert result["warm_p50_ms"] == 100.0
+    assert result["warm_p95_ms"] == 100.0
+    assert result["max_memory_used_mb"] == 150
+    assert result["cost_per_1k"] == pytest.approx(
+        1000 * (0.1 * 1.0 * PRICE_PER_GB_SECOND + PRICE_PER_REQUEST)
+    )
+
+
+def test_measure_failed_invocation():
+    aws_lambda = FakeLambda()
+    aws_lambda.lambda_client.invoke = lambda **kwargs: {
+        "FunctionError": "Unhandled",
+        "Payload": io.BytesIO(b'{"errorMessage": "boom"}'),
+    }
+    with pytest.raises(Exception, match="Invocation failed"):
+        LambdaTuner(aws_lambda, "fn", [[1]], invocations=1).measure(512)
+
+
+def _result(memory_size, cost_per_1k, warm_p50_ms, warm_p95_ms):
+    return {
+        "memory_size": memory_size,
+        "cost_per_1k": cost_per_1k,
+        "warm_p50_ms": warm_p50_ms,
+        "warm_p95_ms": warm_p95_ms,
+    }
+
+
+RESULTS = [
+    _result(512, 0.0010, 400.0, 450.0),
+    _result(1024, 0.0012, 150.0, 180.0),
+    _result(2048, 0.0030, 100.0, 120.0),
+]
+
+
+@pytest.mark.parametrize(
+    "objective, max_latency_ms, memory_size",
+    [
+        ("cost", None, 512),
+        ("latency", None, 2048),
+        ("balanced", None, 1024),
+        # Cheapest size under the latency budget
+        ("cost", 200.0, 1024),
+        ("cost", 150.0, 2048),
+        # No size meets the budget so every size is considered
+        ("cost", 50.0, 512),
+    ],
+)
+def test_best(objective, max_latency_ms, memory_size):
+    best = LambdaTuner.best(RESULTS, objective=objective, max_latency_ms=max_latency_ms)
+    assert best["memory_size"] == memory_size
+
+
+def test_best_unknown_objective():
+    with pytest.raises(Exception, match="Objective fastest is unsupported"):
+        LambdaTuner.best(RESULTS, objective="fastest")
+
+
+def test_tune_applies_best_memory_size():
+    aws_lambda = FakeLambda()
+    tuner = LambdaTuner(aws_lambda, "fn", [[1, 2]], memory_sizes=[512, 1024, 2048], invocations=3)
+    best = tuner.tune(objective="latency")
+    assert best["memory_size"] == 2048
+    assert [result["memory_size"] for result in tuner.results] == [512, 1024, 2048]
+    # One update per measured size, then the chosen size is applied
+    assert aws_lambda.updates == [("fn", 512), ("fn", 1024), ("fn", 2048), ("fn", 2048)]
+
+
+def test_tune_without_apply():
+    aws_lambda = FakeLambda()
+    tuner = LambdaTuner(aws_lambda, "fn", [[1, 2]], memory_sizes=[512, 1024], invocations=2)
+    tuner.tune(objective="latency", apply=False)
+    assert aws_lambda.updates == [("fn", 512), ("fn", 1024)]
@@ -0,0 +1,103 @@
+import itertools
+
+import pytest
+from botocore.exceptions import WaiterError
+
+from propheto.deployments.aws import waiters
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Fake monotonic clock advanced by the patched sleep
+    """
+    state = {"now": 0.0, "sleeps": []}
+
+    def sleep(seconds):
+        state["sleeps"].append(seconds)
+        state["now"] += seconds
+
+    monkeypatch.setattr(waiters, "monotonic", lambda: state["now"])
+    monkeypatch.setattr(waiters, "sleep", sleep)
+    return state
+
+
+def test_backoff_delays_without_jitter():
+    delays = waiters.backoff_delays(initial_delay=1, max_delay=10, multiplier=2, jitter=0)
+    assert list(itertools.islice(delays, 6)) == [1, 2, 4, 8, 10, 10]
+
+
+def test_backoff_delays_jitter_bounds(monkeypatch):
+    # Lowest and highest draws of the random part of each delay
+    monkeypatch.setattr(waiters.random, "uniform", lambda low, high: low)
+    low = list(itertools.islice(waiters.backoff_delays(initial_delay=4, max_delay=8, jitter=0.5), 3))
+    monkeypatch.setattr(waiters.random, "uniform", lambda low, high: high)
+    high = list(itertools.islice(waiters.backoff_delays(initial_delay=4, max_delay=8, jitter=0.5), 3))
+    assert low == [2, 4, 4]
+    assert high == [4, 8, 8]
+
+
+def test_poll_returns_once_done(clock):
+    states = iter(["CREATING", "CREATING", "ACTIVE"])
+    result = waiters.poll(lambda: next(states), lambda state: state == "ACTIVE", jitter=0)
+    assert result == "ACTIVE"
+    assert clock["sleeps"] == [1.0, 2.0]
+
+
+def test_poll_raises_at_deadline(clock):
+    checks = []
+
+    def check():
+        checks.append(clock["now"])
+        return "CREATING"
+
+    with pytest.raises(TimeoutError, match="waiting for function"):
+        waiters.poll(check, lambda state: False, timeout=10, jitter=0, description="function")
+    # The last sleep is cut short so the final check happens at the deadline
+    assert clock["sleeps"] == [1.0, 2.0, 4.0, 3.0]
+    assert checks == [0.0, 1.0, 3.0, 7.0, 10.0]
+
+
+class FakeWaiter:
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = []
+
+    def wait(self, WaiterConfig, **kwargs):
+        self.calls.append((WaiterConfig, kwargs))
+        if self.error:
+            raise self.error
+
+
+class FakeClient:
+    def __init__(self, waiter):
+        self.waiter = waiter
+        self.waiter_names = []
+
+    def get_waiter(self, waiter_name):
+        self.waiter_names.append(waiter_name)
+        return self.waiter
+
+
+@pytest.mark.parametrize(
+    "timeout, delay, max_attempts", [(600, 2, 300), (601, 2, 301), (1, 5, 1), (0, 2, 1)]
+)
+def test_wait_for_max_attempts(timeout, delay, max_attempts):
+    waiter = FakeWaiter()
+    client = FakeClient(waiter)
+    waiters.wait_for(client, "function_active", timeout=timeout, delay=delay, FunctionName="fn")
+    assert client.waiter_names == ["function_active"]
+    assert waiter.calls == [({"Delay": delay, "MaxAttempts": max_attempts}, {"FunctionName": "fn"})]
+
+
+def test_wait_for_timeout():
+    error = WaiterError("FunctionActive", "Max attempts exceeded", {})
+    with pytest.raises(TimeoutError, match="Timed out after 10s waiting for function"):
+        waiters.wait_for(FakeClient(FakeWaiter(error)), "function_active", timeout=10, description="function")
+
+
+def test_wait_for_failure():
+    error = WaiterError("FunctionActive", "Waiter encountered a terminal failure state", {})
+    with pytest.raises(Exception, match="Failed waiting for function") as excinfo:
+        waiters.wait_for(FakeClient(FakeWaiter(error)), "function_active", description="function")
+    assert not isinstance(excinfo.value, TimeoutError)
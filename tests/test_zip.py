@@ -0,0 +1,174 @@
+import os
+import zipfile
+
+import pytest
+
+from propheto.package import zip as zip_module
+from propheto.package.zip import ZipService
+
+FILES = {
+    "main.py": b"from v1.routers import router\n" * 20,
+    "v1/__init__.py": b"",
+    "v1/endpoints/model.py": b"def predict(model, data):\n    return model.predict(data)\n" * 50,
+    "model.joblib": os.urandom(4096),
+}
+
+
+@pytest.fixture
+def compressed(monkeypatch):
+    """
+    Archive names compressed from their source file rather than reused
+    """
+    names = []
+    original = zip_module.compress_file
+
+    def compress_file(file_path, arcname, compression_level, store):
+        names.append(arcname)
+        return original(file_path, arcname, compression_level, store)
+
+    monkeypatch.setattr(zip_module, "compress_file", compress_file)
+    return names
+
+
+def _write_tree(source, files):
+    for arcname, contents in files.items():
+        file_path = source / arcname
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_bytes(contents)
+
+
+def _package(source, zip_filename):
+    service = ZipService(app_directory=str(source), max_workers=2)
+    return service.zip_files(service.collect_files(str(source)), zip_filename=str(zip_filename))
+
+
+def _assert_archive(zip_filename, files):
+    with zipfile.ZipFile(zip_filename) as archive:
+        assert archive.testzip() is None
+        assert sorted(archive.namelist()) == sorted(files)
+        for arcname, contents in files.items():
+            assert archive.read(arcname) == contents
+
+
+def test_package_and_reuse_unchanged_files(tmp_path, compressed):
+    source = tmp_path / "api"
+    _write_tree(source, FILES)
+    zip_filename = tmp_path / "lambda.zip"
+    _package(source, zip_filename)
+    _assert_archive(zip_filename, FILES)
+    assert sorted(compressed) == sorted(FILES)
+
+    del compressed[:]
+    _package(source, zip_filename)
+    _assert_archive(zip_filename, FILES)
+    assert compressed == []
+
+
+def test_repackage_after_content_change(tmp_path, compressed):
+    source = tmp_path / "api"
+    _write_tree(source, FILES)
+    zip_filename = tmp_path / "lambda.zip"
+    _package(source, zip_filename)
+
+    files = dict(FILES)
+    # Same size and a different size change
+    files["main.py"] = FILES["main.py"].replace(b"router", b"ROUTER")
+    files["v1/endpoints/model.py"] = FILES["v1/endpoints/model.py"] + b"# changed\n"
+    _write_tree(source, files)
+    del compressed[:]
+    _package(source, zip_filename)
+    _assert_archive(zip_filename, files)
+    assert sorted(compressed) == ["main.py", "v1/endpoints/model.py"]
+
+
+def test_repackage_after_mtime_only_change(tmp_path, compressed):
+    source = tmp_path / "api"
+    _write_tree(source, FILES)
+    zip_filename = tmp_path / "lambda.zip"
+    _package(source, zip_filename)
+
+    file_path = source / "v1" / "endpoints" / "model.py"
+    stat = os.stat(file_path)
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    del compressed[:]
+    _package(source, zip_filename)
+    _assert_archive(zip_filename, FILES)
+    # Same contents, so the member is copied from the previous archive
+    assert compressed == []
+
+
+def test_repackage_after_file_removed(tmp_path, compressed):
+    source = tmp_path / "api"
+    _write_tree(source, FILES)
+    zip_filename = tmp_path / "lambda.zip"
+    _package(source, zip_filename)
+
+    os.remove(source / "v1" / "endpoints" / "model.py")
+    files = {arcname: contents for arcname, contents in FILES.items() if arcname != "v1/endpoints/model.py"}
+    del compressed[:]
+    _package(source, zip_filename)
+    _assert_archive(zip_filename, files)
+    assert compressed == []
+
+
+def test_reused_entries_mixed_with_large_files(tmp_path, monkeypatch):
+    source = tmp_path / "api"
+    _write_tree(source, FILES)
+    zip_filename = tmp_path / "lambda.zip"
+    _package(source, zip_filename)
+
+    # Members written by zipfile itself after raw members keep the archive valid
+    monkeypatch.setattr(zip_module, "LARGE_FILE_SIZE", 1024)
+    files = dict(FILES)
+    files["v1/endpoints/model.py"] = FILES["v1/endpoints/model.py"] + b"# changed\n"
+    _write_tree(source, files)
+    _package(source, zip_filename)
+    _assert_archive(zip_filename, files)
+
+
+def test_window_bounded_by_bytes(tmp_path, monkeypatch):
+    source = tmp_path / "api"
+    _write_tree(source, FILES)
+    events = []
+    original_compress, original_write = zip_module.compress_file, zip_module.write_raw_entry
+
+    def compress_file(file_path, arcname, compression_level, store):
+        events.append(("compress", arcname))
+        return original_compress(file_path, arcname, compression_level, store)
+
+    def write_raw_entry(archive, zinfo, data):
+        events.append(("write", zinfo.filename))
+        original_write(archive, zinfo, data)
+
+    monkeypatch.setattr(zip_module, "compress_file", compress_file)
+    monkeypatch.setattr(zip_module, "write_raw_entry", write_raw_entry)
+    # Any file fills the window so each one is written before the next is read
+    monkeypatch.setattr(zip_module, "WINDOW_BYTES", 1)
+    service = ZipService(app_directory=str(source), max_workers=8)
+    service.zip_files(service.collect_files(str(source)), zip_filename=str(tmp_path / "lambda.zip"))
+    pending = set()
+    for event, arcname in events:
+        if event == "compress" and FILES[arcname]:
+            pending.add(arcname)
+        elif event == "write":
+            pending.discard(arcname)
+        assert len(pending) <= 1
+
+
+def test_large_files_use_compression_level(tmp_path, monkeypatch):
+    source = tmp_path / "api"
+    _write_tree(source, FILES)
+    levels = {}
+    original = zipfile.ZipFile.write
+
+    def write(self, filename, arcname=None, compress_type=None, compresslevel=None):
+        levels[arcname] = compresslevel
+        original(self, filename, arcname, compress_type, compresslevel)
+
+    monkeypatch.setattr(zipfile.ZipFile, "write", write)
+    monkeypatch.setattr(zip_module, "LARGE_FILE_SIZE", 1024)
+    zip_filename = tmp_path / "lambda.zip"
+    service = ZipService(app_directory=str(source), compression_level=9, max_workers=2)
+    service.zip_files(service.collect_files(str(source)), zip_filename=str(zip_filename))
+    _assert_archive(zip_filename, FILES)
+    assert levels == {"v1/endpoints/model.py": 9, "model.joblib": 9}